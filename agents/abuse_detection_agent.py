@@ -1,23 +1,152 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from models.schemas import AbuseFlag, AbuseType, AbuseSeverity, AgentState
-from typing import List
-import os
+from agents.prompts import analysis_prompt
+from models.schemas import AbuseFlag, AbuseType, AbuseSeverity, AgentState, EscalationEvent
+from typing import Callable, List, Optional
+from datetime import datetime
+from langgraph.config import get_stream_writer
+from llm.router import Route
+import time
 import re
 
+# Find all abuse entries by matching TYPE: pattern. Markers match in any case
+# ("Type:", "severity:"), in the streamed and the final parse alike
+ENTRY_START_PATTERN = re.compile(r'TYPE:', re.IGNORECASE)
+TYPE_PATTERN = re.compile(r'TYPE:\s*(\w+)', re.IGNORECASE)
+# A 1-10 score as asked, or a level word
+SEVERITY_PATTERN = re.compile(r'SEVERITY:\s*(\d+|low|medium|high)', re.IGNORECASE)
+# Match either "..." or '...' but not mixed, and handle internal quotes/apostrophes
+TEXT_PATTERN = re.compile(r'TEXT:\s*"([^"]+)"|TEXT:\s*\'([^\']+)\'', re.IGNORECASE | re.DOTALL)
+CONTEXT_PATTERN = re.compile(r'CONTEXT:\s*(.+?)(?=TYPE:|$)', re.IGNORECASE | re.DOTALL)
+# A streamed entry is complete once its CONTEXT line has ended
+CONTEXT_LINE_PATTERN = re.compile(r'CONTEXT:[^\n]*\S[^\n]*\n', re.IGNORECASE)
+
+SEVERITY_WORDS = {'low': 2, 'medium': 5, 'high': 8}
+
+ABUSE_TYPE_MAP = {
+    'profanity': AbuseType.PROFANITY,
+    'threat': AbuseType.THREAT,
+    'harassment': AbuseType.HARASSMENT,
+    'sexual': AbuseType.DISCRIMINATION,
+    'hate_speech': AbuseType.DISCRIMINATION,
+    'discrimination': AbuseType.DISCRIMINATION
+}
+
+
+def parse_abuse_entry(entry: str) -> Optional[AbuseFlag]:
+    """Parse one TYPE/SEVERITY/TEXT/CONTEXT entry, or None if it has no TYPE"""
+    type_match = TYPE_PATTERN.search(entry)
+    severity_match = SEVERITY_PATTERN.search(entry)
+    text_match = TEXT_PATTERN.search(entry)
+    context_match = CONTEXT_PATTERN.search(entry)
+
+    if not type_match:
+        return None
+
+    abuse_type_str = type_match.group(1).lower().strip()
+    severity_str = severity_match.group(1).lower() if severity_match else '5'
+    severity_num = SEVERITY_WORDS.get(severity_str) or int(severity_str)
+    # Handle either double quotes (group 1) or single quotes (group 2)
+    if text_match:
+        quoted_text = (text_match.group(1) or text_match.group(2) or "").strip()
+    else:
+        quoted_text = ""
+    context = context_match.group(1).strip() if context_match else ""
+
+    abuse_type = ABUSE_TYPE_MAP.get(abuse_type_str, AbuseType.PROFANITY)
+
+    # Map severity
+    if severity_num <= 3:
+        severity = AbuseSeverity.LOW
+    elif severity_num <= 6:
+        severity = AbuseSeverity.MEDIUM
+    else:
+        severity = AbuseSeverity.HIGH
+
+    return AbuseFlag(
+        detected=True,
+        speaker="customer",  # Assume customer for now
+        abuse_type=[abuse_type],  # Must be a list
+        severity=severity,
+        evidence=[quoted_text] if quoted_text else [],
+        recommended_action=context,
+        requires_escalation=severity == AbuseSeverity.HIGH
+    )
+
+
+class AbuseFlagStreamParser:
+    """Incremental parser for the abuse detector's streamed response
+
+    feed() takes the response a few tokens at a time and returns each flag
+    as soon as its entry is complete: its CONTEXT line has ended or the next
+    TYPE: has started. close() returns the flag of a trailing entry that
+    never completed.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[AbuseFlag]:
+        self._buffer += text
+        flags = []
+        while True:
+            starts = [m.start() for m in ENTRY_START_PATTERN.finditer(self._buffer)]
+            if not starts:
+                # Keep a possible partial "TYPE:" at the end
+                self._buffer = self._buffer[-4:]
+                return flags
+
+            entry = self._buffer[starts[0]:starts[1] if len(starts) > 1 else None]
+            context_line = CONTEXT_LINE_PATTERN.search(entry)
+            if len(starts) > 1:
+                end = starts[1]
+            elif context_line:
+                end = starts[0] + context_line.end()
+            else:
+                self._buffer = self._buffer[starts[0]:]
+                return flags
+
+            flag = self._parse(self._buffer[starts[0]:end])
+            if flag is not None:
+                flags.append(flag)
+            self._buffer = self._buffer[end:]
+
+    def close(self) -> List[AbuseFlag]:
+        entry, self._buffer = self._buffer, ""
+        flag = self._parse(entry) if ENTRY_START_PATTERN.search(entry) else None
+        return [flag] if flag is not None else []
+
+    @staticmethod
+    def _parse(entry: str) -> Optional[AbuseFlag]:
+        try:
+            return parse_abuse_entry(entry)
+        except Exception:
+            # If parsing fails, skip this entry
+            return None
+
+
+def _stream_writer():
+    """LangGraph's custom stream writer when running as a graph node, else None"""
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return None
+
 class AbuseDetectionAgent:
-    """Agent that detects abusive language, threats, or inappropriate content"""
+    """Agent that detects abusive language, threats, or inappropriate content
+
+    The response is streamed through AbuseFlagStreamParser. The first
+    high-severity flag raises an EscalationEvent right away, before the rest
+    of the response arrives: it is passed to on_escalation and, when running
+    in the graph, written to LangGraph's custom stream (see stream_analysis).
+    """
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = "gpt-4o-mini",
+                 on_escalation: Optional[Callable[[EscalationEvent], None]] = None):
         self.model_name = model
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=0,  # Use low temperature for consistent detection
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.on_escalation = on_escalation
+        self.route = Route("abuse_detector", model, temperature=0)  # Use low temperature for consistent detection
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a content moderation system for call center transcripts. Your job is to FLAG inappropriate content, not to make judgments about whether to allow it.
+        # Shared transcript prefix first, task last (see agents/prompts.py)
+        self.prompt = analysis_prompt("""Act as a content moderation system: analyze the call transcript above for abusive content. Your job is to FLAG inappropriate content, not to make judgments about whether to allow it.
 
 DETECTION CRITERIA:
 
@@ -51,15 +180,10 @@ TEXT: "[exact quote from transcript]"
 CONTEXT: [brief explanation]
 
 If absolutely NO abuse is detected, respond with: "NO_ABUSE_DETECTED"
-"""),
-            ("human", """Analyze this call transcript for abusive content:
-
-{transcript}
 
 List any abuse detected:""")
-        ])
 
-        self.chain = self.prompt | self.llm
+        self.chain = self.route.bind(self.prompt)
 
     def _parse_abuse_response(self, response_text: str) -> List[AbuseFlag]:
         """Parse LLM response into AbuseFlag objects"""
@@ -69,69 +193,17 @@ List any abuse detected:""")
         
         abuse_flags = []
         
-        # Find all abuse entries by matching TYPE: pattern
-        type_pattern = r'TYPE:\s*(\w+)'
-        severity_pattern = r'SEVERITY:\s*(\d+)'
-        # Match either "..." or '...' but not mixed, and handle internal quotes/apostrophes
-        text_pattern = r'TEXT:\s*"([^"]+)"|TEXT:\s*\'([^\']+)\''
-        context_pattern = r'CONTEXT:\s*(.+?)(?=TYPE:|$)'
-        
         # Split response into potential abuse entries
-        entries = re.split(r'(?=TYPE:)', response_text.strip())
+        entries = re.split(r'(?=TYPE:)', response_text.strip(), flags=re.IGNORECASE)
         
         for entry in entries:
-            if not entry.strip() or 'TYPE:' not in entry:
+            if not entry.strip() or not ENTRY_START_PATTERN.search(entry):
                 continue
                 
             try:
-                # Extract fields using regex
-                type_match = re.search(type_pattern, entry, re.IGNORECASE)
-                severity_match = re.search(severity_pattern, entry)
-                text_match = re.search(text_pattern, entry, re.DOTALL)
-                context_match = re.search(context_pattern, entry, re.DOTALL)
-                
-                if not type_match:
-                    continue
-                
-                abuse_type_str = type_match.group(1).lower().strip()
-                severity_num = int(severity_match.group(1)) if severity_match else 5
-                # Handle either double quotes (group 1) or single quotes (group 2)
-                if text_match:
-                    quoted_text = (text_match.group(1) or text_match.group(2) or "").strip()
-                else:
-                    quoted_text = ""
-                context = context_match.group(1).strip() if context_match else ""
-                
-                # Map to enum
-                abuse_type_map = {
-                    'profanity': AbuseType.PROFANITY,
-                    'threat': AbuseType.THREAT,
-                    'harassment': AbuseType.HARASSMENT,
-                    'sexual': AbuseType.DISCRIMINATION,
-                    'hate_speech': AbuseType.DISCRIMINATION,
-                    'discrimination': AbuseType.DISCRIMINATION
-                }
-                
-                abuse_type = abuse_type_map.get(abuse_type_str, AbuseType.PROFANITY)
-                
-                # Map severity
-                if severity_num <= 3:
-                    severity = AbuseSeverity.LOW
-                elif severity_num <= 6:
-                    severity = AbuseSeverity.MEDIUM
-                else:
-                    severity = AbuseSeverity.HIGH
-                
-                abuse_flag = AbuseFlag(
-                    detected=True,
-                    speaker="customer",  # Assume customer for now
-                    abuse_type=[abuse_type],  # Must be a list
-                    severity=severity,
-                    evidence=[quoted_text] if quoted_text else [],
-                    recommended_action=context
-                )
-                
-                abuse_flags.append(abuse_flag)
+                abuse_flag = parse_abuse_entry(entry)
+                if abuse_flag is not None:
+                    abuse_flags.append(abuse_flag)
                 
             except Exception as e:
                 # If parsing fails, skip this entry
@@ -139,6 +211,58 @@ List any abuse detected:""")
         
         return abuse_flags
 
+    def _escalate(self, state: AgentState, flag: AbuseFlag, started: float, streamed: bool) -> None:
+        """Raise the escalation for the first high-severity flag only"""
+        if state.escalation is not None or flag.severity != AbuseSeverity.HIGH:
+            return
+
+        event = EscalationEvent(
+            call_id=state.metadata.call_id if state.metadata else state.call_id,
+            flag=flag,
+            raised_at=datetime.now(),
+            elapsed_ms=(time.monotonic() - started) * 1000,
+            streamed=streamed
+        )
+        state.escalation = event
+        if self.on_escalation is not None:
+            self.on_escalation(event)
+        writer = _stream_writer()
+        if writer is not None:
+            writer({"escalation": event})
+
+    def _watch(self, state: AgentState):
+        """Token callbacks escalating as soon as a streamed flag warrants it"""
+        parser = AbuseFlagStreamParser()
+        started = time.monotonic()
+
+        def on_token(token: str) -> None:
+            for flag in parser.feed(token):
+                self._escalate(state, flag, started, streamed=True)
+
+        def on_restart() -> None:
+            # Failed over mid-stream: the next model's response starts from scratch
+            nonlocal parser
+            parser = AbuseFlagStreamParser()
+
+        return on_token, on_restart, started
+
+    def _record(self, state: AgentState, response_text: str, model: str, started: float) -> AgentState:
+        # Parse response into abuse flags
+        abuse_flags = self._parse_abuse_response(response_text)
+
+        # Cached and replayed responses stream nothing: escalate from the full text
+        for flag in abuse_flags:
+            self._escalate(state, flag, started, streamed=False)
+        if state.escalation is not None and state.escalation.streamed:
+            state.escalation.lead_ms = (time.monotonic() - started) * 1000 - state.escalation.elapsed_ms
+
+        # Update state
+        state.abuse_flags = abuse_flags
+        state.execution_path.append("abuse_detection")
+        state.models_used.append(model)
+        
+        return state
+
     def run(self, state: AgentState) -> AgentState:
         """Detect abusive content in the transcript"""
         
@@ -147,20 +271,13 @@ List any abuse detected:""")
             state.models_used.append(self.model_name)
             return state
 
-        # Get LLM response
-        response = self.chain.invoke({
-            "transcript": state.transcript.full_text
-        })
-        
-        # Parse response into abuse flags
-        abuse_flags = self._parse_abuse_response(response.content)
-        
-        # Update state
-        state.abuse_flags = abuse_flags
-        state.execution_path.append("abuse_detection")
-        state.models_used.append(self.model_name)
-        
-        return state
+        # Stream the LLM response, escalating on the first high-severity flag
+        on_token, on_restart, started = self._watch(state)
+        response, model = self.chain.invoke({
+            "transcript": state.transcript.prompt_text
+        }, on_token=on_token, on_restart=on_restart)
+
+        return self._record(state, response.content, model, started)
 
     async def arun(self, state: AgentState) -> AgentState:
         """Async version"""
@@ -169,14 +286,9 @@ List any abuse detected:""")
             state.models_used.append(self.model_name)
             return state
 
-        response = await self.chain.ainvoke({
-            "transcript": state.transcript.full_text
-        })
-        
-        abuse_flags = self._parse_abuse_response(response.content)
-        
-        state.abuse_flags = abuse_flags
-        state.execution_path.append("abuse_detection")
-        state.models_used.append(self.model_name)
-        
-        return state
+        on_token, on_restart, started = self._watch(state)
+        response, model = await self.chain.ainvoke({
+            "transcript": state.transcript.prompt_text
+        }, on_token=on_token, on_restart=on_restart)
+
+        return self._record(state, response.content, model, started)
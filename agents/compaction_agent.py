@@ -0,0 +1,143 @@
+from models.schemas import CompactionStats, AgentState
+from config.settings import settings
+from llm.tokens import count_tokens, tokenizer_available
+from typing import Dict, List, Optional, Tuple
+import re
+
+# "Speaker: text" at the start of a line; labels are short and start with a letter
+_TURN_RE = re.compile(r"^\s*([A-Za-z][\w .'()#-]{0,40}?)\s*:\s*(.*)$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _speaker_tags(labels: List[str]) -> Dict[str, str]:
+    """Map each speaker label to a short unique tag (Agent -> A, Customer -> C)"""
+    tags = {}
+    used = set()
+    for label in labels:
+        base = label[0].upper()
+        tag = base
+        n = 2
+        while tag in used:
+            tag = f"{base}{n}"
+            n += 1
+        tags[label] = tag
+        used.add(tag)
+    return tags
+
+
+def _split_turns(text: str) -> Tuple[List[Tuple[Optional[str], str]], List[str]]:
+    """Split text into (speaker, utterance) turns and the recurring speaker labels
+
+    A line prefix only counts as a speaker label if it recurs, so one-off
+    "Note:" or "Account: 1234" lines stay part of the text.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    matches = [_TURN_RE.match(line) for line in lines]
+
+    counts: Dict[str, int] = {}
+    for m in matches:
+        if m:
+            counts[m.group(1)] = counts.get(m.group(1), 0) + 1
+    labels = [label for label, count in counts.items() if count >= 2]
+
+    turns = []
+    for line, m in zip(lines, matches):
+        if m and m.group(1) in labels:
+            turns.append((m.group(1), m.group(2)))
+        elif turns:
+            # Continuation line of the previous turn
+            speaker, utterance = turns[-1]
+            turns[-1] = (speaker, f"{utterance} {line}")
+        else:
+            turns.append((None, line))
+    return turns, labels
+
+
+def compact_transcript(
+    text: str,
+    drop_filler: bool = False,
+    filler_patterns: Optional[List[str]] = None
+) -> Tuple[str, int]:
+    """Compact a transcript for LLM prompts
+
+    - whitespace runs collapse to one space, one turn per line
+    - recurring speaker labels become short tags, declared once in a legend
+    - consecutive turns by the same speaker are merged
+    - with drop_filler, turns fully matching a filler pattern are dropped
+
+    Returns:
+        (compacted text, number of dropped turns)
+    """
+    turns, labels = _split_turns(text)
+    fillers = [re.compile(p, re.IGNORECASE) for p in (filler_patterns or [])] if drop_filler else []
+    tags = _speaker_tags(labels)
+
+    compacted: List[Tuple[Optional[str], str]] = []
+    dropped = 0
+    for speaker, utterance in turns:
+        utterance = _WHITESPACE_RE.sub(" ", utterance).strip()
+        if not utterance:
+            continue
+        if speaker and any(f.fullmatch(utterance) for f in fillers):
+            dropped += 1
+            continue
+        if compacted and speaker and compacted[-1][0] == speaker:
+            compacted[-1] = (speaker, f"{compacted[-1][1]} {utterance}")
+        else:
+            compacted.append((speaker, utterance))
+
+    lines = [f"{tags[speaker]}: {utterance}" if speaker else utterance for speaker, utterance in compacted]
+    if tags:
+        legend = ", ".join(f"{tag}={label}" for label, tag in tags.items())
+        lines.insert(0, f"[Speakers: {legend}]")
+    return "\n".join(lines), dropped
+
+
+class TranscriptCompactionAgent:
+    """Agent that compacts the transcript before it is sent to the LLM agents
+
+    The original full_text is kept for display and evaluation; the LLM agents
+    read transcript.prompt_text, which is the compacted version.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        drop_filler: Optional[bool] = None,
+        filler_patterns: Optional[List[str]] = None,
+        token_model: str = "gpt-4o-mini"
+    ):
+        self.model_name = "rule-based"
+        self.enabled = enabled
+        self.drop_filler = drop_filler
+        self.filler_patterns = filler_patterns
+        self.token_model = token_model
+
+    def run(self, state: AgentState) -> AgentState:
+        """Compact the transcript and record the token savings"""
+        state.execution_path.append("compaction")
+        state.models_used.append(self.model_name)
+
+        # Read settings per run so evaluation can compare with and without
+        enabled = settings.TRANSCRIPT_COMPACTION if self.enabled is None else self.enabled
+        if not enabled or not state.transcript:
+            return state
+
+        drop_filler = settings.COMPACTION_DROP_FILLER if self.drop_filler is None else self.drop_filler
+        filler_patterns = settings.COMPACTION_FILLER_PATTERNS if self.filler_patterns is None else self.filler_patterns
+        original = state.transcript.full_text
+        compacted, dropped = compact_transcript(original, drop_filler, filler_patterns)
+
+        original_tokens = count_tokens(original, self.token_model)
+        compacted_tokens = count_tokens(compacted, self.token_model)
+        if compacted_tokens >= original_tokens:
+            return state  # nothing to gain (e.g. the legend outweighs short labels)
+
+        state.transcript = state.transcript.model_copy(update={"compact_text": compacted})
+        state.compaction = CompactionStats(
+            original_tokens=original_tokens,
+            compacted_tokens=compacted_tokens,
+            dropped_turns=dropped,
+            tokenizer="tiktoken" if tokenizer_available(self.token_model) else "estimate"
+        )
+        return state
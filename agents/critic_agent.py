@@ -1,7 +1,8 @@
-from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import ChatPromptTemplate
+from agents.prompts import analysis_prompt
 from models.schemas import SummaryCritique, AgentState
-import os
+from config.settings import settings
+from typing import Optional
+from llm.router import Route
 
 class CriticAgent:
     """Agent that evaluates summary quality and decides if revision is needed.
@@ -10,15 +11,26 @@ class CriticAgent:
     creating a 'student/teacher' dynamic for more rigorous quality control.
     """
 
-    def __init__(self, model: str = "claude-sonnet-4-20250514"):
+    def __init__(self, model: str = "claude-sonnet-4-20250514", max_revisions: Optional[int] = None,
+                 min_improvement: Optional[float] = None):
         self.model_name = model
-        self.llm = ChatAnthropic(
-            model=model,
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        ).with_structured_output(SummaryCritique)
+        self.max_revisions = settings.MAX_REVISION_COUNT if max_revisions is None else max_revisions
+        self.min_improvement = settings.REVISION_MIN_IMPROVEMENT if min_improvement is None else min_improvement
+        # Temperature 0 keeps scores consistent and makes critic calls safe to hedge
+        self.route = Route("critic", model, temperature=0, structured_output=SummaryCritique)
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert quality evaluator for call center summaries. Your job is to critique the summary against the original transcript.
+        # Shared transcript prefix first, so each revision round re-reads the
+        # transcript from the provider's prompt cache (see agents/prompts.py)
+        self.prompt = analysis_prompt("""You are an expert quality evaluator for call center summaries. Critique the summary below against the call transcript above.
+
+**Current Summary**:
+Brief: {brief_summary}
+Key Points: {key_points}
+Action Items: {action_items}
+Customer Intent: {customer_intent}
+Sentiment: {sentiment}
+Resolution: {resolution_status}
+Topics: {topics}
 
 Evaluate on three dimensions (1-10 scale):
 
@@ -44,36 +56,15 @@ Evaluate on three dimensions (1-10 scale):
 - Set needs_revision=True if ANY score is below 7
 - Set needs_revision=False if all scores are 7 or above
 
-If revision is needed, provide specific, actionable revision_instructions."""),
-            ("human", """**Original Transcript**:
-{transcript}
+If revision is needed, provide specific, actionable revision_instructions.""")
 
-**Current Summary**:
-Brief: {brief_summary}
-Key Points: {key_points}
-Action Items: {action_items}
-Customer Intent: {customer_intent}
-Sentiment: {sentiment}
-Resolution: {resolution_status}
-Topics: {topics}
-
-Please evaluate this summary and provide your critique.""")
-        ])
+        self.chain = self.route.bind(self.prompt)
 
-        self.chain = self.prompt | self.llm
-
-    def run(self, state: AgentState) -> AgentState:
-        """Evaluate the summary and decide if revision is needed"""
-        
-        if not state.summary or not state.transcript:
-            state.errors.append("Cannot critique: missing summary or transcript")
-            return state
-
-        # Prepare summary details for evaluation
+    def _inputs(self, state: AgentState) -> dict:
+        """Flatten the current summary into the critique prompt inputs"""
         summary = state.summary
-        
-        critique = self.chain.invoke({
-            "transcript": state.transcript.full_text,
+        return {
+            "transcript": state.transcript.prompt_text,
             "brief_summary": summary.brief_summary,
             "key_points": ", ".join(summary.key_points),
             "action_items": ", ".join(summary.action_items) if summary.action_items else "None",
@@ -81,53 +72,61 @@ Please evaluate this summary and provide your critique.""")
             "sentiment": summary.sentiment.value,
             "resolution_status": summary.resolution_status.value,
             "topics": ", ".join(summary.topics)
-        })
-
-        # Update state with critique
+        }
+
+    def _is_converging(self, state: AgentState) -> bool:
+        """True unless the latest revision failed to improve on the one before it"""
+        history = state.critique_history
+        if len(history) < 2:
+            return True
+        return history[-1].overall - history[-2].overall >= self.min_improvement
+
+    def _record(self, state: AgentState, critique: SummaryCritique, model: Optional[str] = None) -> AgentState:
+        """Track the critique, decide whether to revise, and keep the best summary"""
+        state.summary_history.append(state.summary)
+        state.critique_history.append(critique)
         state.summary_critique = critique
-        state.needs_revision = critique.needs_revision
-        
+
         # If revision needed, increment counter
         if critique.needs_revision:
             state.revision_count += 1
+
+        # Another revision only pays off while the scores are still climbing
+        state.needs_revision = (
+            critique.needs_revision
+            and state.revision_count < self.max_revisions
+            and self._is_converging(state)
+        )
+
+        if state.needs_revision:
             state.current_agent = "summarization"  # Route back to summarization
         else:
+            # Loop is done - a later revision can score worse, so keep the best one
+            best = max(range(len(state.critique_history)), key=lambda i: state.critique_history[i].overall)
+            state.summary = state.summary_history[best]
+            state.summary_critique = state.critique_history[best]
             state.current_agent = "qa_scoring"  # Continue to QA
-        
+
         state.execution_path.append("critic")
-        state.models_used.append(self.model_name)
+        state.models_used.append(model or self.model_name)
 
         return state
 
-    async def arun(self, state: AgentState) -> AgentState:
-        """Async version"""
+    def run(self, state: AgentState) -> AgentState:
+        """Evaluate the summary and decide if revision is needed"""
+
         if not state.summary or not state.transcript:
             state.errors.append("Cannot critique: missing summary or transcript")
             return state
 
-        summary = state.summary
-        
-        critique = await self.chain.ainvoke({
-            "transcript": state.transcript.full_text,
-            "brief_summary": summary.brief_summary,
-            "key_points": ", ".join(summary.key_points),
-            "action_items": ", ".join(summary.action_items) if summary.action_items else "None",
-            "customer_intent": summary.customer_intent,
-            "sentiment": summary.sentiment.value,
-            "resolution_status": summary.resolution_status.value,
-            "topics": ", ".join(summary.topics)
-        })
+        critique, model = self.chain.invoke(self._inputs(state))
+        return self._record(state, critique, model)
 
-        state.summary_critique = critique
-        state.needs_revision = critique.needs_revision
-        
-        if critique.needs_revision:
-            state.revision_count += 1
-            state.current_agent = "summarization"
-        else:
-            state.current_agent = "qa_scoring"
-        
-        state.execution_path.append("critic")
-        state.models_used.append(self.model_name)
+    async def arun(self, state: AgentState) -> AgentState:
+        """Async version"""
+        if not state.summary or not state.transcript:
+            state.errors.append("Cannot critique: missing summary or transcript")
+            return state
 
-        return state
+        critique, model = await self.chain.ainvoke(self._inputs(state))
+        return self._record(state, critique, model)
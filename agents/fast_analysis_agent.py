@@ -0,0 +1,73 @@
+from agents.prompts import analysis_prompt
+from models.schemas import CombinedAnalysis, AgentState
+from llm.router import Route
+
+class FastAnalysisAgent:
+    """Agent that summarizes, QA-scores and screens a call in one LLM round trip.
+
+    Replaces the abuse detection, summarization, critic and QA scoring agents
+    for the "fast" pipeline profile: the transcript is sent once instead of
+    four or more times, at the cost of the critic's revision loop.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini"):
+        self.model_name = model
+        self.route = Route("fast_analyzer", model, temperature=0, structured_output=CombinedAnalysis)
+
+        # Shared transcript prefix first, task last (see agents/prompts.py)
+        self.prompt = analysis_prompt("""Analyze the call transcript above and return three results in one response.
+
+1. **summary**
+   - brief_summary: 2-3 sentence overview of the call
+   - key_points: 3-5 key points discussed
+   - action_items: follow-ups needed (empty list if none)
+   - customer_intent: what the customer wanted
+   - resolution_status: resolved, unresolved, or escalated
+   - topics: main topics discussed
+   - sentiment: positive, neutral, or negative
+   Be concise but thorough. Use only facts from the transcript.
+
+2. **qa_scores** for the agent (0-10 each, 9-10 exceptional, 7-8 good, 5-6 adequate, 3-4 needs improvement, 0-2 poor)
+   - empathy: understanding and compassion for the customer's situation
+   - professionalism: courteous, respectful, professional standards
+   - resolution: how effectively the issue was addressed
+   - tone: friendly, helpful and appropriate throughout
+   - comments: specific strengths and areas for improvement
+
+3. **abuse_flags**: one entry per abusive statement, empty list if none
+   - profanity: swear words or vulgar language
+   - threat: legal threats, physical threats, implied harm
+   - harassment: personal attacks, insults, name-calling
+   - discrimination: sexual content or hate speech
+   Severity: low (mild profanity), medium (insults, moderate profanity, legal threats), high (severe profanity, physical threats, hate speech).
+   Put the exact quote in evidence, who said it in speaker, and a brief explanation in recommended_action. Set detected=true.
+   Normal frustration ("I'm very upset", "This is unacceptable") is NOT abuse.""")
+
+        self.chain = self.route.bind(self.prompt)
+
+    def _record(self, state: AgentState, analysis: CombinedAnalysis, model: str) -> AgentState:
+        state.summary = analysis.summary
+        state.qa_scores = analysis.qa_scores
+        state.abuse_flags = [flag for flag in analysis.abuse_flags if flag.detected]
+        state.execution_path.append("fast_analysis")
+        state.models_used.append(model)
+
+        return state
+
+    def run(self, state: AgentState) -> AgentState:
+        """Produce summary, QA scores and abuse flags from the transcript"""
+        if not state.transcript:
+            raise ValueError("No transcript available for fast analysis")
+
+        analysis, model = self.chain.invoke({"transcript": state.transcript.prompt_text})
+
+        return self._record(state, analysis, model)
+
+    async def arun(self, state: AgentState) -> AgentState:
+        """Async version"""
+        if not state.transcript:
+            raise ValueError("No transcript available for fast analysis")
+
+        analysis, model = await self.chain.ainvoke({"transcript": state.transcript.prompt_text})
+
+        return self._record(state, analysis, model)
@@ -1,14 +1,18 @@
+from audio.backends import get_backend
+from audio.chunking import chunking_available
 from models.schemas import InputValidationResult, AgentState
 import re
 
 class InputValidationAgent:
     """Agent that validates input quality and flags potential issues"""
 
-    def __init__(self):
+    def __init__(self, transcription_backend: str = None):
         self.model_name = "input-validator"
         self.min_words = 10
         self.max_words = 5000
-        self.max_audio_size_mb = 25  # Whisper API limit
+        self.max_audio_size_mb = 25  # Whisper API limit (per request)
+        # Local backends read the file directly, with no upload limit
+        self.upload_limited = get_backend(transcription_backend).remote
         self.supported_audio_formats = ['.mp3', '.wav', '.m4a', '.webm', '.mp4', '.mpeg', '.mpga', '.oga', '.ogg']
 
     def _validate_audio(self, state: AgentState) -> AgentState:
@@ -21,7 +25,11 @@ class InputValidationAgent:
         else:
             # Check file size (Whisper has 25MB limit)
             size_mb = len(state.audio_data) / (1024 * 1024)
-            if size_mb > self.max_audio_size_mb:
+            too_large = self.upload_limited and size_mb > self.max_audio_size_mb
+            if too_large and chunking_available():
+                # The limit applies per request; long recordings are sent in chunks
+                warnings.append(f"Large audio file: {size_mb:.1f}MB, will be transcribed in chunks")
+            elif too_large:
                 issues.append(f"Audio file too large: {size_mb:.1f}MB (max: {self.max_audio_size_mb}MB)")
             elif size_mb < 0.001:  # Less than 1KB
                 issues.append("Audio file too small - may be empty or corrupted")
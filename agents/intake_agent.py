@@ -3,6 +3,11 @@ from datetime import datetime
 import uuid
 import os
 
+def new_call_id() -> str:
+    """Generate a call ID of the form CALL-XXXXXXXX"""
+    return f"CALL-{uuid.uuid4().hex[:8].upper()}"
+
+
 class IntakeAgent:
     """Agent that validates input and extracts metadata"""
 
@@ -12,8 +17,8 @@ class IntakeAgent:
     def run(self, state: AgentState) -> AgentState:
         """Extract metadata from input"""
 
-        # Generate call ID
-        call_id = f"CALL-{uuid.uuid4().hex[:8].upper()}"
+        # Use the pre-assigned call ID (e.g. for checkpointing), else generate one
+        call_id = state.call_id or new_call_id()
 
         # Determine input type
         input_type = state.input_type
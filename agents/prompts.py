@@ -0,0 +1,40 @@
+"""
+Shared transcript prefix for the analysis prompts
+
+Providers cache prompt prefixes. OpenAI does it automatically for prompts of
+1024+ tokens; Anthropic caches up to blocks marked with cache_control. A
+cached prefix is reused only when it matches exactly. So every analysis
+prompt starts with the same system message and the same transcript message,
+and puts its own task instructions last. The summarizer, critic, QA scorer
+and abuse detector then share one cached prefix per call, and so do the
+critic/summarizer rounds of the revision loop.
+
+The transcript block carries an Anthropic cache_control marker. The OpenAI
+client strips it (see llm/clients.py), so a route can fail over between
+providers with the same prompt.
+"""
+
+from langchain_core.prompts import ChatPromptTemplate
+
+SHARED_SYSTEM_PROMPT = """You are an expert call center analyst working on a single customer service call. The full transcript follows, and the task comes after it.
+
+Base every answer only on what was said in the transcript: do not invent names, numbers, events or outcomes. Follow the task's instructions and output format exactly."""
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def transcript_prefix() -> ChatPromptTemplate:
+    """System message and transcript, identical for every analysis prompt"""
+    return ChatPromptTemplate.from_messages([
+        ("system", SHARED_SYSTEM_PROMPT),
+        ("human", [{
+            "type": "text",
+            "text": "Call transcript:\n\n{transcript}",
+            "cache_control": CACHE_CONTROL,
+        }]),
+    ])
+
+
+def analysis_prompt(instructions: str) -> ChatPromptTemplate:
+    """The shared transcript prefix followed by one agent's task instructions"""
+    return transcript_prefix() + ChatPromptTemplate.from_messages([("human", instructions)])
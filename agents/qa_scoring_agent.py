@@ -1,20 +1,16 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from agents.prompts import analysis_prompt
 from models.schemas import QAScores, AgentState
-import os
+from llm.router import Route
 
 class QAScoringAgent:
     """Agent that evaluates call quality on multiple dimensions"""
 
     def __init__(self, model: str = "gpt-4o-mini"):
         self.model_name = model
-        self.llm = ChatOpenAI(
-            model=model,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ).with_structured_output(QAScores)
+        self.route = Route("qa_scorer", model, structured_output=QAScores)
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert call center quality analyst. Evaluate the following call transcript on these dimensions:
+        # Shared transcript prefix first, task last (see agents/prompts.py)
+        self.prompt = analysis_prompt("""You are an expert call center quality analyst. Evaluate the call transcript above on these dimensions:
 
 1. **Empathy (0-10)**: Did the agent show understanding and compassion for the customer's situation?
 2. **Professionalism (0-10)**: Was the agent courteous, respectful, and maintained professional standards?
@@ -28,15 +24,9 @@ Scoring Guide:
 - 3-4: Needs improvement
 - 0-2: Poor
 
-Provide specific comments explaining your scores and highlighting strengths or areas for improvement."""),
-            ("human", """Please evaluate this call transcript:
+Provide scores and specific comments explaining your scores and highlighting strengths or areas for improvement.""")
 
-{transcript}
-
-Provide scores and detailed comments.""")
-        ])
-
-        self.chain = self.prompt | self.llm
+        self.chain = self.route.bind(self.prompt)
 
     def run(self, state: AgentState) -> AgentState:
         """Generate QA scores from the transcript"""
@@ -44,13 +34,13 @@ Provide scores and detailed comments.""")
         if not state.transcript:
             raise ValueError("No transcript available for QA scoring")
 
-        qa_scores = self.chain.invoke({
-            "transcript": state.transcript.full_text
+        qa_scores, model = self.chain.invoke({
+            "transcript": state.transcript.prompt_text
         })
 
         state.qa_scores = qa_scores
         state.execution_path.append("qa_scoring")
-        state.models_used.append(self.model_name)
+        state.models_used.append(model)
 
         return state
 
@@ -59,12 +49,12 @@ Provide scores and detailed comments.""")
         if not state.transcript:
             raise ValueError("No transcript available for QA scoring")
 
-        qa_scores = await self.chain.ainvoke({
-            "transcript": state.transcript.full_text
+        qa_scores, model = await self.chain.ainvoke({
+            "transcript": state.transcript.prompt_text
         })
 
         state.qa_scores = qa_scores
         state.execution_path.append("qa_scoring")
-        state.models_used.append(self.model_name)
+        state.models_used.append(model)
 
         return state
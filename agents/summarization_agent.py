@@ -1,20 +1,22 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from agents.prompts import analysis_prompt
 from models.schemas import CallSummary, AgentState
-import os
+from config.settings import settings
+from typing import Optional
+from llm.router import Route
 
 class SummarizationAgent:
     """Agent that generates structured summaries from call transcripts"""
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = "gpt-4o-mini", max_revisions: Optional[int] = None):
         self.model_name = model
-        self.llm = ChatOpenAI(
-            model=model,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ).with_structured_output(CallSummary)
+        # Quoted in the revision prompt; pass the critic's limit so they agree
+        self.max_revisions = settings.MAX_REVISION_COUNT if max_revisions is None else max_revisions
+        # Routed per call among equivalent summarizer models (see llm/router.py)
+        self.route = Route("summarizer", model, structured_output=CallSummary)
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert call center analyst. Analyze the following call transcript and provide a structured summary.
+        # Shared transcript prefix first, task last (see agents/prompts.py)
+        self.prompt = analysis_prompt("""Analyze the call transcript above and provide a structured summary.
 
 Your task:
 1. Write a brief 2-3 sentence summary of the call
@@ -25,24 +27,13 @@ Your task:
 6. List the main topics discussed
 7. Assess the overall sentiment (positive, neutral, or negative)
 
-Be concise but thorough. Focus on facts from the transcript."""),
-            ("human", """Please analyze this call transcript:
+Be concise but thorough. Focus on facts from the transcript.""")
 
-{transcript}""")
-        ])
+        self.chain = self.route.bind(self.prompt)
 
-        self.chain = self.prompt | self.llm
-
-    def run(self, state: AgentState) -> AgentState:
-        """Generate a summary from the transcript in the state"""
-        if not state.transcript:
-            raise ValueError("No transcript available for summarization")
-
-        # Check if this is a revision
-        if state.revision_count > 0 and state.summary_critique:
-            # Add revision instructions to the prompt
-            revised_prompt = self.prompt + ChatPromptTemplate.from_messages([
-                ("human", """REVISION REQUIRED (Attempt {revision_count}/3):
+        # Revision prompt: the base prompt followed by the critic's feedback
+        self.revision_prompt = self.prompt + ChatPromptTemplate.from_messages([
+            ("human", """REVISION REQUIRED (Attempt {revision_count}/{max_revisions}):
 
 Previous critique:
 {critique_feedback}
@@ -51,35 +42,45 @@ Revision instructions:
 {revision_instructions}
 
 Please improve the summary based on this feedback.""")
-            ])
-            
-            revised_chain = revised_prompt | self.llm
-            
-            summary = revised_chain.invoke({
-                "transcript": state.transcript.full_text,
+        ])
+
+        self.revision_chain = self.route.bind(self.revision_prompt)
+
+    def _prepare(self, state: AgentState):
+        """Pick the first-pass or revision chain and build its inputs"""
+        if not state.transcript:
+            raise ValueError("No transcript available for summarization")
+
+        # Check if this is a revision
+        if state.revision_count > 0 and state.summary_critique:
+            return self.revision_chain, {
+                "transcript": state.transcript.prompt_text,
                 "revision_count": state.revision_count,
+                "max_revisions": self.max_revisions,
                 "critique_feedback": state.summary_critique.feedback,
                 "revision_instructions": state.summary_critique.revision_instructions or "Improve based on the critique scores."
-            })
-        else:
-            # First attempt - standard summarization
-            summary = self.chain.invoke({"transcript": state.transcript.full_text})
-        
+            }
+
+        # First attempt - standard summarization
+        return self.chain, {"transcript": state.transcript.prompt_text}
+
+    def _record(self, state: AgentState, summary: CallSummary, model: str) -> AgentState:
         state.summary = summary
         state.execution_path.append(f"summarization{'_v'+str(state.revision_count+1) if state.revision_count > 0 else ''}")
-        state.models_used.append(self.model_name)
-        
+        state.models_used.append(model)
+
         return state
 
+    def run(self, state: AgentState) -> AgentState:
+        """Generate a summary (or a revision) from the transcript in the state"""
+        chain, inputs = self._prepare(state)
+        summary, model = chain.invoke(inputs)
+
+        return self._record(state, summary, model)
+
     async def arun(self, state: AgentState) -> AgentState:
         """Async version"""
-        if not state.transcript:
-            raise ValueError("No transcript available for summarization")
+        chain, inputs = self._prepare(state)
+        summary, model = await chain.ainvoke(inputs)
 
-        summary = await self.chain.ainvoke({"transcript": state.transcript.full_text})
-        
-        state.summary = summary
-        state.execution_path.append("summarization")
-        state.models_used.append(self.model_name)
-        
-        return state
+        return self._record(state, summary, model)
@@ -1,4 +1,5 @@
 from models.schemas import AgentState
+from config.settings import settings
 from typing import Literal
 
 class SupervisorAgent:
@@ -21,8 +22,8 @@ class SupervisorAgent:
 
     def route_after_critic(self, state: AgentState) -> Literal["summarization", "qa_scoring"]:
         """Route after critic: revision loop or continue to QA"""
-        if state.needs_revision and state.revision_count < 3:
-            # Send back for revision (max 3 attempts)
+        if state.needs_revision and state.revision_count < settings.MAX_REVISION_COUNT:
+            # Send back for revision (max MAX_REVISION_COUNT attempts)
             return "summarization"
         else:
             # Continue to QA scoring
@@ -1,104 +1,276 @@
 from models.schemas import TranscriptData, TranscriptSegment, AgentState
-from openai import OpenAI
-import os
-import io
+from audio.backends import get_backend
+from audio.chunking import AudioChunk, needs_chunking, split_audio, stitch_segments
+from audio.encoding import apreencode, preencode, preencode_available
+from audio.transcript_cache import get_transcript_store, load_transcript, save_transcript, transcript_key
+from audio.vad import OffsetMap, trim_non_speech, vad_available
+from config.settings import settings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import asyncio
+import time
 
 class TranscriptionAgent:
-    """Agent that handles transcription (pass-through for text, Whisper for audio)"""
+    """Agent that handles transcription (pass-through for text, a speech-to-text backend for audio)
 
-    def __init__(self):
-        self.model_name = "whisper-1"
-        self.client = None  # Lazy initialization
+    The backend is the Whisper API, a local CPU engine or a stub (see
+    audio/backends.py). Silence and hold music can be cut before transcription (see audio/vad.py),
+    and audio can be pre-encoded to 16 kHz mono Opus before upload (see
+    audio/encoding.py). Long recordings are split at silences and the chunks
+    are transcribed concurrently, then stitched back onto one timeline (see
+    audio/chunking.py). A recording transcribed before is served from the
+    transcript cache by content hash (see audio/transcript_cache.py).
+    """
 
-    def _get_client(self):
-        """Lazy initialization of OpenAI client"""
-        if self.client is None:
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise ValueError("OPENAI_API_KEY not set")
-            self.client = OpenAI(api_key=api_key)
-        return self.client
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: Speech-to-text backend name (see audio/backends.py);
+                defaults to settings.TRANSCRIPTION_BACKEND
+        """
+        self.backend = get_backend(backend)
+        self.model_name = self.backend.name
 
-    def _transcribe_audio(self, audio_data: bytes, file_name: str = "audio.mp3") -> str:
-        """Transcribe audio using OpenAI Whisper API
+    def _transcribe_audio(self, audio_data: bytes, file_name: str = "audio.mp3"):
+        """Transcribe audio with the configured backend
 
         Args:
             audio_data: Raw audio bytes
             file_name: Original file name (used to determine format)
 
         Returns:
-            Transcribed text
+            Whisper verbose_json-shaped response (text, language, segments)
         """
-        client = self._get_client()
-
-        # Wrap bytes in a file-like object with the correct name
-        # The name helps Whisper understand the audio format
-        audio_file = io.BytesIO(audio_data)
-        audio_file.name = file_name
-
-        # Call Whisper API
-        response = client.audio.transcriptions.create(
-            model=self.model_name,
-            file=audio_file,
-            response_format="verbose_json"  # Get detailed response with segments
+        return self.backend.transcribe(audio_data, file_name)
+
+    async def _atranscribe_audio(self, audio_data: bytes, file_name: str = "audio.mp3"):
+        """Async version of _transcribe_audio"""
+        return await self.backend.atranscribe(audio_data, file_name)
+
+    def _text_transcript(self, state: AgentState) -> TranscriptData:
+        """Text input - create transcript structure from raw text"""
+        state.models_used.append("pass-through")
+        return TranscriptData(
+            segments=[],  # No speaker diarization for plain text
+            full_text=state.raw_input,
+            language="en",
+            confidence=1.0
+        )
+
+    @staticmethod
+    def _segments(response) -> List[TranscriptSegment]:
+        """Segments of a Whisper verbose_json response"""
+        # Extract segments if available
+        segments = []
+        if hasattr(response, 'segments') and response.segments:
+            for seg in response.segments:
+                # Handle both dict and object responses
+                if isinstance(seg, dict):
+                    text = seg.get('text', '').strip()
+                    start = seg.get('start', 0.0)
+                    end = seg.get('end', 0.0)
+                else:
+                    text = getattr(seg, 'text', '').strip()
+                    start = getattr(seg, 'start', 0.0)
+                    end = getattr(seg, 'end', 0.0)
+
+                segments.append(TranscriptSegment(
+                    speaker="Speaker",  # Whisper doesn't do diarization
+                    text=text,
+                    start_time=start,
+                    end_time=end
+                ))
+        return segments
+
+    def _audio_transcript(self, state: AgentState, response) -> TranscriptData:
+        """Build transcript data from a Whisper verbose_json response"""
+        state.models_used.append(self.model_name)
+        return TranscriptData(
+            segments=self._segments(response),
+            full_text=response.text,
+            language=getattr(response, 'language', 'en'),
+            confidence=0.95  # Whisper doesn't return confidence scores
+        )
+
+    def _chunks(self, audio_data: bytes, file_name: str) -> Optional[List[AudioChunk]]:
+        """Chunks to transcribe separately, or None to send the recording whole"""
+        if not needs_chunking(audio_data):
+            return None
+        chunks = split_audio(audio_data, file_name)
+        return chunks if len(chunks) > 1 else None
+
+    def _piece_segments(self, response, duration_ms: int) -> List[TranscriptSegment]:
+        """Segments of the response for one piece of a recording"""
+        # A piece without segments still contributes its text
+        return self._segments(response) or [TranscriptSegment(
+            speaker="Speaker",
+            text=response.text.strip(),
+            start_time=0.0,
+            end_time=duration_ms / 1000
+        )]
+
+    def _chunked_transcript(self, state: AgentState, chunks: List[AudioChunk], responses: list) -> TranscriptData:
+        """Stitch per-chunk Whisper responses into one transcript"""
+        chunk_segments = [
+            self._piece_segments(response, chunk.end_ms - chunk.start_ms)
+            for chunk, response in zip(chunks, responses)
+        ]
+        segments = stitch_segments([(c.start_ms, c.end_ms) for c in chunks], chunk_segments)
+
+        state.models_used.append(self.model_name)
+        return TranscriptData(
+            segments=segments,
+            full_text=" ".join(segment.text for segment in segments if segment.text),
+            language=getattr(responses[0], 'language', 'en'),
+            confidence=0.95
         )
 
-        return response
+    async def atranscribe_utterance(self, audio_data: bytes, file_name: str,
+                                    start_ms: int, end_ms: int) -> List[TranscriptSegment]:
+        """Transcribe one utterance of a live call, with times on the call's timeline"""
+        response = await self._atranscribe_audio(audio_data, file_name)
+        if not response.text.strip():
+            return []
+        offset = start_ms / 1000
+        return [
+            segment.model_copy(update={"start_time": segment.start_time + offset, "end_time": segment.end_time + offset})
+            for segment in self._piece_segments(response, end_ms - start_ms)
+            if segment.text
+        ]
+
+    @staticmethod
+    def _restore_times(transcript: TranscriptData, offsets: Optional[OffsetMap]) -> None:
+        """Move segment times from the trimmed audio back onto the original recording"""
+        if offsets is not None:
+            transcript.segments = offsets.remap(transcript.segments)
+
+    @staticmethod
+    def _record_request_time(state: AgentState, started: float) -> None:
+        """Whisper time for the pre-encoded upload, to compare against unencoded runs"""
+        if state.audio_encoding is not None:
+            state.audio_encoding.request_ms = (time.perf_counter() - started) * 1000
+
+    def _check_audio(self, state: AgentState) -> str:
+        """Validate audio state and return the file name used for format detection"""
+        if not state.audio_data:
+            raise ValueError("Audio input type specified but no audio_data provided")
+        return state.input_file_path or "audio.mp3"
+
+    def _lookup(self, audio_data: bytes):
+        """Transcript store, cache key and cached transcript (None on a miss) for a recording"""
+        store = get_transcript_store()
+        if store is None:
+            return None, None, None
+        key = transcript_key(audio_data, self.model_name)
+        return store, key, load_transcript(store, key)
+
+    @staticmethod
+    def _cache_hit(state: AgentState, transcript: TranscriptData) -> TranscriptData:
+        state.models_used.append("transcript-cache")
+        return transcript
+
+    def _speech_transcript(self, state: AgentState) -> TranscriptData:
+        """Preprocess the recording, then transcribe it whole or in chunks"""
+        file_name = self._check_audio(state)
+        audio_data = state.audio_data
+        offsets = None
+        if vad_available():
+            audio_data, file_name, offsets, state.speech_trim = trim_non_speech(audio_data, file_name)
+        chunks = None
+        if self.backend.remote:
+            # Upload-bound: send less data, and long recordings in parallel pieces
+            if preencode_available():
+                encoded = preencode(audio_data, file_name)
+                audio_data, file_name, state.audio_encoding = encoded
+            chunks = self._chunks(audio_data, file_name)
+
+        started = time.perf_counter()
+        if chunks is None:
+            response = self._transcribe_audio(audio_data, file_name)
+            transcript = self._audio_transcript(state, response)
+        else:
+            # Long recording: transcribe the chunks concurrently
+            with ThreadPoolExecutor(max_workers=settings.TRANSCRIPTION_MAX_CONCURRENCY) as pool:
+                responses = list(pool.map(lambda c: self._transcribe_audio(c.data, c.file_name), chunks))
+            transcript = self._chunked_transcript(state, chunks, responses)
+        self._record_request_time(state, started)
+        self._restore_times(transcript, offsets)
+        return transcript
+
+    async def _aspeech_transcript(self, state: AgentState) -> TranscriptData:
+        """Async version of _speech_transcript"""
+        file_name = self._check_audio(state)
+        audio_data = state.audio_data
+        offsets = None
+        if vad_available():
+            trimmed = await asyncio.to_thread(trim_non_speech, audio_data, file_name)
+            audio_data, file_name, offsets, state.speech_trim = trimmed
+        chunks = None
+        if self.backend.remote:
+            if preencode_available():
+                encoded = await apreencode(audio_data, file_name)
+                audio_data, file_name, state.audio_encoding = encoded
+            # Decoding and splitting are CPU-bound: keep them off the event loop
+            chunks = await asyncio.to_thread(self._chunks, audio_data, file_name)
+
+        started = time.perf_counter()
+        if chunks is None:
+            response = await self._atranscribe_audio(audio_data, file_name)
+            transcript = self._audio_transcript(state, response)
+        else:
+            semaphore = asyncio.Semaphore(settings.TRANSCRIPTION_MAX_CONCURRENCY)
+
+            async def transcribe(chunk: AudioChunk):
+                async with semaphore:
+                    return await self._atranscribe_audio(chunk.data, chunk.file_name)
+
+            responses = await asyncio.gather(*(transcribe(chunk) for chunk in chunks))
+            transcript = self._chunked_transcript(state, chunks, responses)
+        self._record_request_time(state, started)
+        self._restore_times(transcript, offsets)
+        return transcript
 
     def run(self, state: AgentState) -> AgentState:
         """Transcribe audio or pass through text"""
 
         if state.input_type == "transcript":
-            # Text input - create transcript structure from raw text
-            transcript = TranscriptData(
-                segments=[],  # No speaker diarization for plain text
-                full_text=state.raw_input,
-                language="en",
-                confidence=1.0
-            )
-            state.models_used.append("pass-through")
+            transcript = self._text_transcript(state)
+
+        elif state.input_type == "audio":
+            # Audio input - a recording seen before is served from the transcript cache
+            self._check_audio(state)
+            store, key, cached = self._lookup(state.audio_data)
+            if cached is not None:
+                transcript = self._cache_hit(state, cached)
+            else:
+                transcript = self._speech_transcript(state)
+                if store is not None:
+                    save_transcript(store, key, transcript)
+
+        else:
+            raise ValueError(f"Unknown input type: {state.input_type}")
+
+        state.transcript = transcript
+        state.execution_path.append("transcription")
+
+        return state
+
+    async def arun(self, state: AgentState) -> AgentState:
+        """Async version - awaits Whisper instead of blocking a thread"""
+
+        if state.input_type == "transcript":
+            transcript = self._text_transcript(state)
 
         elif state.input_type == "audio":
-            # Audio input - use Whisper API
-            if not state.audio_data:
-                raise ValueError("Audio input type specified but no audio_data provided")
-
-            client = self._get_client()
-
-            # Get file name for format detection
-            file_name = state.input_file_path or "audio.mp3"
-
-            # Transcribe using Whisper
-            response = self._transcribe_audio(state.audio_data, file_name)
-
-            # Extract segments if available
-            segments = []
-            if hasattr(response, 'segments') and response.segments:
-                for seg in response.segments:
-                    # Handle both dict and object responses
-                    if isinstance(seg, dict):
-                        text = seg.get('text', '').strip()
-                        start = seg.get('start', 0.0)
-                        end = seg.get('end', 0.0)
-                    else:
-                        text = getattr(seg, 'text', '').strip()
-                        start = getattr(seg, 'start', 0.0)
-                        end = getattr(seg, 'end', 0.0)
-
-                    segments.append(TranscriptSegment(
-                        speaker="Speaker",  # Whisper doesn't do diarization
-                        text=text,
-                        start_time=start,
-                        end_time=end
-                    ))
-
-            transcript = TranscriptData(
-                segments=segments,
-                full_text=response.text,
-                language=getattr(response, 'language', 'en'),
-                confidence=0.95  # Whisper doesn't return confidence scores
-            )
-            state.models_used.append(self.model_name)
+            self._check_audio(state)
+            # Hashing a large file and the store lookup block: run them in a thread
+            store, key, cached = await asyncio.to_thread(self._lookup, state.audio_data)
+            if cached is not None:
+                transcript = self._cache_hit(state, cached)
+            else:
+                transcript = await self._aspeech_transcript(state)
+                if store is not None:
+                    await asyncio.to_thread(save_transcript, store, key, transcript)
 
         else:
             raise ValueError(f"Unknown input type: {state.input_type}")
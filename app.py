@@ -23,8 +23,16 @@ if not os.getenv("OPENAI_API_KEY"):
     st.stop()
 
 # Import after env check
-from graph.workflow import run_analysis
+from graph.workflow import stream_analysis, ESCALATION_EVENT
 from models.schemas import AgentState
+from config.settings import settings
+from ui.progress_tracker import (
+    create_progress_tracker,
+    update_step_status,
+    update_progress,
+    steps_started_by,
+    render_partial_results,
+)
 
 # ===================
 # Sidebar - Sample Data
@@ -54,8 +62,17 @@ with st.sidebar:
 
     st.divider()
     st.markdown("**Pipeline**")
-    st.caption("Validation → Intake → Transcription → Abuse Detection")
-    st.caption("→ Summarization → Critic (loop) → QA Scoring")
+    pipeline_profile = st.radio(
+        "Pipeline profile",
+        options=["full", "fast"],
+        format_func=lambda p: {"full": "Full (multi-agent)", "fast": "Fast (single call)"}[p],
+        help="Fast mode produces the summary, QA scores and abuse flags in one LLM call, without the critic's revision loop"
+    )
+    st.caption("Validation → Intake → Transcription, then")
+    if pipeline_profile == "fast":
+        st.caption("Fast Analysis (summary + QA + abuse in one call)")
+    else:
+        st.caption("in parallel: Abuse Detection ∥ Summarization ⇄ Critic (loop) ∥ QA Scoring")
 
 # ===================
 # Main Content
@@ -140,59 +157,63 @@ with col_right:
         if "last_state" in st.session_state:
             del st.session_state["last_state"]
         
-        # Show progress in left column
-        with progress_container:
-            progress_placeholder = st.empty()
-            with progress_placeholder.container():
-                st.markdown("### ⏳ Processing...")
-                if input_type == "audio":
-                    st.info("Transcribing audio with Whisper API...")
-                else:
-                    st.info("Running workflow analysis...")
-        
-        with st.spinner("Running analysis with guardrails..."):
-            try:
-                # Run the workflow
-                final_state = run_analysis(
-                    raw_input=transcript_input if input_type == "transcript" else "",
-                    input_type=input_type,
-                    input_file_path=file_name,
-                    audio_data=audio_data
-                )
-                st.session_state["last_state"] = final_state
-                
-                # Animate the execution path after completion
-                if final_state.get("execution_path"):
-                    import time
-                    with progress_placeholder.container():
-                        st.markdown("### ✅ Execution Complete")
-                        for i, step in enumerate(final_state["execution_path"], 1):
-                            # Map agent names to display names
-                            step_names = {
-                                "validation": "🛡️ Validation",
-                                "intake": "📥 Intake",
-                                "transcription": "📝 Transcription",
-                                "abuse_detection": "🚨 Abuse Detection",
-                                "summarization": "📋 Summarization",
-                                "summarization_v2": "📋 Summarization (Revision 1)",
-                                "summarization_v3": "📋 Summarization (Revision 2)",
-                                "critic": "🔍 Critic",
-                                "qa_scoring": "📊 QA Scoring"
-                            }
-                            step_display = step_names.get(step, step)
-                            st.success(f"✓ {step_display}")
-                            time.sleep(0.3)  # Brief animation delay
-                        
-                        # Show revision count if any
-                        revision_count = final_state["execution_path"].count("summarization") - 1
-                        if revision_count > 0:
-                            st.warning(f"🔄 Revisions: {revision_count} iteration(s)")
-                
-            except Exception as e:
-                st.error(f"Error running analysis: {e}")
-                import traceback
-                st.code(traceback.format_exc())
-                st.stop()
+        # Live progress tracker in left column, driven by the graph's stream
+        placeholders, steps = create_progress_tracker(progress_container, profile=pipeline_profile)
+        update_step_status(placeholders, steps, "validation", "running")
+        update_progress(placeholders, 0, len(steps), "🛡️ Validation")
+
+        # Partial results render here as soon as each branch produces them
+        partial_placeholder = st.empty()
+
+        completed = set()
+        running = {"validation"}
+        final_state = None
+        try:
+            for node_name, update, partial_state in stream_analysis(
+                raw_input=transcript_input if input_type == "transcript" else "",
+                input_type=input_type,
+                input_file_path=file_name,
+                audio_data=audio_data,
+                profile=pipeline_profile
+            ):
+                if node_name == ESCALATION_EVENT:
+                    # Raised mid-stream, before abuse detection has finished
+                    flag = update["escalation"].flag
+                    quote = f': "{flag.evidence[0]}"' if flag.evidence else ""
+                    st.toast(f"🚨 Escalation: high-severity {', '.join(t.value for t in flag.abuse_type)}{quote}")
+                    continue
+
+                final_state = partial_state
+                completed.add(node_name)
+                running.discard(node_name)
+                update_step_status(placeholders, steps, node_name, "completed")
+
+                for step_id in steps_started_by(node_name, partial_state):
+                    running.add(step_id)
+                    update_step_status(placeholders, steps, step_id, "running")
+
+                current = ", ".join(s["name"] for s in steps if s["id"] in running)
+                update_progress(placeholders, len(completed), len(steps), current)
+
+                with partial_placeholder.container():
+                    render_partial_results(partial_state)
+
+            partial_placeholder.empty()
+            st.session_state["last_state"] = final_state
+
+            # Show revision count if any
+            revision_count = (final_state or {}).get("revision_count", 0)
+            if revision_count > 0:
+                with progress_container:
+                    st.warning(f"🔄 Revisions: {revision_count} iteration(s)")
+
+        except Exception as e:
+            for step_id in running:
+                update_step_status(placeholders, steps, step_id, "error")
+            st.error(f"Error running analysis: {e}")
+            import traceback
+            st.code(traceback.format_exc())
+            st.stop()
 
     # Display results if available
     if "last_state" in st.session_state:
@@ -365,7 +386,7 @@ with col_right:
             # Revision status
             if state["revision_count"] > 0:
                 if critique.needs_revision:
-                    st.warning(f"⚠️ Revision {state['revision_count']}/3: Summary needs improvement")
+                    st.warning(f"⚠️ Revision {state['revision_count']}/{settings.MAX_REVISION_COUNT}: Summary needs improvement")
                 else:
                     st.success(f"✅ Summary approved after {state['revision_count']} revision(s)")
             else:
@@ -374,6 +395,13 @@ with col_right:
                 else:
                     st.success("✅ Summary approved on first attempt")
             
+            # Score per summary version - the best one is kept, not necessarily the last
+            history = state.get("critique_history") or []
+            if len(history) > 1:
+                scores = " → ".join(f"{c.overall:.1f}" for c in history)
+                best = max(range(len(history)), key=lambda i: history[i].overall)
+                st.caption(f"Overall score by version: {scores} (showing v{best + 1})")
+            
             # Feedback
             with st.expander("Detailed Critique Feedback"):
                 st.markdown(critique.feedback)
@@ -398,7 +426,7 @@ with col_right:
         if run_eval and state.get("summary") and state.get("transcript"):
             with st.spinner("Running evaluation..."):
                 try:
-                    from evaluation.evaluators import FaithfulnessEvaluator, CompletenessEvaluator, QAScoreValidator
+                    from evaluation.evaluators import get_faithfulness_evaluator, get_completeness_evaluator, QAScoreValidator
 
                     # Prepare summary dict
                     summary = state["summary"]
@@ -410,10 +438,10 @@ with col_right:
                     transcript_text = state["transcript"].full_text if hasattr(state["transcript"], "full_text") else str(state["transcript"])
 
                     # Run evaluators
-                    faith_eval = FaithfulnessEvaluator()
+                    faith_eval = get_faithfulness_evaluator()
                     faith_result = faith_eval.evaluate(transcript_text, summary_dict)
 
-                    comp_eval = CompletenessEvaluator()
+                    comp_eval = get_completeness_evaluator()
                     comp_result = comp_eval.evaluate(transcript_text, summary_dict)
 
                     qa_validator = QAScoreValidator()
@@ -495,6 +523,29 @@ with col_right:
         with st.expander("Pipeline Execution"):
             st.write(f"**Execution Path**: {' → '.join(state['execution_path'])}")
             st.write(f"**Models Used**: {', '.join(state['models_used'])}")
+            speech_trim = state.get("speech_trim")
+            if speech_trim:
+                st.write(
+                    f"**Silence Trimming**: {speech_trim.original_seconds:.0f}s → "
+                    f"{speech_trim.trimmed_seconds:.0f}s ({speech_trim.removed_ratio:.0%} cut in "
+                    f"{speech_trim.cuts} spans, {speech_trim.trim_ms:.0f}ms)"
+                )
+            audio_encoding = state.get("audio_encoding")
+            if audio_encoding:
+                st.write(
+                    f"**Audio Pre-encoding**: {audio_encoding.original_bytes / 1e6:.1f} MB → "
+                    f"{audio_encoding.encoded_bytes / 1e6:.1f} MB ({audio_encoding.saved_ratio:.0%} saved, "
+                    f"{audio_encoding.codec}, encoded in {audio_encoding.encode_ms:.0f}ms)"
+                )
+            compaction = state.get("compaction")
+            if compaction:
+                st.write(
+                    f"**Transcript Compaction**: {compaction.original_tokens:,} → "
+                    f"{compaction.compacted_tokens:,} tokens per prompt "
+                    f"({compaction.saved_ratio:.0%} saved, {compaction.tokenizer})"
+                )
+            from ui.node_waterfall import render_node_waterfall
+            render_node_waterfall(state)
 
         # Raw state JSON
         with st.expander("Raw State JSON"):
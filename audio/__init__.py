@@ -0,0 +1 @@
+# Audio processing ahead of transcription
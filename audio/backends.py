@@ -0,0 +1,213 @@
+"""
+Speech-to-text backends behind the transcription agent
+
+Every backend returns a Whisper verbose_json-shaped response: an object
+with text, language and segments, each segment having text, start and end.
+The agent builds TranscriptData from that response, whichever engine
+produced it.
+
+- "openai": the Whisper API (whisper-1), rate-limited and retried
+- "local": faster-whisper (CTranslate2) on this machine's CPU, loaded from
+  settings.LOCAL_STT_MODEL_PATH
+- "stub": canned text, with no network access or model, for offline tests
+
+settings.TRANSCRIPTION_BACKEND picks the default. A request can pick
+another backend through the "transcription" entry of its model overrides
+(see graph/workflow.py DEFAULT_MODELS). Further engines are added with
+register_backend().
+
+Only remote backends have an upload limit, so only their audio is
+pre-encoded and chunked before transcription.
+"""
+
+import asyncio
+import io
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import PurePath
+from types import SimpleNamespace
+from typing import Callable, Dict
+
+from config.settings import settings
+from llm.clients import async_openai_client, openai_client
+from llm.rate_limit import get_rate_limiter
+
+
+class TranscriptionBackend(ABC):
+    """Speech-to-text engine: audio bytes in, verbose_json-shaped response out"""
+
+    name = "transcription"  # reported in models_used and part of transcript cache keys
+    remote = False  # True when audio is uploaded, so size limits and upload time apply
+
+    @abstractmethod
+    def transcribe(self, audio_data: bytes, file_name: str):
+        """Transcribe a recording; file_name tells the engine its format"""
+
+    async def atranscribe(self, audio_data: bytes, file_name: str):
+        """Async version of transcribe; runs it in a thread unless overridden"""
+        return await asyncio.to_thread(self.transcribe, audio_data, file_name)
+
+
+def _audio_file(audio_data: bytes, file_name: str) -> io.BytesIO:
+    """Wrap bytes in a file-like object with the correct name
+
+    The name tells the engine the audio format
+    """
+    audio_file = io.BytesIO(audio_data)
+    audio_file.name = file_name
+    return audio_file
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """OpenAI Whisper API, on the shared connection pools"""
+
+    remote = True
+
+    def __init__(self, model: str = "whisper-1"):
+        self.name = model
+        self.client = None  # Lazy initialization
+        self.async_client = None  # Lazy initialization
+
+    def _get_api_key(self) -> str:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not set")
+        return api_key
+
+    def _get_client(self):
+        if self.client is None:
+            self.client = openai_client(self._get_api_key())
+        return self.client
+
+    def _get_async_client(self):
+        if self.async_client is None:
+            self.async_client = async_openai_client(self._get_api_key())
+        return self.async_client
+
+    def transcribe(self, audio_data: bytes, file_name: str):
+        client = self._get_client()
+        # Throttled and retried; each attempt re-wraps the bytes
+        return get_rate_limiter("openai", self.name).call(
+            lambda: client.audio.transcriptions.create(
+                model=self.name,
+                file=_audio_file(audio_data, file_name),
+                response_format="verbose_json"  # Get detailed response with segments
+            )
+        )
+
+    async def atranscribe(self, audio_data: bytes, file_name: str):
+        client = self._get_async_client()
+        return await get_rate_limiter("openai", self.name).acall(
+            lambda: client.audio.transcriptions.create(
+                model=self.name,
+                file=_audio_file(audio_data, file_name),
+                response_format="verbose_json"
+            )
+        )
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """faster-whisper on the local CPU
+
+    The model is loaded on first use and shared by every transcription.
+    Up to LOCAL_STT_WORKERS transcriptions run at once; more wait for a
+    worker.
+    """
+
+    def __init__(self, model_path: str = None):
+        self.model_path = model_path if model_path is not None else settings.LOCAL_STT_MODEL_PATH
+        self.name = f"local:{PurePath(self.model_path).name or 'unconfigured'}"
+        self._model = None
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(settings.LOCAL_STT_WORKERS)
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                if not self.model_path:
+                    raise ValueError("TRANSCRIPTION_BACKEND=local needs LOCAL_STT_MODEL_PATH (a faster-whisper model directory)")
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError as e:
+                    raise ImportError("The local transcription backend needs faster-whisper (pip install faster-whisper)") from e
+
+                self._model = WhisperModel(
+                    self.model_path,
+                    device="cpu",
+                    compute_type=settings.LOCAL_STT_COMPUTE_TYPE,
+                    cpu_threads=settings.LOCAL_STT_CPU_THREADS,
+                    num_workers=settings.LOCAL_STT_WORKERS,
+                    local_files_only=True,
+                )
+        return self._model
+
+    def transcribe(self, audio_data: bytes, file_name: str):
+        model = self._get_model()
+        with self._slots:
+            segments, info = model.transcribe(_audio_file(audio_data, file_name), beam_size=settings.LOCAL_STT_BEAM_SIZE)
+            # Segments are decoded lazily, as the generator is consumed
+            segments = [{"text": s.text, "start": s.start, "end": s.end} for s in segments]
+        return SimpleNamespace(
+            text="".join(segment["text"] for segment in segments).strip(),
+            language=info.language,
+            segments=segments,
+        )
+
+
+class StubBackend(TranscriptionBackend):
+    """Canned transcript, one segment per line, for tests and offline runs"""
+
+    name = "stub"
+
+    def __init__(self, text: str = "Customer: Hello, I have a question about my bill.\nAgent: Sure, let me check your account.",
+                 seconds_per_line: float = 3.0):
+        self.text = text
+        self.seconds_per_line = seconds_per_line
+
+    def transcribe(self, audio_data: bytes, file_name: str):
+        lines = [line.strip() for line in self.text.splitlines() if line.strip()]
+        return SimpleNamespace(
+            text=" ".join(lines),
+            language="en",
+            segments=[
+                {"text": line, "start": i * self.seconds_per_line, "end": (i + 1) * self.seconds_per_line}
+                for i, line in enumerate(lines)
+            ],
+        )
+
+    async def atranscribe(self, audio_data: bytes, file_name: str):
+        return self.transcribe(audio_data, file_name)
+
+
+_factories: Dict[str, Callable[[], TranscriptionBackend]] = {
+    "openai": OpenAIWhisperBackend,
+    "local": LocalWhisperBackend,
+    "stub": StubBackend,
+}
+_backends: Dict[str, TranscriptionBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], TranscriptionBackend]) -> None:
+    """Make a backend selectable by name (replaces any backend of that name)"""
+    with _backends_lock:
+        _factories[name] = factory
+        _backends.pop(name, None)
+
+
+def backend_names() -> tuple:
+    return tuple(_factories)
+
+
+def get_backend(name: str = None) -> TranscriptionBackend:
+    """Return the shared backend of that name (default: settings.TRANSCRIPTION_BACKEND)"""
+    name = name or settings.TRANSCRIPTION_BACKEND
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            factory = _factories.get(name)
+            if factory is None:
+                raise ValueError(f"Unknown transcription backend: {name} (expected one of {', '.join(_factories)})")
+            backend = _backends[name] = factory()
+    return backend
@@ -0,0 +1,196 @@
+"""
+Silence-aware chunking of long recordings for parallel transcription
+
+Whisper takes at most 25 MB per request, and a single request for a long
+call takes as long as the whole upload plus the whole transcription. Long
+recordings are split into chunks instead, and the chunks are transcribed
+concurrently (see TranscriptionAgent). Each chunk is bounded both in
+duration and in encoded size.
+
+- Each cut is placed in the last silence found in a window before the
+  duration limit, so words are rarely split.
+- Where no silence is found, the cut is forced at the limit. The next chunk
+  then starts slightly earlier, so a word cut in one chunk is heard whole in
+  the other.
+- Stitching shifts every chunk's segments by the chunk's start time. In an
+  overlap, each segment is kept from one chunk only: the chunk whose side of
+  the overlap's midpoint holds the segment's midpoint.
+
+Decoding and encoding use pydub, which needs ffmpeg for compressed formats.
+pydub is imported only when a file is large enough to be chunked. Planning
+and stitching are pure functions over milliseconds.
+"""
+
+import importlib.util
+import io
+import re
+from pathlib import PurePath
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from config.settings import settings
+from models.schemas import TranscriptSegment
+
+# Formats Whisper accepts that pydub can write without extra codec options;
+# everything else is re-encoded as mp3
+_EXPORT_FORMATS = {"wav": "wav", "mp3": "mp3", "ogg": "ogg", "oga": "ogg", "flac": "flac"}
+_MP3_BYTES_PER_MS = 16  # pydub's default mp3 export is 128 kbit/s
+
+
+class AudioChunk(NamedTuple):
+    """One piece of a recording, encoded for upload"""
+    data: bytes
+    file_name: str
+    start_ms: int
+    end_ms: int
+
+
+def chunking_available() -> bool:
+    """Whether long recordings can be chunked (enabled and pydub installed)"""
+    return settings.AUDIO_CHUNKING and importlib.util.find_spec("pydub") is not None
+
+
+def export_format(source_format: Optional[str]) -> str:
+    """Format to write re-cut audio in, given the source file's format"""
+    return _EXPORT_FORMATS.get(source_format, "mp3")
+
+
+def needs_chunking(audio_data: bytes) -> bool:
+    """Whether a recording is large enough to be decoded and split"""
+    return chunking_available() and len(audio_data) > settings.AUDIO_CHUNK_THRESHOLD_MB * 1024 * 1024
+
+
+def plan_chunks(
+    duration_ms: int,
+    max_chunk_ms: int,
+    overlap_ms: int,
+    search_ms: int,
+    find_cut: Callable[[int, int], Optional[int]]
+) -> List[Tuple[int, int]]:
+    """Chunk boundaries (start_ms, end_ms) covering a recording
+
+    Args:
+        duration_ms: Length of the recording
+        max_chunk_ms: Longest allowed chunk
+        overlap_ms: Overlap after a forced (non-silent) cut
+        search_ms: How far before each limit to look for a silence
+        find_cut: Returns a cut point in silence within [start, end), or None
+    """
+    if overlap_ms * 2 >= max_chunk_ms:
+        raise ValueError("Chunk overlap must be less than half the chunk length")
+
+    chunks = []
+    start = 0
+    while duration_ms - start > max_chunk_ms:
+        limit = start + max_chunk_ms
+        # Never cut in the first half of a chunk, so chunks stay long
+        cut = find_cut(max(limit - search_ms, start + max_chunk_ms // 2), limit)
+        if cut is not None:
+            chunks.append((start, cut))
+            start = cut
+        else:
+            chunks.append((start, limit))
+            start = limit - overlap_ms
+    chunks.append((start, duration_ms))
+    return chunks
+
+
+def _split_in_half(start: int, end: int, overlap_ms: int) -> List[Tuple[int, int]]:
+    middle = (start + end) // 2
+    return [(start, middle), (max(start, middle - overlap_ms), end)]
+
+
+def split_audio(
+    audio_data: bytes,
+    file_name: str = "audio.mp3",
+    max_chunk_seconds: Optional[float] = None,
+    max_chunk_mb: Optional[float] = None,
+    overlap_seconds: Optional[float] = None
+) -> List[AudioChunk]:
+    """Split a recording into encoded chunks, cut at silences where possible
+
+    Returns a single chunk holding the original bytes when the recording
+    already fits within both bounds.
+    """
+    from pydub import AudioSegment
+    from pydub.silence import detect_silence
+
+    max_chunk_seconds = settings.AUDIO_CHUNK_MAX_SECONDS if max_chunk_seconds is None else max_chunk_seconds
+    max_bytes = int((settings.AUDIO_CHUNK_MAX_MB if max_chunk_mb is None else max_chunk_mb) * 1024 * 1024)
+    overlap_ms = int((settings.AUDIO_CHUNK_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds) * 1000)
+
+    path = PurePath(file_name)
+    source_format = path.suffix.lstrip(".").lower() or None
+    audio = AudioSegment.from_file(io.BytesIO(audio_data), format=source_format)
+    duration_ms = len(audio)
+    if duration_ms <= max_chunk_seconds * 1000 and len(audio_data) <= max_bytes:
+        return [AudioChunk(audio_data, file_name, 0, duration_ms)]
+
+    target_format = export_format(source_format)
+    bytes_per_ms = audio.frame_rate * audio.frame_width / 1000 if target_format == "wav" else _MP3_BYTES_PER_MS
+    # Leave headroom for container overhead and variable bitrates
+    max_chunk_ms = int(min(max_chunk_seconds * 1000, 0.9 * max_bytes / bytes_per_ms))
+    silence_thresh = audio.dBFS - settings.AUDIO_SILENCE_THRESHOLD_DB
+
+    def find_cut(start: int, end: int) -> Optional[int]:
+        silences = detect_silence(audio[start:end], min_silence_len=settings.AUDIO_SILENCE_MIN_MS,
+                                  silence_thresh=silence_thresh, seek_step=10)
+        if not silences:
+            return None
+        silence_start, silence_end = silences[-1]  # closest to the limit
+        return start + (silence_start + silence_end) // 2
+
+    bounds = plan_chunks(duration_ms, max_chunk_ms, overlap_ms,
+                         int(settings.AUDIO_SILENCE_SEARCH_SECONDS * 1000), find_cut)
+
+    chunks = []
+    while bounds:
+        start, end = bounds.pop(0)
+        buffer = io.BytesIO()
+        audio[start:end].export(buffer, format=target_format)
+        data = buffer.getvalue()
+        if len(data) > max_bytes and end - start > 2 * overlap_ms + 1000:
+            # The size estimate was off for this stretch: split it further
+            bounds[:0] = _split_in_half(start, end, overlap_ms)
+            continue
+        name = f"{path.stem}.part{len(chunks) + 1}.{target_format}"
+        chunks.append(AudioChunk(data, name, start, end))
+    return chunks
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r"[^\w]+", " ", text).strip().lower()
+
+
+def stitch_segments(
+    bounds: Sequence[Tuple[int, int]],
+    chunk_segments: Sequence[Sequence[TranscriptSegment]]
+) -> List[TranscriptSegment]:
+    """Merge per-chunk segments onto the recording's timeline
+
+    Args:
+        bounds: (start_ms, end_ms) of each chunk, in order
+        chunk_segments: Segments of each chunk, timed from the chunk's start
+    """
+    # Where each chunk takes over from the previous one: the middle of their overlap
+    seams = [0.0] + [
+        (start + max(start, previous_end)) / 2000
+        for (_, previous_end), (start, _) in zip(bounds, bounds[1:])
+    ] + [float("inf")]
+
+    stitched = []
+    for i, ((start, _), segments) in enumerate(zip(bounds, chunk_segments)):
+        offset = start / 1000
+        for segment in segments:
+            shifted = segment.model_copy(update={
+                "start_time": segment.start_time + offset,
+                "end_time": segment.end_time + offset,
+            })
+            middle = (shifted.start_time + shifted.end_time) / 2
+            if not seams[i] <= middle < seams[i + 1]:
+                continue
+            # The same words heard on both sides of a seam
+            if stitched and _normalized(stitched[-1].text) == _normalized(shifted.text) \
+                    and shifted.start_time < stitched[-1].end_time:
+                continue
+            stitched.append(shifted)
+    return stitched
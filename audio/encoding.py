@@ -0,0 +1,129 @@
+"""
+Pre-encoding of call audio into a compact speech format before upload
+
+Recordings arrive as the user supplied them, often as 44.1 kHz stereo WAV,
+about ten times larger than speech recognition needs. When
+settings.AUDIO_PREENCODE is on, the transcription agent first re-encodes
+each recording:
+
+- downmix to mono
+- resample to 16 kHz, the rate Whisper resamples to anyway
+- encode with Opus, a speech-oriented codec, in an Ogg container
+
+Smaller uploads finish sooner, and longer calls fit in a single Whisper
+request. The original bytes are sent instead whenever encoding doesn't make
+them smaller, or fails (e.g. an ffmpeg build without libopus): pre-encoding
+is only an optimization, so it never fails a transcription.
+
+Decoding and encoding are CPU-bound. They run in a process pool shared by
+all agents, off the event loop and outside the GIL.
+"""
+
+import asyncio
+import importlib.util
+import io
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import PurePath
+from typing import NamedTuple, Optional
+
+from config.settings import settings
+from models.schemas import AudioEncodingStats
+
+logger = logging.getLogger(__name__)
+
+ENCODED_FORMAT = "ogg"
+ENCODED_CODEC = "libopus"
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+class EncodedAudio(NamedTuple):
+    """Audio to upload, and what pre-encoding saved"""
+    data: bytes
+    file_name: str
+    stats: AudioEncodingStats
+
+
+def preencode_available() -> bool:
+    """Whether audio is pre-encoded (enabled and pydub installed)"""
+    return settings.AUDIO_PREENCODE and importlib.util.find_spec("pydub") is not None
+
+
+def encode_for_speech(audio_data: bytes, file_name: str, sample_rate: int, bitrate: str) -> bytes:
+    """Decode audio and re-encode it as mono Opus at the given sample rate
+
+    Runs in a worker process, so it takes every setting as an argument.
+    """
+    from pydub import AudioSegment
+
+    source_format = PurePath(file_name).suffix.lstrip(".").lower() or None
+    audio = AudioSegment.from_file(io.BytesIO(audio_data), format=source_format)
+    audio = audio.set_channels(1).set_frame_rate(sample_rate)
+
+    buffer = io.BytesIO()
+    audio.export(buffer, format=ENCODED_FORMAT, codec=ENCODED_CODEC, bitrate=bitrate)
+    return buffer.getvalue()
+
+
+def get_encoder_pool() -> Executor:
+    """Process-wide worker pool for audio encoding"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the app process runs graph nodes on threads
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.AUDIO_PREENCODE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _pool
+
+
+def _submit(audio_data: bytes, file_name: str):
+    return get_encoder_pool().submit(
+        encode_for_speech, audio_data, file_name,
+        settings.AUDIO_PREENCODE_SAMPLE_RATE, settings.AUDIO_PREENCODE_BITRATE,
+    )
+
+
+def _result(audio_data: bytes, file_name: str, encoded: Optional[bytes], started: float,
+            error: Optional[Exception] = None) -> EncodedAudio:
+    """The smaller of the original and the encoded audio; encoded is None when encoding failed"""
+    if error is not None:
+        logger.warning("Pre-encoding %s failed, uploading the original: %s", file_name, error)
+    applied = encoded is not None and len(encoded) < len(audio_data)
+    stats = AudioEncodingStats(
+        original_bytes=len(audio_data),
+        encoded_bytes=len(audio_data if encoded is None else encoded),
+        encode_ms=(time.perf_counter() - started) * 1000,
+        codec=f"opus {settings.AUDIO_PREENCODE_BITRATE}, {settings.AUDIO_PREENCODE_SAMPLE_RATE} Hz mono",
+        applied=applied,
+        error=None if error is None else str(error),
+    )
+    if not applied:
+        return EncodedAudio(audio_data, file_name, stats)
+    return EncodedAudio(encoded, f"{PurePath(file_name).stem}.{ENCODED_FORMAT}", stats)
+
+
+def preencode(audio_data: bytes, file_name: str) -> EncodedAudio:
+    """Re-encode audio for upload in the worker pool, keeping whichever is smaller"""
+    started = time.perf_counter()
+    try:
+        encoded = _submit(audio_data, file_name).result()
+    except Exception as e:
+        return _result(audio_data, file_name, None, started, e)
+    return _result(audio_data, file_name, encoded, started)
+
+
+async def apreencode(audio_data: bytes, file_name: str) -> EncodedAudio:
+    """Async version of preencode"""
+    started = time.perf_counter()
+    try:
+        encoded = await asyncio.wrap_future(_submit(audio_data, file_name))
+    except Exception as e:
+        return _result(audio_data, file_name, None, started, e)
+    return _result(audio_data, file_name, encoded, started)
@@ -0,0 +1,173 @@
+"""
+Live call audio: frame sources and utterance endpointing
+
+A live call arrives as a stream of short PCM frames (16-bit mono at the
+call's sample rate). UtteranceSegmenter buffers the frames and cuts the
+stream into utterances at pauses, so each utterance can be transcribed
+while the call goes on:
+
+- Frames quieter than settings.LIVE_SILENCE_DB are pauses.
+- An utterance ends after LIVE_ENDPOINT_MS of pause following speech, or
+  at LIVE_MAX_UTTERANCE_SECONDS in any case.
+- Leading silence is dropped, apart from a short pre-roll, and stretches
+  without speech are never sent for transcription.
+
+FileFrameSource replays a finished recording as such a stream, at real-time
+speed by default, so live analysis can be exercised without a phone line.
+WAV needs only the standard library; other formats are decoded with pydub.
+"""
+
+import asyncio
+import io
+import wave
+from pathlib import PurePath
+from typing import AsyncIterator, List, NamedTuple, Optional
+
+from audio.vad import frame_features, load_audioop
+from config.settings import settings
+
+SAMPLE_WIDTH = 2  # bytes: 16-bit PCM
+_PRE_ROLL_MS = 200  # kept before the first loud frame, so word onsets survive
+
+
+class Utterance(NamedTuple):
+    """Speech between two pauses, with its place on the call timeline"""
+    pcm: bytes
+    start_ms: int
+    end_ms: int
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap 16-bit mono PCM in a WAV container for upload"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class UtteranceSegmenter:
+    """Cuts a stream of PCM frames into utterances at pauses
+
+    feed() takes frames of any length and returns the utterances they
+    complete; flush() returns what is left when the call ends.
+    """
+
+    def __init__(self, sample_rate: int, frame_ms: int = None, silence_db: float = None,
+                 endpoint_ms: int = None, max_utterance_ms: int = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms or settings.AUDIO_VAD_FRAME_MS
+        self.silence_db = settings.LIVE_SILENCE_DB if silence_db is None else silence_db
+        self.endpoint_ms = settings.LIVE_ENDPOINT_MS if endpoint_ms is None else endpoint_ms
+        self.max_utterance_ms = (int(settings.LIVE_MAX_UTTERANCE_SECONDS * 1000)
+                                 if max_utterance_ms is None else max_utterance_ms)
+
+        self._frame_bytes = int(sample_rate * self.frame_ms / 1000) * SAMPLE_WIDTH
+        self._buffer = bytearray()  # current utterance, analyzed frames first
+        self._analyzed = 0  # bytes of _buffer already classified
+        self._start_ms = 0  # call time of _buffer[0]
+        self._heard_speech = False
+        self._pause_ms = 0
+
+    @property
+    def position_ms(self) -> int:
+        """Call time up to which audio has been analyzed"""
+        return self._start_ms + self._ms(self._analyzed)
+
+    def _ms(self, size: int) -> int:
+        return size * 1000 // (self.sample_rate * SAMPLE_WIDTH)
+
+    def _cut(self, size: int) -> Utterance:
+        """Emit the first size bytes of the buffer as an utterance"""
+        utterance = Utterance(bytes(self._buffer[:size]), self._start_ms, self._start_ms + self._ms(size))
+        del self._buffer[:size]
+        self._analyzed -= size
+        self._start_ms = utterance.end_ms
+        self._heard_speech = False
+        self._pause_ms = 0
+        return utterance
+
+    def _drop_leading_silence(self) -> None:
+        excess = self._analyzed - _PRE_ROLL_MS * self.sample_rate * SAMPLE_WIDTH // 1000
+        excess -= excess % self._frame_bytes
+        if excess > 0:
+            del self._buffer[:excess]
+            self._analyzed -= excess
+            self._start_ms += self._ms(excess)
+
+    def feed(self, frame: bytes) -> List[Utterance]:
+        self._buffer.extend(frame)
+        utterances = []
+        while len(self._buffer) - self._analyzed >= self._frame_bytes:
+            chunk = bytes(self._buffer[self._analyzed:self._analyzed + self._frame_bytes])
+            loudness = frame_features(chunk, SAMPLE_WIDTH, self.sample_rate, self.frame_ms)[0][0]
+            self._analyzed += self._frame_bytes
+
+            if loudness > self.silence_db:
+                self._heard_speech = True
+                self._pause_ms = 0
+            else:
+                self._pause_ms += self.frame_ms
+
+            if not self._heard_speech:
+                self._drop_leading_silence()
+            elif self._pause_ms >= self.endpoint_ms or self._ms(self._analyzed) >= self.max_utterance_ms:
+                utterances.append(self._cut(self._analyzed))
+        return utterances
+
+    def flush(self) -> Optional[Utterance]:
+        """The unfinished utterance at the end of the call, if it holds speech"""
+        if not self._heard_speech:
+            return None
+        return self._cut(len(self._buffer))
+
+
+class FileFrameSource:
+    """Replays a recording as live 16-bit mono PCM frames
+
+    Frames come at real-time speed; speed=2.0 replays twice as fast and
+    speed=0 as fast as they can be consumed.
+    """
+
+    def __init__(self, audio_data: bytes, file_name: str, frame_ms: int = 20, speed: float = 1.0):
+        self.frame_ms = frame_ms
+        self.speed = speed
+        self.pcm, self.sample_rate = self._decode(audio_data, file_name)
+
+    @staticmethod
+    def _decode(audio_data: bytes, file_name: str):
+        source_format = PurePath(file_name).suffix.lstrip(".").lower() or None
+        if source_format == "wav":
+            with wave.open(io.BytesIO(audio_data), "rb") as wav:
+                pcm = wav.readframes(wav.getnframes())
+                width, channels, rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+            audioop = load_audioop()
+            if channels == 2:
+                pcm = audioop.tomono(pcm, width, 0.5, 0.5)
+            elif channels != 1:
+                raise ValueError(f"Unsupported channel count for live replay: {channels}")
+            if width != SAMPLE_WIDTH:
+                pcm = audioop.lin2lin(pcm, width, SAMPLE_WIDTH)
+            return pcm, rate
+
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(io.BytesIO(audio_data), format=source_format)
+        audio = audio.set_channels(1).set_sample_width(SAMPLE_WIDTH)
+        return audio.raw_data, audio.frame_rate
+
+    @property
+    def duration_ms(self) -> int:
+        return len(self.pcm) * 1000 // (self.sample_rate * SAMPLE_WIDTH)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        frame_bytes = int(self.sample_rate * self.frame_ms / 1000) * SAMPLE_WIDTH
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for index, offset in enumerate(range(0, len(self.pcm), frame_bytes)):
+            if self.speed > 0:
+                # Schedule against the start, so per-frame delays don't accumulate
+                due = started + index * self.frame_ms / 1000 / self.speed
+                await asyncio.sleep(max(due - loop.time(), 0))
+            yield self.pcm[offset:offset + frame_bytes]
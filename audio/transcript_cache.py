@@ -0,0 +1,92 @@
+"""
+Transcript cache for re-submitted recordings
+
+The same recording is often uploaded again, by a reviewer, a re-run or a
+retry after a downstream failure. The transcription agent hashes the audio
+bytes and looks the transcript up here before calling Whisper. The hash is
+fed in blocks, so large files are never copied whole, and file objects are
+read block by block.
+
+Keys combine the content hash with everything else that shapes the
+transcript: the model and the audio preprocessing settings. Entries live in
+a SQLite file (TRANSCRIPT_CACHE_PATH), or in Redis when REDIS_URL is set, so
+that every replica shares them.
+"""
+
+import hashlib
+import json
+import threading
+from typing import BinaryIO, Optional, Union
+
+from config.settings import settings
+from llm.stores import MemoryStore, RedisStore, SQLiteStore, get_redis_client
+from models.schemas import TranscriptData
+
+HASH_BLOCK_BYTES = 1 << 20
+
+_transcript_store = None
+_transcript_store_lock = threading.Lock()
+
+
+def get_transcript_store():
+    """Return the process-wide transcript store, or None when the cache is disabled"""
+    global _transcript_store
+
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return None
+
+    with _transcript_store_lock:
+        if _transcript_store is None:
+            ttl = settings.TRANSCRIPT_CACHE_TTL_SECONDS
+            redis_client = get_redis_client()
+            if redis_client is not None:
+                _transcript_store = RedisStore(
+                    redis_client,
+                    namespace=f"{settings.CACHE_KEY_PREFIX}:transcript",
+                    ttl_seconds=ttl,
+                    fallback=MemoryStore(max_entries=256, ttl_seconds=ttl),
+                )
+            elif settings.TRANSCRIPT_CACHE_PATH:
+                _transcript_store = SQLiteStore(
+                    settings.TRANSCRIPT_CACHE_PATH, max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES, ttl_seconds=ttl
+                )
+            else:
+                _transcript_store = MemoryStore(max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES, ttl_seconds=ttl)
+    return _transcript_store
+
+
+def audio_digest(audio: Union[bytes, BinaryIO]) -> str:
+    """SHA-256 of audio bytes or of a binary file object, hashed block by block"""
+    digest = hashlib.sha256()
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        view = memoryview(audio)
+        for offset in range(0, len(view), HASH_BLOCK_BYTES):
+            digest.update(view[offset:offset + HASH_BLOCK_BYTES])
+    else:
+        for block in iter(lambda: audio.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transcript_key(audio: Union[bytes, BinaryIO], model: str) -> str:
+    """Cache key of a recording's transcript under the current settings"""
+    config = json.dumps(
+        [settings.TRANSCRIPT_CACHE_NAMESPACE, model, settings.AUDIO_VAD_TRIM, settings.AUDIO_PREENCODE],
+        sort_keys=True
+    )
+    return hashlib.sha256(f"{config}\0{audio_digest(audio)}".encode("utf-8")).hexdigest()
+
+
+def load_transcript(store, key: str) -> Optional[TranscriptData]:
+    """Return a cached transcript, or None on a miss or an unreadable entry"""
+    value = store.get(key)
+    if value is None:
+        return None
+    try:
+        return TranscriptData.model_validate_json(value)
+    except ValueError:
+        return None  # written by an incompatible schema version
+
+
+def save_transcript(store, key: str, transcript: TranscriptData) -> None:
+    store.set(key, transcript.model_dump_json())
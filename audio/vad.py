@@ -0,0 +1,254 @@
+"""
+Voice-activity trimming of silence and hold music before transcription
+
+Recordings often hold minutes of silence or hold music. Whisper processes
+and bills that audio like speech. When settings.AUDIO_VAD_TRIM is on, the
+transcription agent first cuts the long non-speech stretches:
+
+- The decoded audio is downmixed to 8 kHz mono and cut into short frames.
+  Each frame gets its loudness (RMS, in dBFS) and its zero-crossing rate,
+  a cheap measure of where its energy sits in the spectrum.
+- A frame is loud when it is well above the recording's noise floor.
+- Speech alternates syllables, pauses, voiced and unvoiced sounds, so over
+  a second its loudness and zero-crossing rate swing widely. Hold music is
+  loud but steady. A loud frame counts as speech only if one of the two
+  measures swings enough around it.
+- Speech runs are padded, and only non-speech stretches longer than
+  AUDIO_VAD_MIN_CUT_SECONDS are cut. Normal pauses are kept.
+
+The kept spans are joined into the audio sent to Whisper, and an OffsetMap
+moves segment times back onto the original recording. When no speech is
+found, nothing is cut.
+
+Frame analysis uses audioop (stdlib, or the audioop-lts package on Python
+3.13+), so it runs in C without numpy. It is imported on first use, so the
+pipeline imports without it. Decoding and encoding use pydub.
+"""
+
+import importlib.util
+import io
+import math
+import time
+import warnings
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from pathlib import PurePath
+from typing import List, NamedTuple, Sequence, Tuple
+
+from audio.chunking import export_format
+from config.settings import settings
+from models.schemas import SpeechTrimStats, TranscriptSegment
+
+ANALYSIS_RATE = 8000  # Hz; the speech band fits below 4 kHz
+SILENCE_DB = -100.0  # loudness of a digitally silent frame
+_NOISE_FLOOR_PERCENTILE = 0.1
+_MODULATION_WINDOW_MS = 1000
+_ZCR_MODULATION = 0.05  # swing (std) in zero-crossing rate of speech
+
+Span = Tuple[int, int]  # (start_ms, end_ms)
+
+
+class OffsetMap:
+    """Maps times in trimmed audio back onto the original recording
+
+    The trimmed audio is the kept spans of the original, back to back.
+    """
+
+    def __init__(self, kept: Sequence[Span], duration_ms: int):
+        self.kept = list(kept)
+        self.duration_ms = duration_ms
+        self._starts = []  # where each kept span starts in the trimmed audio
+        position = 0
+        for start, end in self.kept:
+            self._starts.append(position)
+            position += end - start
+        self.trimmed_ms = position
+
+    @property
+    def removed_ms(self) -> int:
+        return self.duration_ms - self.trimmed_ms
+
+    def to_original(self, seconds: float, end: bool = False) -> float:
+        """Original-recording time of a time in the trimmed audio
+
+        A time on a cut maps to the start of the next span, or with end=True
+        to the end of the previous one.
+        """
+        if not self.kept:
+            return seconds
+        ms = seconds * 1000
+        index = (bisect_left if end else bisect_right)(self._starts, ms) - 1
+        index = min(max(index, 0), len(self.kept) - 1)
+        start, stop = self.kept[index]
+        return min(start + max(ms - self._starts[index], 0), stop) / 1000
+
+    def remap(self, segments: List[TranscriptSegment]) -> List[TranscriptSegment]:
+        """Segments with their times moved onto the original recording"""
+        return [
+            segment.model_copy(update={
+                "start_time": self.to_original(segment.start_time),
+                "end_time": self.to_original(segment.end_time, end=True),
+            })
+            for segment in segments
+        ]
+
+
+class TrimmedAudio(NamedTuple):
+    """Audio to transcribe, and how to map its times back"""
+    data: bytes
+    file_name: str
+    offsets: OffsetMap
+    stats: SpeechTrimStats
+
+
+def vad_available() -> bool:
+    """Whether non-speech is trimmed before transcription (enabled and pydub installed)"""
+    return settings.AUDIO_VAD_TRIM and importlib.util.find_spec("pydub") is not None
+
+
+@lru_cache(maxsize=None)
+def load_audioop():
+    """The audioop module: stdlib up to Python 3.12, audioop-lts from 3.13"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+    return audioop
+
+
+def frame_features(pcm: bytes, sample_width: int, frame_rate: int, frame_ms: int) -> List[Tuple[float, float]]:
+    """Loudness (dBFS) and zero-crossing rate of each whole frame of mono PCM"""
+    samples_per_frame = max(int(frame_rate * frame_ms / 1000), 1)
+    frame_bytes = samples_per_frame * sample_width
+    full_scale = float(1 << (8 * sample_width - 1))
+
+    audioop = load_audioop()
+    features = []
+    for offset in range(0, len(pcm) - frame_bytes + 1, frame_bytes):
+        frame = pcm[offset:offset + frame_bytes]
+        rms = audioop.rms(frame, sample_width)
+        loudness = 20 * math.log10(rms / full_scale) if rms else SILENCE_DB
+        features.append((loudness, audioop.cross(frame, sample_width) / samples_per_frame))
+    return features
+
+
+def _moving_std(values: Sequence[float], half_window: int) -> List[float]:
+    """Standard deviation of each value's centred window, via running sums"""
+    sums, squares = [0.0], [0.0]
+    for value in values:
+        sums.append(sums[-1] + value)
+        squares.append(squares[-1] + value * value)
+
+    stds = []
+    for i in range(len(values)):
+        lo, hi = max(i - half_window, 0), min(i + half_window + 1, len(values))
+        count = hi - lo
+        mean = (sums[hi] - sums[lo]) / count
+        stds.append(math.sqrt(max((squares[hi] - squares[lo]) / count - mean * mean, 0.0)))
+    return stds
+
+
+def speech_frames(
+    features: Sequence[Tuple[float, float]],
+    frame_ms: int,
+    energy_margin_db: float,
+    min_energy_db: float,
+    modulation_db: float,
+) -> List[bool]:
+    """Which frames hold speech: loud, and fluctuating the way speech does"""
+    if not features:
+        return []
+    loudness = [feature[0] for feature in features]
+    zcr = [feature[1] for feature in features]
+
+    noise_floor = sorted(loudness)[int(len(loudness) * _NOISE_FLOOR_PERCENTILE)]
+    gate = max(noise_floor + energy_margin_db, min_energy_db)
+
+    half_window = max(_MODULATION_WINDOW_MS // frame_ms // 2, 1)
+    loudness_swing = _moving_std(loudness, half_window)
+    zcr_swing = _moving_std(zcr, half_window)
+    return [
+        loudness[i] > gate and (loudness_swing[i] >= modulation_db or zcr_swing[i] >= _ZCR_MODULATION)
+        for i in range(len(features))
+    ]
+
+
+def speech_spans(flags: Sequence[bool], frame_ms: int, min_speech_ms: int) -> List[Span]:
+    """Runs of speech frames as (start_ms, end_ms), without runs too short to be words"""
+    spans = []
+    run_start = None
+    for i, is_speech in enumerate(list(flags) + [False]):
+        if is_speech and run_start is None:
+            run_start = i
+        elif not is_speech and run_start is not None:
+            if (i - run_start) * frame_ms >= min_speech_ms:
+                spans.append((run_start * frame_ms, i * frame_ms))
+            run_start = None
+    return spans
+
+
+def kept_spans(speech: Sequence[Span], duration_ms: int, min_cut_ms: int, padding_ms: int) -> List[Span]:
+    """Spans of the recording to keep: padded speech, with only long gaps cut
+
+    Keeps the whole recording when there is no speech.
+    """
+    if not speech:
+        return [(0, duration_ms)]
+
+    kept: List[List[int]] = []
+    for start, end in speech:
+        start, end = max(start - padding_ms, 0), min(end + padding_ms, duration_ms)
+        if kept and start - kept[-1][1] < min_cut_ms:
+            kept[-1][1] = max(kept[-1][1], end)
+        else:
+            kept.append([start, end])
+
+    if kept[0][0] < min_cut_ms:
+        kept[0][0] = 0
+    if duration_ms - kept[-1][1] < min_cut_ms:
+        kept[-1][1] = duration_ms
+    return [(start, end) for start, end in kept]
+
+
+def detect_kept_spans(pcm: bytes, sample_width: int, frame_rate: int, duration_ms: int) -> List[Span]:
+    """Spans to keep from mono PCM, using the AUDIO_VAD_* settings"""
+    frame_ms = settings.AUDIO_VAD_FRAME_MS
+    flags = speech_frames(
+        frame_features(pcm, sample_width, frame_rate, frame_ms), frame_ms,
+        settings.AUDIO_VAD_ENERGY_MARGIN_DB, settings.AUDIO_VAD_MIN_ENERGY_DB, settings.AUDIO_VAD_MODULATION_DB,
+    )
+    return kept_spans(
+        speech_spans(flags, frame_ms, settings.AUDIO_VAD_MIN_SPEECH_MS), duration_ms,
+        int(settings.AUDIO_VAD_MIN_CUT_SECONDS * 1000), settings.AUDIO_VAD_PADDING_MS,
+    )
+
+
+def trim_non_speech(audio_data: bytes, file_name: str) -> TrimmedAudio:
+    """Cut long silences and hold music, keeping the original when nothing is cut"""
+    from pydub import AudioSegment
+
+    started = time.perf_counter()
+    path = PurePath(file_name)
+    source_format = path.suffix.lstrip(".").lower() or None
+    audio = AudioSegment.from_file(io.BytesIO(audio_data), format=source_format)
+    duration_ms = len(audio)
+
+    analysis = audio.set_channels(1).set_frame_rate(ANALYSIS_RATE).set_sample_width(2)
+    kept = detect_kept_spans(analysis.raw_data, 2, ANALYSIS_RATE, duration_ms)
+    offsets = OffsetMap(kept, duration_ms)
+
+    if offsets.removed_ms > 0:
+        trimmed = AudioSegment.empty()
+        for start, end in kept:
+            trimmed += audio[start:end]
+        target_format = export_format(source_format)
+        buffer = io.BytesIO()
+        trimmed.export(buffer, format=target_format)
+        audio_data, file_name = buffer.getvalue(), f"{path.stem}.{target_format}"
+
+    stats = SpeechTrimStats(
+        original_seconds=duration_ms / 1000,
+        trimmed_seconds=offsets.trimmed_ms / 1000,
+        cuts=len(kept) - 1 + (kept[0][0] > 0) + (kept[-1][1] < duration_ms),
+        trim_ms=(time.perf_counter() - started) * 1000,
+    )
+    return TrimmedAudio(audio_data, file_name, offsets, stats)
@@ -19,7 +19,170 @@ class Settings:
     # App Settings
     MAX_AUDIO_DURATION_SECONDS: int = 3600  # 1 hour
     MIN_AUDIO_DURATION_SECONDS: int = 10
-    MAX_REVISION_COUNT: int = 3
+    MAX_REVISION_COUNT: int = int(os.getenv("MAX_REVISION_COUNT", "3"))
+    # Critic loop stops early once a revision improves the overall critique
+    # score by less than this (1-10 scale; one point on one dimension ~ 0.3)
+    REVISION_MIN_IMPROVEMENT: float = float(os.getenv("REVISION_MIN_IMPROVEMENT", "0.3"))
+
+    # Estimated LLM pricing in USD per 1M tokens: (prompt, cached prompt,
+    # completion), where cached prompt tokens are those read from the
+    # provider's prompt-prefix cache. Matched by longest prefix, so dated
+    # model versions resolve too.
+    MODEL_PRICING: dict = {
+        "gpt-4o-mini": (0.15, 0.075, 0.60),
+        "gpt-4o": (2.50, 1.25, 10.00),
+        "claude-sonnet-4": (3.00, 0.30, 15.00),
+        "claude-3-5-haiku": (0.80, 0.08, 4.00),
+    }
+
+    # Checkpointing (per-node AgentState snapshots, keyed by call ID)
+    CHECKPOINT_DB_PATH: str = os.getenv("CHECKPOINT_DB_PATH", ".checkpoints/checkpoints.sqlite")
+    # Completed runs are deleted from the database unless this is set
+    CHECKPOINT_KEEP_COMPLETED: bool = os.getenv("CHECKPOINT_KEEP_COMPLETED", "false").lower() == "true"
+
+    # LLM response cache (content-addressed; see llm/cache.py). Off by default:
+    # a cache hit replays an earlier response, which evals must opt into.
+    # Bump LLM_CACHE_NAMESPACE to invalidate every cached response.
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")  # "" = memory only
+    LLM_CACHE_NAMESPACE: str = os.getenv("LLM_CACHE_NAMESPACE", "v1")
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_MEMORY_ENTRIES: int = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1000"))
+
+    # Redis (optional): shares the LLM cache and the final-result cache between
+    # replicas. Empty REDIS_URL disables it; outages fall back to memory.
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+    REDIS_TIMEOUT_SECONDS: float = float(os.getenv("REDIS_TIMEOUT_SECONDS", "0.5"))
+    CACHE_KEY_PREFIX: str = os.getenv("CACHE_KEY_PREFIX", "callcenter")
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "false").lower() == "true"
+    RESULT_CACHE_TTL_SECONDS: int = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+    # Shared HTTP connection pools for all LLM clients (see llm/clients.py)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "120"))
+
+    # Rate limiting (see llm/rate_limit.py). (requests/min, tokens/min) per
+    # model, matched by longest prefix; set these to your account's tier.
+    RATE_LIMITS: dict = {
+        "gpt-4o-mini": (500, 200_000),
+        "gpt-4o": (500, 30_000),
+        "whisper-1": (50, 10_000_000),  # billed per minute of audio, not tokens
+        "claude-sonnet-4": (50, 30_000),
+        "claude-3-5-haiku": (50, 50_000),
+    }
+    DEFAULT_RATE_LIMIT: tuple = (60, 60_000)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+    LLM_RETRY_MAX_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_SECONDS", "30"))
+    LLM_LATENCY_TARGET_SECONDS: float = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "30"))
+    LLM_COMPLETION_TOKEN_ESTIMATE: int = 500  # budgeted per call on top of the prompt
+
+    # Model routing (see llm/router.py): equivalent candidate models per role,
+    # in order of preference. An agent's configured model is always preferred;
+    # the rest are failover targets and latency-based alternatives.
+    MODEL_ROUTES: dict = {
+        "summarizer": ["gpt-4o-mini", "claude-3-5-haiku-latest"],
+        "critic": ["claude-sonnet-4-20250514", "gpt-4o"],
+        "qa_scorer": ["gpt-4o-mini", "claude-3-5-haiku-latest"],
+        "abuse_detector": ["gpt-4o-mini", "claude-3-5-haiku-latest"],
+        "fast_analyzer": ["gpt-4o-mini", "claude-3-5-haiku-latest"],
+        "judge": ["gpt-4o-mini", "claude-3-5-haiku-latest"],
+    }
+    ROUTER_EWMA_ALPHA: float = float(os.getenv("ROUTER_EWMA_ALPHA", "0.3"))
+    # Switch away from the preferred model only when another is this many times faster
+    ROUTER_SWITCH_RATIO: float = float(os.getenv("ROUTER_SWITCH_RATIO", "1.5"))
+    ROUTER_FAILURE_THRESHOLD: int = int(os.getenv("ROUTER_FAILURE_THRESHOLD", "3"))
+    ROUTER_COOLDOWN_SECONDS: float = float(os.getenv("ROUTER_COOLDOWN_SECONDS", "60"))
+
+    # Request hedging (see llm/hedging.py), opt-in per role, e.g.
+    # HEDGED_ROLES=critic,judge. Only temperature-0 routes are hedged, and
+    # streamed calls (the abuse detector's) never are.
+    HEDGED_ROLES: list = [r.strip() for r in os.getenv("HEDGED_ROLES", "").split(",") if r.strip()]
+    HEDGE_QUANTILE: float = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+    HEDGE_MAX_RATE: float = float(os.getenv("HEDGE_MAX_RATE", "0.1"))  # share of a role's calls
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+    # LLM cassettes (see llm/cassette.py): "record" saves every agent and
+    # evaluator response, "replay" serves them back with no network access
+    LLM_CASSETTE_MODE: str = os.getenv("LLM_CASSETTE_MODE", "off")  # off | record | replay
+    LLM_CASSETTE_PATH: str = os.getenv("LLM_CASSETTE_PATH", ".cassettes/llm.jsonl")
+    LLM_CASSETTE_REPLAY_LATENCY: bool = os.getenv("LLM_CASSETTE_REPLAY_LATENCY", "false").lower() == "true"
+
+    # Speech-to-text backend (see audio/backends.py): "openai" (Whisper API),
+    # "local" (faster-whisper on this machine's CPU) or "stub" (offline tests).
+    # A request can pick another one with models={"transcription": ...}.
+    TRANSCRIPTION_BACKEND: str = os.getenv("TRANSCRIPTION_BACKEND", "openai")
+    LOCAL_STT_MODEL_PATH: str = os.getenv("LOCAL_STT_MODEL_PATH", "")  # faster-whisper (CTranslate2) model directory
+    LOCAL_STT_COMPUTE_TYPE: str = os.getenv("LOCAL_STT_COMPUTE_TYPE", "int8")  # int8 is fastest on CPU
+    LOCAL_STT_CPU_THREADS: int = int(os.getenv("LOCAL_STT_CPU_THREADS", "0"))  # per transcription; 0 = library default
+    LOCAL_STT_WORKERS: int = int(os.getenv("LOCAL_STT_WORKERS", "2"))  # transcriptions run at once
+    LOCAL_STT_BEAM_SIZE: int = int(os.getenv("LOCAL_STT_BEAM_SIZE", "5"))
+
+    # Long recordings are split at silences into chunks transcribed in parallel
+    # (see audio/chunking.py; needs pydub, plus ffmpeg for compressed formats).
+    # Files up to AUDIO_CHUNK_THRESHOLD_MB are sent to Whisper whole.
+    AUDIO_CHUNKING: bool = os.getenv("AUDIO_CHUNKING", "true").lower() == "true"
+    AUDIO_CHUNK_THRESHOLD_MB: float = float(os.getenv("AUDIO_CHUNK_THRESHOLD_MB", "5"))
+    AUDIO_CHUNK_MAX_SECONDS: float = float(os.getenv("AUDIO_CHUNK_MAX_SECONDS", "600"))
+    AUDIO_CHUNK_MAX_MB: float = float(os.getenv("AUDIO_CHUNK_MAX_MB", "24"))  # Whisper accepts 25 MB per request
+    # Chunks cut where no silence was found overlap, so no word is lost at the seam
+    AUDIO_CHUNK_OVERLAP_SECONDS: float = float(os.getenv("AUDIO_CHUNK_OVERLAP_SECONDS", "1.0"))
+    AUDIO_SILENCE_SEARCH_SECONDS: float = 30.0  # searched for a silence before each cut
+    AUDIO_SILENCE_MIN_MS: int = 400
+    AUDIO_SILENCE_THRESHOLD_DB: float = 16.0  # below the recording's average loudness
+    TRANSCRIPTION_MAX_CONCURRENCY: int = int(os.getenv("TRANSCRIPTION_MAX_CONCURRENCY", "4"))
+
+    # Pre-encode audio to 16 kHz mono Opus before upload (see audio/encoding.py;
+    # needs pydub, and ffmpeg built with libopus). Opt-in: it costs CPU per call.
+    AUDIO_PREENCODE: bool = os.getenv("AUDIO_PREENCODE", "false").lower() == "true"
+    AUDIO_PREENCODE_SAMPLE_RATE: int = 16000  # what Whisper resamples to anyway
+    AUDIO_PREENCODE_BITRATE: str = os.getenv("AUDIO_PREENCODE_BITRATE", "24k")
+    AUDIO_PREENCODE_WORKERS: int = int(os.getenv("AUDIO_PREENCODE_WORKERS", "2"))
+
+    # Voice-activity trimming (see audio/vad.py; needs pydub): cut silence and
+    # hold music before transcription. Segment times still refer to the
+    # original recording. Opt-in: a misjudged span would lose speech.
+    AUDIO_VAD_TRIM: bool = os.getenv("AUDIO_VAD_TRIM", "false").lower() == "true"
+    AUDIO_VAD_MIN_CUT_SECONDS: float = float(os.getenv("AUDIO_VAD_MIN_CUT_SECONDS", "3.0"))  # shorter gaps are kept
+    AUDIO_VAD_PADDING_MS: int = 300  # kept around each speech run
+    AUDIO_VAD_FRAME_MS: int = 30
+    AUDIO_VAD_ENERGY_MARGIN_DB: float = 10.0  # above the noise floor
+    AUDIO_VAD_MIN_ENERGY_DB: float = -50.0  # dBFS; quieter frames are never speech
+    AUDIO_VAD_MODULATION_DB: float = 4.0  # loudness swing over a second; steady music stays below
+    AUDIO_VAD_MIN_SPEECH_MS: int = 150  # shorter loud runs are clicks
+
+    # Live call analysis (see graph/live_analysis.py): frames are cut into
+    # utterances at pauses and transcribed while the call goes on
+    LIVE_SILENCE_DB: float = float(os.getenv("LIVE_SILENCE_DB", "-40"))  # dBFS; quieter frames are pauses
+    LIVE_ENDPOINT_MS: int = int(os.getenv("LIVE_ENDPOINT_MS", "600"))  # pause that ends an utterance
+    LIVE_MAX_UTTERANCE_SECONDS: float = float(os.getenv("LIVE_MAX_UTTERANCE_SECONDS", "15"))
+    # Call audio between rolling summary / abuse refreshes
+    LIVE_ANALYSIS_INTERVAL_SECONDS: float = float(os.getenv("LIVE_ANALYSIS_INTERVAL_SECONDS", "30"))
+
+    # Transcript cache (see audio/transcript_cache.py): a re-submitted recording
+    # is matched by content hash and skips Whisper. Opt-in: it keeps call
+    # transcripts on disk (or in Redis when REDIS_URL is set).
+    TRANSCRIPT_CACHE_ENABLED: bool = os.getenv("TRANSCRIPT_CACHE_ENABLED", "false").lower() == "true"
+    TRANSCRIPT_CACHE_PATH: str = os.getenv("TRANSCRIPT_CACHE_PATH", ".cache/transcripts.sqlite")  # "" = memory only
+    TRANSCRIPT_CACHE_NAMESPACE: str = os.getenv("TRANSCRIPT_CACHE_NAMESPACE", "v1")
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = int(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    TRANSCRIPT_CACHE_MAX_ENTRIES: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "10000"))
+
+    # Transcript compaction before LLM calls (see agents/compaction_agent.py).
+    # Off until `python -m evaluation.run_eval --compaction-check` shows no
+    # quality loss on the eval set. Dropping filler turns is lossy, so it is
+    # opt-in on its own.
+    TRANSCRIPT_COMPACTION: bool = os.getenv("TRANSCRIPT_COMPACTION", "false").lower() == "true"
+    COMPACTION_DROP_FILLER: bool = os.getenv("COMPACTION_DROP_FILLER", "false").lower() == "true"
+    # Regexes matched against a whole turn (case-insensitive, trailing punctuation included)
+    COMPACTION_FILLER_PATTERNS: list = [
+        r"(uh+|um+|hmm+|mm+-?hm+|ok(ay)?|right|yeah|yes|sure|uh-huh)[\s,.!?]*",
+        r"(one|just a) (moment|second|sec)( please)?[\s,.!?]*",
+    ]
 
     @classmethod
     def validate(cls) -> dict:
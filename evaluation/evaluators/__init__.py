@@ -7,15 +7,17 @@ Available evaluators:
 - QAScoreValidator: Heuristic validator for QA scores
 """
 
-from .faithfulness import FaithfulnessEvaluator, faithfulness_evaluator
-from .completeness import CompletenessEvaluator, completeness_evaluator
+from .faithfulness import FaithfulnessEvaluator, faithfulness_evaluator, get_faithfulness_evaluator
+from .completeness import CompletenessEvaluator, completeness_evaluator, get_completeness_evaluator
 from .qa_validator import QAScoreValidator, qa_score_validator
 
 __all__ = [
     "FaithfulnessEvaluator",
     "faithfulness_evaluator",
+    "get_faithfulness_evaluator",
     "CompletenessEvaluator",
     "completeness_evaluator",
+    "get_completeness_evaluator",
     "QAScoreValidator",
     "qa_score_validator"
 ]
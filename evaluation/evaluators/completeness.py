@@ -4,11 +4,11 @@ Completeness Evaluator - LLM-as-Judge
 Evaluates whether the summary captures all important information from the transcript.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from typing import Optional
-import os
+from functools import lru_cache
+from llm.router import Route
 
 
 class CompletenessScore(BaseModel):
@@ -24,11 +24,7 @@ class CompletenessEvaluator:
 
     def __init__(self, model: str = "gpt-4o-mini"):
         self.model_name = model
-        self.llm = ChatOpenAI(
-            model=model,
-            api_key=os.getenv("OPENAI_API_KEY"),
-            temperature=0
-        ).with_structured_output(CompletenessScore)
+        self.route = Route("judge", model, temperature=0, structured_output=CompletenessScore)
 
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an expert evaluator assessing the completeness of call center summaries.
@@ -61,7 +57,7 @@ Topics: {topics}
 Please evaluate the completeness of this summary.""")
         ])
 
-        self.chain = self.prompt | self.llm
+        self.chain = self.route.bind(self.prompt)
 
     def evaluate(self, transcript: str, summary: dict) -> CompletenessScore:
         """Evaluate a single summary for completeness
@@ -82,7 +78,7 @@ Please evaluate the completeness of this summary.""")
             "topics": ", ".join(summary.get("topics", []))
         })
 
-        return result
+        return result.output
 
     async def aevaluate(self, transcript: str, summary: dict) -> CompletenessScore:
         """Async version of evaluate"""
@@ -95,7 +91,13 @@ Please evaluate the completeness of this summary.""")
             "topics": ", ".join(summary.get("topics", []))
         })
 
-        return result
+        return result.output
+
+
+@lru_cache(maxsize=None)
+def get_completeness_evaluator(model: str = "gpt-4o-mini") -> CompletenessEvaluator:
+    """Shared evaluator instance, so per-example calls reuse one client"""
+    return CompletenessEvaluator(model)
 
 
 def completeness_evaluator(run, example) -> dict:
@@ -108,7 +110,7 @@ def completeness_evaluator(run, example) -> dict:
     Returns:
         Dictionary with score and reasoning
     """
-    evaluator = CompletenessEvaluator()
+    evaluator = get_completeness_evaluator()
 
     # Extract transcript and summary from run
     transcript = example.inputs.get("transcript", "")
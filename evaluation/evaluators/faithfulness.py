@@ -5,11 +5,11 @@ Evaluates whether the generated summary accurately reflects the original transcr
 without hallucinations or misrepresentations.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from typing import Optional
-import os
+from functools import lru_cache
+from llm.router import Route
 
 
 class FaithfulnessScore(BaseModel):
@@ -25,11 +25,7 @@ class FaithfulnessEvaluator:
 
     def __init__(self, model: str = "gpt-4o-mini"):
         self.model_name = model
-        self.llm = ChatOpenAI(
-            model=model,
-            api_key=os.getenv("OPENAI_API_KEY"),
-            temperature=0
-        ).with_structured_output(FaithfulnessScore)
+        self.route = Route("judge", model, temperature=0, structured_output=FaithfulnessScore)
 
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an expert evaluator assessing the faithfulness of call center summaries.
@@ -61,7 +57,7 @@ Resolution: {resolution_status}
 Please evaluate the faithfulness of this summary.""")
         ])
 
-        self.chain = self.prompt | self.llm
+        self.chain = self.route.bind(self.prompt)
 
     def evaluate(self, transcript: str, summary: dict) -> FaithfulnessScore:
         """Evaluate a single summary for faithfulness
@@ -83,7 +79,7 @@ Please evaluate the faithfulness of this summary.""")
             "resolution_status": summary.get("resolution_status", "")
         })
 
-        return result
+        return result.output
 
     async def aevaluate(self, transcript: str, summary: dict) -> FaithfulnessScore:
         """Async version of evaluate"""
@@ -97,7 +93,13 @@ Please evaluate the faithfulness of this summary.""")
             "resolution_status": summary.get("resolution_status", "")
         })
 
-        return result
+        return result.output
+
+
+@lru_cache(maxsize=None)
+def get_faithfulness_evaluator(model: str = "gpt-4o-mini") -> FaithfulnessEvaluator:
+    """Shared evaluator instance, so per-example calls reuse one client"""
+    return FaithfulnessEvaluator(model)
 
 
 def faithfulness_evaluator(run, example) -> dict:
@@ -110,7 +112,7 @@ def faithfulness_evaluator(run, example) -> dict:
     Returns:
         Dictionary with score and reasoning
     """
-    evaluator = FaithfulnessEvaluator()
+    evaluator = get_faithfulness_evaluator()
 
     # Extract transcript and summary from run
     transcript = example.inputs.get("transcript", "")
@@ -155,7 +155,7 @@ def target_function(inputs: dict) -> dict:
 
 def faithfulness_evaluator(run, example) -> dict:
     """Evaluate summary faithfulness using LLM"""
-    from evaluation.evaluators import FaithfulnessEvaluator
+    from evaluation.evaluators import get_faithfulness_evaluator
 
     transcript = example.inputs.get("transcript", "")
     summary = run.outputs.get("summary", {})
@@ -163,7 +163,7 @@ def faithfulness_evaluator(run, example) -> dict:
     if not transcript or not summary:
         return {"key": "faithfulness", "score": 0, "comment": "Missing data"}
 
-    evaluator = FaithfulnessEvaluator()
+    evaluator = get_faithfulness_evaluator()
     result = evaluator.evaluate(transcript, summary)
 
     return {
@@ -175,7 +175,7 @@ def faithfulness_evaluator(run, example) -> dict:
 
 def completeness_evaluator(run, example) -> dict:
     """Evaluate summary completeness using LLM"""
-    from evaluation.evaluators import CompletenessEvaluator
+    from evaluation.evaluators import get_completeness_evaluator
 
     transcript = example.inputs.get("transcript", "")
     summary = run.outputs.get("summary", {})
@@ -183,7 +183,7 @@ def completeness_evaluator(run, example) -> dict:
     if not transcript or not summary:
         return {"key": "completeness", "score": 0, "comment": "Missing data"}
 
-    evaluator = CompletenessEvaluator()
+    evaluator = get_completeness_evaluator()
     result = evaluator.evaluate(transcript, summary)
 
     return {
@@ -6,7 +6,9 @@ Runs the full evaluation pipeline against the test dataset and reports results.
 Can optionally push results to LangSmith for tracking.
 
 Usage:
-    python -m evaluation.run_eval [--langsmith] [--verbose]
+    python -m evaluation.run_eval [--langsmith] [--verbose] [--profile full|fast]
+    python -m evaluation.run_eval --compare    # full multi-agent vs fast single-call
+    python -m evaluation.run_eval --compaction-check    # with vs without transcript compaction
 """
 
 import json
@@ -16,10 +18,14 @@ from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
-from graph.workflow import run_analysis
+from config.settings import settings
+from graph.workflow import run_analysis, PIPELINE_PROFILES
+from llm.cache import get_llm_cache
+from llm.router import get_router
+from llm.hedging import hedge_stats
 from evaluation.evaluators import (
-    FaithfulnessEvaluator,
-    CompletenessEvaluator,
+    get_faithfulness_evaluator,
+    get_completeness_evaluator,
     QAScoreValidator
 )
 
@@ -31,12 +37,13 @@ def load_test_cases(path: str = "evaluation/datasets/test_cases.json") -> list:
     return data.get("test_cases", [])
 
 
-def run_single_evaluation(test_case: dict, verbose: bool = False) -> dict:
+def run_single_evaluation(test_case: dict, verbose: bool = False, profile: str = "full") -> dict:
     """Run evaluation for a single test case
 
     Args:
         test_case: Test case dictionary with transcript and expected values
         verbose: Whether to print detailed output
+        profile: Pipeline profile to evaluate ("full" or "fast")
 
     Returns:
         Dictionary with evaluation results
@@ -57,7 +64,11 @@ def run_single_evaluation(test_case: dict, verbose: bool = False) -> dict:
         "success": False,
         "scores": {},
         "errors": [],
-        "latency_ms": 0
+        "latency_ms": 0,
+        "llm_calls": 0,
+        "llm_cache_hits": 0,
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0
     }
 
     try:
@@ -65,13 +76,19 @@ def run_single_evaluation(test_case: dict, verbose: bool = False) -> dict:
         start_time = time.time()
         final_state = run_analysis(
             raw_input=transcript,
-            input_type="transcript"
+            input_type="transcript",
+            profile=profile
         )
         latency_ms = (time.time() - start_time) * 1000
         results["latency_ms"] = latency_ms
+        results["llm_calls"] = sum(m.llm_calls for m in final_state.get("node_metrics", []))
+        results["llm_cache_hits"] = sum(m.cache_hits for m in final_state.get("node_metrics", []))
+        results["prompt_tokens"] = sum(m.prompt_tokens for m in final_state.get("node_metrics", []))
+        results["cached_prompt_tokens"] = sum(m.cached_prompt_tokens for m in final_state.get("node_metrics", []))
 
         if verbose:
-            print(f"Pipeline completed in {latency_ms:.0f}ms")
+            print(f"Pipeline completed in {latency_ms:.0f}ms ({results['llm_calls']} LLM calls, "
+                  f"{results['llm_cache_hits']} served from the LLM cache)")
 
         # Extract outputs
         summary = final_state.get("summary")
@@ -103,7 +120,7 @@ def run_single_evaluation(test_case: dict, verbose: bool = False) -> dict:
         # Run evaluators
         if verbose:
             print("Running faithfulness evaluation...")
-        faithfulness_eval = FaithfulnessEvaluator()
+        faithfulness_eval = get_faithfulness_evaluator()
         faithfulness_result = faithfulness_eval.evaluate(transcript, summary_dict)
         results["scores"]["faithfulness"] = faithfulness_result.score
         results["faithfulness_details"] = {
@@ -117,7 +134,7 @@ def run_single_evaluation(test_case: dict, verbose: bool = False) -> dict:
 
         if verbose:
             print("Running completeness evaluation...")
-        completeness_eval = CompletenessEvaluator()
+        completeness_eval = get_completeness_evaluator()
         completeness_result = completeness_eval.evaluate(transcript, summary_dict)
         results["scores"]["completeness"] = completeness_result.score
         results["completeness_details"] = {
@@ -197,29 +214,33 @@ def run_single_evaluation(test_case: dict, verbose: bool = False) -> dict:
     return results
 
 
-def run_full_evaluation(verbose: bool = False, langsmith: bool = False) -> dict:
+def run_full_evaluation(verbose: bool = False, langsmith: bool = False, profile: str = "full") -> dict:
     """Run evaluation on all test cases
 
     Args:
         verbose: Whether to print detailed output
         langsmith: Whether to push results to LangSmith
+        profile: Pipeline profile to evaluate ("full" or "fast")
 
     Returns:
         Dictionary with aggregate results
     """
     print("\n" + "="*60)
-    print("AI Call Center Assistant - Evaluation Suite")
+    print(f"AI Call Center Assistant - Evaluation Suite ({profile} profile)")
     print("="*60)
 
     test_cases = load_test_cases()
     print(f"Loaded {len(test_cases)} test cases")
+    if settings.LLM_CACHE_ENABLED:
+        print("NOTE: LLM cache is ON - identical prompts replay earlier responses "
+              "(set LLM_CACHE_ENABLED=false for fresh ones)")
 
     all_results = []
     start_time = time.time()
 
     for i, test_case in enumerate(test_cases, 1):
         print(f"\n[{i}/{len(test_cases)}] {test_case.get('id', '')}...", end="" if not verbose else "\n")
-        result = run_single_evaluation(test_case, verbose)
+        result = run_single_evaluation(test_case, verbose, profile=profile)
         all_results.append(result)
 
         if not verbose:
@@ -235,6 +256,14 @@ def run_full_evaluation(verbose: bool = False, langsmith: bool = False) -> dict:
     avg_faithfulness = sum(r["scores"].get("faithfulness", 0) for r in all_results) / len(all_results)
     avg_completeness = sum(r["scores"].get("completeness", 0) for r in all_results) / len(all_results)
     avg_latency = sum(r["latency_ms"] for r in all_results) / len(all_results)
+    avg_llm_calls = sum(r["llm_calls"] for r in all_results) / len(all_results)
+    llm_cache_hits = sum(r["llm_cache_hits"] for r in all_results)
+    avg_prompt_tokens = sum(r["prompt_tokens"] for r in all_results) / len(all_results)
+    total_prompt_tokens = sum(r["prompt_tokens"] for r in all_results)
+    # Share of prompt tokens served from the providers' prefix caches
+    cached_prompt_ratio = (
+        sum(r["cached_prompt_tokens"] for r in all_results) / total_prompt_tokens if total_prompt_tokens else 0.0
+    )
 
     # Accuracy metrics
     sentiment_scores = [r["scores"].get("sentiment_accuracy") for r in all_results if "sentiment_accuracy" in r["scores"]]
@@ -264,7 +293,23 @@ def run_full_evaluation(verbose: bool = False, langsmith: bool = False) -> dict:
 
     print(f"\nPerformance:")
     print(f"  Avg Latency: {avg_latency:.0f}ms")
+    print(f"  Avg LLM Calls: {avg_llm_calls:.1f}")
+    print(f"  Avg Prompt Tokens: {avg_prompt_tokens:.0f} ({cached_prompt_ratio*100:.0f}% from prompt cache)")
     print(f"  Total Time: {total_time:.1f}s")
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        stats = llm_cache.stats()
+        print(f"  LLM Cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']*100:.0f}% hit rate)")
+    if llm_cache_hits:
+        print(f"\nWARNING: {llm_cache_hits} pipeline LLM responses were served from the LLM cache, "
+              f"not the providers; set LLM_CACHE_ENABLED=false for a fresh run")
+    for model, health in get_router().stats().items():
+        latency = "n/a" if health["latency_ewma_s"] is None else f"{health['latency_ewma_s']:.2f}s"
+        print(f"  Routing {model}: selected {health['selected']}x, {health['failures']} failures, "
+              f"latency EWMA {latency}{' (circuit open)' if health['circuit_open'] else ''}")
+    for role, hedges in hedge_stats().items():
+        print(f"  Hedging {role}: {hedges['hedges_fired']} fired / {hedges['hedges_won']} won "
+              f"of {hedges['calls']} calls")
 
     # Failed cases
     failed_cases = [r for r in all_results if not r["success"]]
@@ -281,10 +326,11 @@ def run_full_evaluation(verbose: bool = False, langsmith: bool = False) -> dict:
     results_path = Path("evaluation/results")
     results_path.mkdir(exist_ok=True)
 
-    output_file = results_path / f"eval_results_{timestamp}.json"
+    output_file = results_path / f"eval_results_{profile}_{timestamp}.json"
     with open(output_file, "w") as f:
         json.dump({
             "timestamp": timestamp,
+            "profile": profile,
             "summary": {
                 "total": len(all_results),
                 "passed": num_passed,
@@ -292,6 +338,10 @@ def run_full_evaluation(verbose: bool = False, langsmith: bool = False) -> dict:
                 "avg_faithfulness": avg_faithfulness,
                 "avg_completeness": avg_completeness,
                 "avg_latency_ms": avg_latency,
+                "avg_llm_calls": avg_llm_calls,
+                "llm_cache_hits": llm_cache_hits,
+                "avg_prompt_tokens": avg_prompt_tokens,
+                "cached_prompt_ratio": cached_prompt_ratio,
                 "total_time_s": total_time
             },
             "results": all_results
@@ -300,17 +350,116 @@ def run_full_evaluation(verbose: bool = False, langsmith: bool = False) -> dict:
     print(f"\nResults saved to: {output_file}")
 
     return {
+        "profile": profile,
         "total": len(all_results),
         "passed": num_passed,
         "failed": num_failed,
+        "avg_faithfulness": avg_faithfulness,
+        "avg_completeness": avg_completeness,
+        "avg_latency_ms": avg_latency,
+        "avg_llm_calls": avg_llm_calls,
+        "llm_cache_hits": llm_cache_hits,
+        "avg_prompt_tokens": avg_prompt_tokens,
+        "cached_prompt_ratio": cached_prompt_ratio,
+        "sentiment_accuracy": sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else None,
+        "resolution_accuracy": sum(resolution_scores) / len(resolution_scores) if resolution_scores else None,
+        "abuse_accuracy": sum(abuse_scores) / len(abuse_scores) if abuse_scores else None,
         "results": all_results
     }
 
 
+COMPARISON_ROWS = [
+    ("Passed", "{}", "passed"),
+    ("Faithfulness (avg)", "{:.1f}/10", "avg_faithfulness"),
+    ("Completeness (avg)", "{:.1f}/10", "avg_completeness"),
+    ("Sentiment accuracy", "{:.0%}", "sentiment_accuracy"),
+    ("Resolution accuracy", "{:.0%}", "resolution_accuracy"),
+    ("Abuse accuracy", "{:.0%}", "abuse_accuracy"),
+    ("Avg latency", "{:.0f}ms", "avg_latency_ms"),
+    ("Avg LLM calls", "{:.1f}", "avg_llm_calls"),
+    ("LLM cache hits", "{}", "llm_cache_hits"),
+    ("Avg prompt tokens", "{:.0f}", "avg_prompt_tokens"),
+    ("Cached prompt share", "{:.0%}", "cached_prompt_ratio"),
+]
+
+
+def _print_comparison(title: str, summaries: dict) -> None:
+    """Print aggregate results side by side, one column per variant"""
+    def fmt(value, pattern):
+        return pattern.format(value) if value is not None else "n/a"
+
+    print("\n" + "="*60)
+    print(title)
+    print("="*60)
+    print(f"{'Metric':<22}" + "".join(f"{name:>18}" for name in summaries))
+    for label, pattern, key in COMPARISON_ROWS:
+        print(f"{label:<22}" + "".join(f"{fmt(summary[key], pattern):>18}" for summary in summaries.values()))
+
+
+def run_profile_comparison(verbose: bool = False) -> dict:
+    """Evaluate every pipeline profile on the same test cases and compare them
+
+    Returns:
+        Dictionary of aggregate results keyed by profile
+    """
+    summaries = {profile: run_full_evaluation(verbose, profile=profile) for profile in PIPELINE_PROFILES}
+    _print_comparison("PROFILE COMPARISON", summaries)
+    return summaries
+
+
+def run_compaction_comparison(
+    verbose: bool = False,
+    profile: str = "full",
+    max_quality_drop: float = 0.5
+) -> dict:
+    """Evaluate with and without transcript compaction to check it doesn't cost quality
+
+    Args:
+        verbose: Whether to print detailed output
+        profile: Pipeline profile to evaluate
+        max_quality_drop: Largest acceptable drop in average faithfulness or
+            completeness (1-10 scale) before compaction counts as a regression
+
+    Returns:
+        Dictionary of aggregate results keyed by variant, plus "regressed"
+    """
+    original = settings.TRANSCRIPT_COMPACTION
+    summaries = {}
+    try:
+        for name, enabled in (("uncompacted", False), ("compacted", True)):
+            settings.TRANSCRIPT_COMPACTION = enabled
+            summaries[name] = run_full_evaluation(verbose, profile=profile)
+    finally:
+        settings.TRANSCRIPT_COMPACTION = original
+
+    _print_comparison(f"COMPACTION CHECK ({profile} profile)", summaries)
+
+    before, after = summaries["uncompacted"], summaries["compacted"]
+    regressed = any(
+        before[key] - after[key] > max_quality_drop
+        for key in ("avg_faithfulness", "avg_completeness")
+    ) or after["passed"] < before["passed"]
+    if before["avg_prompt_tokens"]:
+        saved = 1 - after["avg_prompt_tokens"] / before["avg_prompt_tokens"]
+        print(f"\nPrompt tokens saved: {saved:.1%}")
+    print("Quality regression: " + ("YES" if regressed else "no"))
+
+    return {**summaries, "regressed": regressed}
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run evaluation suite")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--langsmith", action="store_true", help="Push results to LangSmith")
+    parser.add_argument("--profile", choices=PIPELINE_PROFILES, default="full", help="Pipeline profile to evaluate")
+    parser.add_argument("--compare", action="store_true", help="Evaluate all pipeline profiles side by side")
+    parser.add_argument("--compaction-check", action="store_true",
+                        help="Evaluate with and without transcript compaction and flag quality regressions")
     args = parser.parse_args()
 
-    run_full_evaluation(verbose=args.verbose, langsmith=args.langsmith)
+    if args.compare:
+        run_profile_comparison(verbose=args.verbose)
+    elif args.compaction_check:
+        run_compaction_comparison(verbose=args.verbose, profile=args.profile)
+    else:
+        run_full_evaluation(verbose=args.verbose, langsmith=args.langsmith, profile=args.profile)
@@ -0,0 +1,103 @@
+"""
+Durable per-node checkpointing for the workflow
+
+LangGraph saves AgentState after every node into a SQLite database, keyed by
+the call ID (used as the LangGraph thread_id). If a late node such as the
+critic or QA scoring fails, the run can be resumed from the last completed
+node instead of paying again for transcription and earlier LLM calls.
+
+The recording itself is kept out of the checkpoints: a checkpointed run
+spools it to a file next to the database and the state holds only its path
+(AgentState.audio_path). A run that completes deletes its thread and its
+spooled audio, unless settings.CHECKPOINT_KEEP_COMPLETED is set; a failed
+run keeps both so it can be resumed.
+"""
+
+import enum
+import inspect
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from config.settings import settings
+import models.schemas as schemas
+
+_checkpointers = {}
+_checkpointers_lock = threading.Lock()
+
+
+def _serializer():
+    """Checkpoint serializer that may load this app's own schema types"""
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    allowed = [
+        (schemas.__name__, name)
+        for name, obj in inspect.getmembers(schemas, inspect.isclass)
+        if obj.__module__ == schemas.__name__ and issubclass(obj, (BaseModel, enum.Enum))
+    ]
+    try:
+        return JsonPlusSerializer(allowed_msgpack_modules=allowed)
+    except TypeError:
+        # Older langgraph-checkpoint releases load any type without an allow-list
+        return JsonPlusSerializer()
+
+
+def get_checkpointer(db_path: Optional[str] = None):
+    """Return the process-wide SQLite checkpointer for a database file
+
+    Args:
+        db_path: SQLite file path (defaults to settings.CHECKPOINT_DB_PATH).
+            ":memory:" keeps checkpoints for the life of the process only.
+    """
+    db_path = db_path or settings.CHECKPOINT_DB_PATH
+
+    with _checkpointers_lock:
+        checkpointer = _checkpointers.get(db_path)
+        if checkpointer is None:
+            try:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+            except ImportError as e:
+                raise ImportError(
+                    "Checkpointing requires langgraph-checkpoint-sqlite "
+                    "(pip install langgraph-checkpoint-sqlite)"
+                ) from e
+
+            if db_path != ":memory:":
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            # Shared by every thread; SqliteSaver serializes access internally
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            checkpointer = SqliteSaver(conn, serde=_serializer())
+            _checkpointers[db_path] = checkpointer
+
+    return checkpointer
+
+
+def thread_config(call_id: str) -> dict:
+    """LangGraph run config that checkpoints under the given call ID"""
+    return {"configurable": {"thread_id": call_id}}
+
+
+def _audio_dir(db_path: str) -> Path:
+    if db_path == ":memory:":
+        return Path(tempfile.gettempdir()) / "call-analysis-checkpoint-audio"
+    return Path(db_path).parent / "audio"
+
+
+def spool_audio(call_id: str, audio_data: bytes, db_path: Optional[str] = None) -> str:
+    """Write a checkpointed run's recording to disk and return its path"""
+    directory = _audio_dir(db_path or settings.CHECKPOINT_DB_PATH)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / call_id
+    path.write_bytes(audio_data)
+    return str(path)
+
+
+def discard_checkpoint(call_id: str, db_path: Optional[str] = None) -> None:
+    """Delete a finished run's checkpoints and spooled audio"""
+    db_path = db_path or settings.CHECKPOINT_DB_PATH
+    get_checkpointer(db_path).delete_thread(call_id)
+    (_audio_dir(db_path) / call_id).unlink(missing_ok=True)
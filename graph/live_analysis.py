@@ -0,0 +1,240 @@
+"""
+Live analysis of a call while it is still in progress
+
+astream_live_analysis() takes the call audio as an async stream of 16-bit
+mono PCM frames (see audio/live.py) and yields progress like
+stream_analysis(), as (event, update, state) tuples:
+
+- PARTIAL_TRANSCRIPT_EVENT: update["transcript"] holds the segments of an
+  utterance just recognized, timed on the call timeline. Up to
+  TRANSCRIPTION_MAX_CONCURRENCY utterances are transcribed at once, but
+  they are always yielded in call order.
+- ROLLING_ANALYSIS_EVENT: a fresh summary and abuse flags for the transcript
+  so far. Refreshes run in the background, one at a time, each after another
+  LIVE_ANALYSIS_INTERVAL_SECONDS of call audio has been transcribed.
+- ESCALATION_EVENT: the first high-severity abuse flag, raised while a
+  refresh's response is still streaming.
+- FINAL_EVENT: after hang-up, the regular analysis (arun_analysis) of the
+  whole transcript, with the live segments. By then only the LLM stages
+  are left, so it is ready seconds after the call ends.
+
+state is the live state so far: call_id, transcript, summary, abuse_flags,
+escalation and errors. A failed utterance or refresh is recorded in errors
+and the call goes on. The last tuple's state is the final analysis.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from agents.abuse_detection_agent import AbuseDetectionAgent
+from agents.intake_agent import new_call_id
+from agents.summarization_agent import SummarizationAgent
+from agents.transcription_agent import TranscriptionAgent
+from audio.live import Utterance, UtteranceSegmenter, pcm_to_wav
+from config.settings import settings
+from graph.workflow import ESCALATION_EVENT, arun_analysis, resolve_models
+from models.schemas import AgentState, EscalationEvent, TranscriptData, TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_TRANSCRIPT_EVENT = "partial_transcript"
+ROLLING_ANALYSIS_EVENT = "rolling_analysis"
+FINAL_EVENT = "final"
+
+
+def _transcript(segments: List[TranscriptSegment]) -> TranscriptData:
+    return TranscriptData(
+        segments=list(segments),
+        full_text=" ".join(segment.text for segment in segments),
+        confidence=0.95
+    )
+
+
+class _LiveCall:
+    """One call in progress: what has been heard and analyzed, and the tasks working on it"""
+
+    def __init__(self, sample_rate: int, models: Dict[str, str], events: asyncio.Queue, call_id: str):
+        self.sample_rate = sample_rate
+        self.call_id = call_id
+        self.transcriber = TranscriptionAgent(backend=models["transcription"])
+        self.summarizer = SummarizationAgent(model=models["summarization"])
+        self.abuse_detector = AbuseDetectionAgent(model=models["abuse_detection"], on_escalation=self._escalated)
+
+        self.segments: List[TranscriptSegment] = []
+        self.summary = None
+        self.abuse_flags = []
+        self.escalation: Optional[EscalationEvent] = None
+        self.errors: List[str] = []
+
+        self._events = events
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(settings.TRANSCRIPTION_MAX_CONCURRENCY)
+        self._tasks = set()
+        self._last_recognized: Optional[asyncio.Task] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self._heard_ms = 0  # end of the latest utterance recognized
+        self._analyzed_ms = 0  # call time covered by the latest refresh
+
+    def state(self) -> dict:
+        return {
+            "call_id": self.call_id,
+            "transcript": _transcript(self.segments),
+            "summary": self.summary,
+            "abuse_flags": list(self.abuse_flags),
+            "escalation": self.escalation,
+            "errors": list(self.errors),
+        }
+
+    def emit(self, event: str, update: dict, state: Optional[dict] = None) -> None:
+        # Thread-safe: token callbacks may run outside the event loop's thread
+        item = (event, update, self.state() if state is None else state)
+        self._loop.call_soon_threadsafe(self._events.put_nowait, item)
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def recognize(self, utterance: Utterance) -> None:
+        """Start transcribing an utterance; its segments follow the previous utterance's"""
+        self._last_recognized = self._spawn(self._recognize(utterance, self._last_recognized))
+
+    async def _recognize(self, utterance: Utterance, previous: Optional[asyncio.Task]) -> None:
+        try:
+            async with self._slots:
+                segments = await self.transcriber.atranscribe_utterance(
+                    pcm_to_wav(utterance.pcm, self.sample_rate), f"{self.call_id}-{utterance.start_ms}.wav",
+                    utterance.start_ms, utterance.end_ms
+                )
+        except Exception as e:
+            logger.warning("Live transcription failed at %d ms: %s", utterance.start_ms, e)
+            self.errors.append(f"Transcription failed for {utterance.start_ms}-{utterance.end_ms} ms: {e}")
+            segments = []
+
+        if previous is not None:
+            await previous
+        self._heard_ms = utterance.end_ms
+        if segments:
+            self.segments.extend(segments)
+            self.emit(PARTIAL_TRANSCRIPT_EVENT, {"transcript": _transcript(segments)})
+            self._maybe_refresh()
+
+    def _maybe_refresh(self) -> None:
+        if self._refresh is not None and not self._refresh.done():
+            return  # one refresh at a time; the next one picks up everything new
+        if self._heard_ms - self._analyzed_ms >= settings.LIVE_ANALYSIS_INTERVAL_SECONDS * 1000:
+            self._refresh = self._spawn(self._analyze())
+
+    async def _analyze(self) -> None:
+        """Refresh the rolling summary and abuse flags from the transcript so far"""
+        self._analyzed_ms = self._heard_ms
+        transcript = _transcript(self.segments)
+        state = AgentState(
+            raw_input=transcript.full_text,
+            input_type="transcript",
+            call_id=self.call_id,
+            transcript=transcript,
+            escalation=self.escalation  # escalate once per call
+        )
+        try:
+            summarized, screened = await asyncio.gather(
+                self.summarizer.arun(state.model_copy(deep=True)),
+                self.abuse_detector.arun(state.model_copy(deep=True)),
+            )
+        except Exception as e:
+            logger.warning("Rolling analysis failed: %s", e)
+            self.errors.append(f"Rolling analysis failed: {e}")
+            return
+
+        self.summary = summarized.summary
+        self.abuse_flags = screened.abuse_flags
+        self.emit(ROLLING_ANALYSIS_EVENT, {"summary": self.summary, "abuse_flags": self.abuse_flags})
+
+    def _escalated(self, event: EscalationEvent) -> None:
+        if self.escalation is None:
+            self.escalation = event
+            self.emit(ESCALATION_EVENT, {"escalation": event})
+
+    async def finish(self, models: Dict[str, str], parallel: bool, profile: str) -> dict:
+        """Analyze the whole call once every utterance is transcribed"""
+        if self._last_recognized is not None:
+            await self._last_recognized
+        if self._refresh is not None and not self._refresh.done():
+            self._refresh.cancel()  # superseded by the full analysis
+            await asyncio.gather(self._refresh, return_exceptions=True)
+
+        transcript = _transcript(self.segments)
+        final = await arun_analysis(
+            transcript.full_text, input_type="transcript", models=models,
+            parallel=parallel, profile=profile, call_id=self.call_id
+        )
+        # Keep the timed segments, and the compacted text the LLM stages saw
+        analyzed = final.get("transcript")
+        final["transcript"] = transcript.model_copy(
+            update={"compact_text": analyzed.compact_text if analyzed else None}
+        )
+        final["escalation"] = self.escalation or final.get("escalation")
+        final["errors"] = self.errors + list(final.get("errors", []))
+        return final
+
+    def cancel(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+
+
+async def astream_live_analysis(
+    frames: AsyncIterable[bytes],
+    sample_rate: int,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    profile: str = "full",
+    call_id: Optional[str] = None
+) -> AsyncIterator[Tuple[str, dict, dict]]:
+    """Analyze a call while it happens, yielding progress as it is made
+
+    Args:
+        frames: 16-bit mono PCM frames of the call, as they arrive; the
+            stream ends at hang-up (e.g. audio.live.FileFrameSource)
+        sample_rate: Sample rate of the frames, in Hz
+        models: Optional per-agent model overrides (see DEFAULT_MODELS),
+            including the transcription backend
+        parallel, profile: Graph topology and pipeline profile of the final
+            analysis, see create_workflow()
+        call_id: Call ID to use (generated if not given)
+
+    Yields:
+        (event, update, state) tuples, see the module docstring.
+    """
+    models = resolve_models(models)
+    events: asyncio.Queue = asyncio.Queue()
+    call = _LiveCall(sample_rate, models, events, call_id or new_call_id())
+    done = object()
+
+    async def ingest():
+        try:
+            segmenter = UtteranceSegmenter(sample_rate)
+            async for frame in frames:
+                for utterance in segmenter.feed(frame):
+                    call.recognize(utterance)
+            tail = segmenter.flush()
+            if tail is not None:
+                call.recognize(tail)
+            final = await call.finish(models, parallel, profile)
+            call.emit(FINAL_EVENT, final, final)
+        finally:
+            # Scheduled like emit(), so it lands after every event already emitted
+            asyncio.get_running_loop().call_soon(events.put_nowait, done)
+
+    task = asyncio.create_task(ingest())
+    try:
+        while True:
+            event = await events.get()
+            if event is done:
+                break
+            yield event
+        await task  # re-raises a failure
+    finally:
+        task.cancel()
+        call.cancel()
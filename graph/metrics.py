@@ -0,0 +1,157 @@
+"""
+Per-node latency, token and cost capture
+
+Every chat model call made while a node runs reports its usage to a callback
+handler installed through a context variable, so agents need no changes: the
+handler is inherited by any chain they invoke in the same thread or task.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from config.settings import settings
+from llm.cache import CACHE_HIT_KEY
+from models.schemas import NodeMetrics
+
+
+class UsageTracker(BaseCallbackHandler):
+    """Accumulates token usage, LLM call and retry counts for one node"""
+
+    run_inline = True  # counters only; no need to hop to an executor
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.estimated_cost_usd = 0.0
+        self.models = []
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        if _is_cache_hit(response):
+            # Served from the response cache: no provider call, no tokens billed
+            with self._lock:
+                self.cache_hits += 1
+            return
+
+        prompt_tokens, completion_tokens, model = _usage_from_result(response)
+        cached_tokens = _cached_prompt_tokens(response)
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_prompt_tokens += cached_tokens
+            self.completion_tokens += completion_tokens
+            self.estimated_cost_usd += estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+            if model and model not in self.models:
+                self.models.append(model)
+
+    def on_retry(self, retry_state: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self.retries += 1
+
+
+_usage_tracker_var: ContextVar[Optional[UsageTracker]] = ContextVar("node_usage_tracker", default=None)
+register_configure_hook(_usage_tracker_var, inheritable=True)
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageTracker]:
+    """Collect usage from every chat model call made inside the block"""
+    tracker = UsageTracker()
+    token = _usage_tracker_var.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _usage_tracker_var.reset(token)
+
+
+def _is_cache_hit(response: LLMResult) -> bool:
+    return any(
+        (generation.generation_info or {}).get(CACHE_HIT_KEY)
+        for generations in response.generations
+        for generation in generations
+    )
+
+
+def _usage_from_result(response: LLMResult) -> tuple:
+    """Extract (prompt_tokens, completion_tokens, model) from a chat result"""
+    llm_output = response.llm_output or {}
+    model = llm_output.get("model_name") or llm_output.get("model") or ""
+
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                model = model or message.response_metadata.get("model_name") or message.response_metadata.get("model", "")
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0), model
+
+    # Fall back to provider-specific usage blocks
+    usage = llm_output.get("token_usage") or llm_output.get("usage") or {}
+    prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0))
+    completion_tokens = usage.get("completion_tokens", usage.get("output_tokens", 0))
+    return prompt_tokens or 0, completion_tokens or 0, model
+
+
+def _cached_prompt_tokens(response: LLMResult) -> int:
+    """Prompt tokens the provider read from its prompt-prefix cache
+
+    Both OpenAI (prompt_tokens_details.cached_tokens) and Anthropic
+    (cache_read_input_tokens) surface as input_token_details["cache_read"],
+    and both count them in input_tokens too.
+    """
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return (usage.get("input_token_details") or {}).get("cache_read") or 0
+    return 0
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int = 0) -> float:
+    """Estimated USD cost of a call, or 0.0 for models without known pricing
+
+    cached_prompt_tokens are part of prompt_tokens, billed at the cached rate.
+    """
+    if not model:
+        return 0.0
+
+    matches = [name for name in settings.MODEL_PRICING if model.startswith(name)]
+    if not matches:
+        return 0.0
+
+    prompt_price, cached_price, completion_price = settings.MODEL_PRICING[max(matches, key=len)]
+    cached_prompt_tokens = min(cached_prompt_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_prompt_tokens) * prompt_price
+        + cached_prompt_tokens * cached_price
+        + completion_tokens * completion_price
+    ) / 1_000_000
+
+
+def node_metrics(node: str, started_at: datetime, ended_at: datetime, tracker: UsageTracker) -> NodeMetrics:
+    """Build the metrics record for one node execution"""
+    return NodeMetrics(
+        node=node,
+        started_at=started_at,
+        ended_at=ended_at,
+        duration_ms=(ended_at - started_at).total_seconds() * 1000,
+        prompt_tokens=tracker.prompt_tokens,
+        completion_tokens=tracker.completion_tokens,
+        cached_prompt_tokens=tracker.cached_prompt_tokens,
+        llm_calls=tracker.llm_calls,
+        cache_hits=tracker.cache_hits,
+        retries=tracker.retries,
+        estimated_cost_usd=round(tracker.estimated_cost_usd, 6),
+        models=tracker.models
+    )
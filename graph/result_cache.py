@@ -0,0 +1,107 @@
+"""
+Final-result cache for whole analyses
+
+Keyed by a hash of the call content (transcript text or audio bytes) and the
+pipeline configuration, so a call that any replica has already analyzed is
+returned without running the graph. Backed by Redis when REDIS_URL is set,
+falling back to in-process memory while Redis is unreachable; without Redis
+the cache is per-process.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from agents.intake_agent import new_call_id
+from config.settings import settings
+from llm.stores import MemoryStore, RedisStore, get_redis_client
+from models.schemas import AgentState
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Return the process-wide result store, or None when result caching is disabled"""
+    global _result_store
+
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+
+    with _result_store_lock:
+        if _result_store is None:
+            memory = MemoryStore(max_entries=256, ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS)
+            redis_client = get_redis_client()
+            if redis_client is None:
+                _result_store = memory
+            else:
+                _result_store = RedisStore(
+                    redis_client,
+                    namespace=f"{settings.CACHE_KEY_PREFIX}:result",
+                    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+                    fallback=memory,
+                )
+    return _result_store
+
+
+def result_key(
+    raw_input: str,
+    input_type: str,
+    audio_data: Optional[bytes],
+    models: Dict[str, str],
+    parallel: bool,
+    profile: str
+) -> str:
+    """Content hash of an analysis request"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        [settings.LLM_CACHE_NAMESPACE, input_type, models, parallel, profile,
+         settings.TRANSCRIPT_COMPACTION, settings.COMPACTION_DROP_FILLER, settings.AUDIO_PREENCODE,
+         settings.AUDIO_VAD_TRIM],
+        sort_keys=True
+    ).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(audio_data if audio_data is not None else raw_input.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_result(
+    store,
+    key: str,
+    audio_data: Optional[bytes] = None,
+    call_id: Optional[str] = None,
+    input_file_path: Optional[str] = None
+) -> Optional[dict]:
+    """Return a cached final state, or None on a miss or an unreadable entry
+
+    The analysis is reused, but the identity fields (call ID, file name and
+    intake timestamp) are the current request's, not the cached run's.
+    """
+    value = store.get(key)
+    if value is None:
+        return None
+    try:
+        state = AgentState.model_validate_json(value)
+    except ValueError:
+        return None  # written by an incompatible schema version
+    state.audio_data = audio_data
+    state.input_file_path = input_file_path
+    state.call_id = call_id or new_call_id()
+    if state.metadata is not None:
+        state.metadata = state.metadata.model_copy(update={
+            "call_id": state.call_id, "file_name": input_file_path, "timestamp": datetime.now()
+        })
+    if state.escalation is not None:
+        state.escalation = state.escalation.model_copy(update={"call_id": state.call_id})
+    return dict(state)
+
+
+def save_result(store, key: str, final_state: dict) -> None:
+    """Cache a final state; runs that recorded errors are not cached"""
+    state = AgentState.model_validate(final_state)
+    if state.errors:
+        return
+    # Audio bytes are part of the key already and can be large
+    store.set(key, state.model_dump_json(exclude={"audio_data"}))
@@ -1,36 +1,191 @@
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from pathlib import Path
+from datetime import datetime
+import asyncio
+import operator
+import threading
+import time
 from models.schemas import AgentState
 from agents.input_validation_agent import InputValidationAgent
-from agents.intake_agent import IntakeAgent
+from agents.intake_agent import IntakeAgent, new_call_id
 from agents.transcription_agent import TranscriptionAgent
+from agents.compaction_agent import TranscriptCompactionAgent
 from agents.summarization_agent import SummarizationAgent
 from agents.critic_agent import CriticAgent
 from agents.abuse_detection_agent import AbuseDetectionAgent
 from agents.qa_scoring_agent import QAScoringAgent
+from agents.fast_analysis_agent import FastAnalysisAgent
+from graph.checkpointing import discard_checkpoint, get_checkpointer, spool_audio, thread_config
+from graph.metrics import track_usage, node_metrics
+from graph.result_cache import get_result_store, result_key, load_result, save_result
+from config.settings import settings
 
-def create_workflow():
-    """Create the multi-agent workflow with validation, analysis, and quality control"""
+# Default model for each LLM-backed agent, and the speech-to-text backend
+# (see audio/backends.py). Overrides passed to create_workflow / get_workflow
+# are merged on top of these.
+DEFAULT_MODELS: Dict[str, str] = {
+    "transcription": settings.TRANSCRIPTION_BACKEND,
+    "abuse_detection": "gpt-4o-mini",
+    "summarization": "gpt-4o-mini",
+    "critic": "claude-sonnet-4-20250514",
+    "qa_scoring": "gpt-4o-mini",
+    "fast_analysis": "gpt-4o-mini",
+}
+
+# Pipeline profiles: "full" runs the multi-agent analysis with the critic
+# revision loop; "fast" makes one combined structured-output call instead
+PIPELINE_PROFILES = ("full", "fast")
+
+# Pseudo node name stream_analysis yields early abuse escalations under
+ESCALATION_EVENT = "escalation"
+
+# Process-wide registry of compiled workflows, keyed by model configuration
+# and graph topology
+_compiled_workflows: Dict[tuple, object] = {}
+_compiled_workflows_lock = threading.Lock()
+
+
+# State fields merged with a reducer (see AgentState): nodes return only the
+# entries they appended, never the full list
+_APPEND_ONLY_FIELDS = tuple(
+    name for name, field in AgentState.model_fields.items()
+    if operator.add in field.metadata
+)
+
+
+def _isolate(state: AgentState) -> AgentState:
+    """Copy of the state with its own lists
+
+    Parallel branches get separate state objects that share the same list
+    instances, so an in-place append by one branch would otherwise show up
+    in another branch's changes.
+    """
+    return state.model_copy(update={
+        name: list(value) for name, value in state.__dict__.items() if isinstance(value, list)
+    })
+
+
+def _load_audio(state: AgentState) -> None:
+    """Read a checkpointed run's spooled recording into the node's copy of the state
+
+    Only until the transcript exists, since no later node needs the audio.
+    The bytes were there before the node ran, so they are never a change
+    and never reach a checkpoint.
+    """
+    if state.audio_path and state.audio_data is None and state.transcript is None:
+        state.audio_data = Path(state.audio_path).read_bytes()
+
+
+def _snapshot(state: AgentState) -> dict:
+    """Shallow copy of the state's fields, copying lists so appends show up"""
+    return {
+        name: list(value) if isinstance(value, list) else value
+        for name, value in state.__dict__.items()
+    }
+
+
+def _changes(before: dict, state: AgentState) -> dict:
+    """Fields an agent changed, with only the appended entries of log fields"""
+    update = {}
+    for name, value in state.__dict__.items():
+        if name in _APPEND_ONLY_FIELDS:
+            added = value[len(before[name]):]
+            if added:
+                update[name] = added
+        elif value is not before[name] and value != before[name]:
+            update[name] = value
+    return update
+
+
+def _as_node(
+    name: str,
+    run: Callable[[AgentState], AgentState],
+    arun: Optional[Callable[[AgentState], Awaitable[AgentState]]] = None
+) -> RunnableLambda:
+    """Adapt an agent's run()/arun() into a graph node that returns only its changes
+
+    Agents mutate and return the whole state. Handing that back to LangGraph
+    would re-append every log entry through the reducers and make parallel
+    branches collide on fields they never touched.
+
+    The node runs run() under invoke/stream and arun() under ainvoke/astream.
+    Agents without arun() do no I/O, so their run() is called inline. Each
+    execution also appends a NodeMetrics record with its timing and LLM usage.
+    """
+    def node(state: AgentState) -> dict:
+        state = _isolate(state)
+        _load_audio(state)
+        before = _snapshot(state)
+        with track_usage() as usage:
+            started_at = datetime.now()
+            state = run(state)
+        update = _changes(before, state)
+        update["node_metrics"] = [node_metrics(name, started_at, datetime.now(), usage)]
+        return update
+
+    async def anode(state: AgentState) -> dict:
+        state = _isolate(state)
+        await asyncio.to_thread(_load_audio, state)
+        before = _snapshot(state)
+        with track_usage() as usage:
+            started_at = datetime.now()
+            state = await arun(state) if arun else run(state)
+        update = _changes(before, state)
+        update["node_metrics"] = [node_metrics(name, started_at, datetime.now(), usage)]
+        return update
+
+    return RunnableLambda(node, afunc=anode, name=name)
+
+
+def resolve_models(models: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Merge model overrides onto DEFAULT_MODELS, rejecting unknown agents"""
+    models = models or {}
+    unknown = set(models) - set(DEFAULT_MODELS)
+    if unknown:
+        raise ValueError(f"Unknown agent(s) in model configuration: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_MODELS, **models}
+
+
+def create_workflow(
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    checkpointer=None,
+    profile: str = "full"
+):
+    """Create the multi-agent workflow with validation, analysis, and quality control
+
+    This builds fresh agents and LLM clients and recompiles the graph every time.
+    Use get_workflow() to reuse a compiled workflow across calls.
+
+    Args:
+        models: Optional per-agent model overrides (see DEFAULT_MODELS)
+        parallel: Run abuse detection, summarization/critic and QA scoring as
+            concurrent branches (True) or strictly one after another (False)
+        checkpointer: Optional LangGraph checkpointer that saves the state
+            after every node (see graph/checkpointing.py)
+        profile: "full" multi-agent analysis, or "fast" single combined call
+            (see PIPELINE_PROFILES)
+    """
+    models = resolve_models(models)
+    if profile not in PIPELINE_PROFILES:
+        raise ValueError(f"Unknown pipeline profile: {profile} (expected one of {', '.join(PIPELINE_PROFILES)})")
 
     # Initialize agents
-    validation_agent = InputValidationAgent()
+    validation_agent = InputValidationAgent(transcription_backend=models["transcription"])
     intake_agent = IntakeAgent()
-    transcription_agent = TranscriptionAgent()
-    abuse_detection_agent = AbuseDetectionAgent()
-    summarization_agent = SummarizationAgent()
-    critic_agent = CriticAgent()
-    qa_agent = QAScoringAgent()
+    transcription_agent = TranscriptionAgent(backend=models["transcription"])
+    compaction_agent = TranscriptCompactionAgent()
 
     # Create workflow graph
     workflow = StateGraph(AgentState)
 
     # Define agent nodes
-    workflow.add_node("validation", validation_agent.run)
-    workflow.add_node("intake", intake_agent.run)
-    workflow.add_node("transcription", transcription_agent.run)
-    workflow.add_node("abuse_detection", abuse_detection_agent.run)
-    workflow.add_node("summarization", summarization_agent.run)
-    workflow.add_node("critic", critic_agent.run)
-    workflow.add_node("qa_scoring", qa_agent.run)
+    workflow.add_node("validation", _as_node("validation", validation_agent.run))
+    workflow.add_node("intake", _as_node("intake", intake_agent.run))
+    workflow.add_node("transcription", _as_node("transcription", transcription_agent.run, transcription_agent.arun))
+    workflow.add_node("compaction", _as_node("compaction", compaction_agent.run))
 
     # Conditional routing functions
     def should_continue_after_validation(state):
@@ -40,11 +195,14 @@ def create_workflow():
         return "intake"
 
     def should_continue_after_critic(state):
-        """Decide whether to revise summary or continue to QA"""
-        if state.needs_revision and state.revision_count < 3:
+        """Decide whether to revise summary or finish the summary branch
+
+        The critic clears needs_revision once the limit is hit or the scores
+        stop improving; the count check is only a backstop.
+        """
+        if state.needs_revision and state.revision_count < critic_agent.max_revisions:
             return "summarization"
-        else:
-            return "qa_scoring"
+        return "done" if parallel else "qa_scoring"
 
     # Set entry point
     workflow.set_entry_point("validation")
@@ -59,53 +217,430 @@ def create_workflow():
         }
     )
 
-    # Linear flow: intake -> transcription -> abuse_detection
+    # Linear flow: intake -> transcription -> compaction
     workflow.add_edge("intake", "transcription")
-    workflow.add_edge("transcription", "abuse_detection")
+    workflow.add_edge("transcription", "compaction")
 
-    # After abuse detection, continue to summarization
-    workflow.add_edge("abuse_detection", "summarization")
+    if profile == "fast":
+        # One structured-output call fills summary, QA scores and abuse flags
+        fast_agent = FastAnalysisAgent(model=models["fast_analysis"])
+        workflow.add_node("fast_analysis", _as_node("fast_analysis", fast_agent.run, fast_agent.arun))
+        workflow.add_edge("compaction", "fast_analysis")
+        workflow.add_edge("fast_analysis", END)
+        return workflow.compile(checkpointer=checkpointer)
 
-    # Critic and revision loop
-    workflow.add_edge("summarization", "critic")
-    workflow.add_conditional_edges(
-        "critic",
-        should_continue_after_critic,
-        {
-            "summarization": "summarization",
-            "qa_scoring": "qa_scoring"
-        }
-    )
+    abuse_detection_agent = AbuseDetectionAgent(model=models["abuse_detection"])
+    critic_agent = CriticAgent(model=models["critic"])
+    summarization_agent = SummarizationAgent(model=models["summarization"], max_revisions=critic_agent.max_revisions)
+    qa_agent = QAScoringAgent(model=models["qa_scoring"])
+
+    workflow.add_node("abuse_detection", _as_node("abuse_detection", abuse_detection_agent.run, abuse_detection_agent.arun))
+    workflow.add_node("summarization", _as_node("summarization", summarization_agent.run, summarization_agent.arun))
+    workflow.add_node("critic", _as_node("critic", critic_agent.run, critic_agent.arun))
+    workflow.add_node("qa_scoring", _as_node("qa_scoring", qa_agent.run, qa_agent.arun))
 
-    # Final edge
-    workflow.add_edge("qa_scoring", END)
+    if parallel:
+        # Fan out: abuse detection, the summarize/critic loop and QA scoring
+        # only need the (compacted) transcript, so they run as concurrent branches whose
+        # results merge through the AgentState reducers
+        workflow.add_edge("compaction", "abuse_detection")
+        workflow.add_edge("compaction", "summarization")
+        workflow.add_edge("compaction", "qa_scoring")
+
+        workflow.add_edge("summarization", "critic")
+        workflow.add_conditional_edges(
+            "critic",
+            should_continue_after_critic,
+            {
+                "summarization": "summarization",
+                "done": END
+            }
+        )
+
+        # Fan in: the run ends once every branch has reached END
+        workflow.add_edge("abuse_detection", END)
+        workflow.add_edge("qa_scoring", END)
+    else:
+        # Sequential: abuse_detection -> summarization <-> critic -> qa_scoring
+        workflow.add_edge("compaction", "abuse_detection")
+        workflow.add_edge("abuse_detection", "summarization")
+        workflow.add_edge("summarization", "critic")
+        workflow.add_conditional_edges(
+            "critic",
+            should_continue_after_critic,
+            {
+                "summarization": "summarization",
+                "qa_scoring": "qa_scoring"
+            }
+        )
+        workflow.add_edge("qa_scoring", END)
 
     # Compile the workflow
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer)
 
     return app
 
 
+def get_workflow(
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    checkpoint: bool = False,
+    profile: str = "full"
+):
+    """Return the shared compiled workflow for a model configuration
+
+    The first call for a given configuration builds and compiles the graph;
+    later calls (from any thread) reuse it, along with its agents' LLM clients
+    and their warm connections.
+
+    Args:
+        models: Optional per-agent model overrides (see DEFAULT_MODELS)
+        parallel: Graph topology, see create_workflow()
+        checkpoint: Save state after every node to the SQLite checkpoint
+            database at settings.CHECKPOINT_DB_PATH
+        profile: Pipeline profile, see create_workflow()
+    """
+    model_key = tuple(sorted(resolve_models(models).items()))
+    checkpoint_db = settings.CHECKPOINT_DB_PATH if checkpoint else None
+    key = (model_key, parallel, checkpoint_db, profile)
+
+    app = _compiled_workflows.get(key)
+    if app is None:
+        with _compiled_workflows_lock:
+            # Re-check under the lock so concurrent callers compile only once
+            app = _compiled_workflows.get(key)
+            if app is None:
+                app = create_workflow(
+                    dict(model_key),
+                    parallel=parallel,
+                    checkpointer=get_checkpointer(checkpoint_db) if checkpoint_db else None,
+                    profile=profile
+                )
+                _compiled_workflows[key] = app
+
+    return app
+
+
+def _checkpointed_input(call_id: Optional[str], audio_data: Optional[bytes]) -> Tuple[str, Optional[str]]:
+    """Call ID of a checkpointed run, and the path its recording is spooled to"""
+    call_id = call_id or new_call_id()
+    # Checkpoints hold only the path: the recording would be copied into every one
+    return call_id, None if audio_data is None else spool_audio(call_id, audio_data)
+
+
+def _completed(call_id: str) -> None:
+    """Drop a completed run's checkpoints, which only a failed run needs"""
+    if not settings.CHECKPOINT_KEEP_COMPLETED:
+        discard_checkpoint(call_id)
+
+
+def clear_workflow_cache() -> None:
+    """Drop all compiled workflows (e.g. after rotating API keys)"""
+    with _compiled_workflows_lock:
+        _compiled_workflows.clear()
+
+
+def _result_cache_key(
+    raw_input: str,
+    input_type: str,
+    audio_data: Optional[bytes],
+    models: Optional[Dict[str, str]],
+    parallel: bool,
+    profile: str
+) -> Optional[str]:
+    """Result cache key for a run, or None if its content can't be hashed"""
+    if input_type != "transcript" and audio_data is None:
+        return None  # audio referenced only by path
+    return result_key(raw_input, input_type, audio_data, resolve_models(models), parallel, profile)
+
+
 def run_analysis(
     raw_input: str,
     input_type: str = "transcript",
     input_file_path: str = None,
-    audio_data: bytes = None
+    audio_data: bytes = None,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    call_id: Optional[str] = None,
+    checkpoint: bool = False,
+    profile: str = "full"
 ) -> dict:
-    """Run the complete call analysis workflow"""
+    """Run the complete call analysis workflow
+
+    profile selects the multi-agent "full" pipeline or the single-call
+    "fast" one (see PIPELINE_PROFILES).
+
+    With checkpoint=True the state is saved after every node under call_id
+    (generated if not given), and a failed run can be continued with
+    resume_analysis(call_id). The checkpoints are deleted once the run
+    completes (see settings.CHECKPOINT_KEEP_COMPLETED).
+
+    With RESULT_CACHE_ENABLED, a call whose content and configuration match
+    an earlier successful run returns that run's final state (see
+    graph/result_cache.py). Checkpointed runs bypass the cache.
+    """
+
+    audio_path = None
+    if checkpoint:
+        call_id, audio_path = _checkpointed_input(call_id, audio_data)
+
+    store = None if checkpoint else get_result_store()
+    key = None if store is None else _result_cache_key(raw_input, input_type, audio_data, models, parallel, profile)
+    if key:
+        cached = load_result(store, key, audio_data, call_id, input_file_path)
+        if cached is not None:
+            return cached
 
     # Create initial state
     initial_state = AgentState(
         raw_input=raw_input,
         input_type=input_type,
         input_file_path=input_file_path,
-        audio_data=audio_data
+        audio_data=None if audio_path else audio_data,
+        audio_path=audio_path,
+        call_id=call_id,
+        pipeline_profile=profile
     )
 
-    # Get workflow
-    app = create_workflow()
+    # Reuse the compiled workflow for this model configuration
+    app = get_workflow(models, parallel=parallel, checkpoint=checkpoint, profile=profile)
 
     # Run the workflow
-    final_state = app.invoke(initial_state)
+    if not checkpoint:
+        final_state = app.invoke(initial_state)
+        if key:
+            save_result(store, key, final_state)
+        return final_state
+
+    try:
+        final_state = app.invoke(initial_state, thread_config(call_id))
+    except Exception as e:
+        e.add_note(f"Completed nodes are checkpointed; continue with resume_analysis({call_id!r})")
+        raise
 
+    _completed(call_id)
     return final_state
+
+
+def resume_analysis(
+    call_id: str,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    profile: str = "full"
+) -> dict:
+    """Continue a checkpointed run from its last completed node
+
+    Nodes that already finished (e.g. transcription, earlier summary
+    revisions) are not run again; only the failed and pending ones are.
+
+    Args:
+        call_id: Call ID the run was checkpointed under
+        models: Model overrides to use for the remaining nodes
+        parallel: Must match the topology the run was started with
+        profile: Must match the pipeline profile the run was started with
+
+    Returns:
+        The final state (immediately, if the run had already completed and
+        was kept with settings.CHECKPOINT_KEEP_COMPLETED)
+    """
+    app = get_workflow(models, parallel=parallel, checkpoint=True, profile=profile)
+    config = thread_config(call_id)
+
+    snapshot = app.get_state(config)
+    if not snapshot.values:
+        raise KeyError(f"No checkpoint found for call {call_id}")
+
+    if not snapshot.next:
+        return snapshot.values
+
+    # Invoking with no input resumes the thread from its latest checkpoint
+    final_state = app.invoke(None, config)
+    _completed(call_id)
+    return final_state
+
+
+def stream_analysis(
+    raw_input: str,
+    input_type: str = "transcript",
+    input_file_path: str = None,
+    audio_data: bytes = None,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    call_id: Optional[str] = None,
+    checkpoint: bool = False,
+    profile: str = "full"
+) -> Iterator[Tuple[str, dict, dict]]:
+    """Run the workflow, yielding progress as each node finishes
+
+    Profiles and checkpointing work as in run_analysis().
+
+    Yields:
+        (node_name, update, state) tuples, where update holds only the fields
+        that node changed and state is the merged state so far. The state in
+        the last tuple is the final state run_analysis would have returned.
+
+        An escalation raised by the abuse detection agent while its response
+        is still streaming is yielded at once, as (ESCALATION_EVENT,
+        {"escalation": event}, state), ahead of that node's own update.
+    """
+    audio_path = None
+    if checkpoint:
+        call_id, audio_path = _checkpointed_input(call_id, audio_data)
+
+    initial_state = AgentState(
+        raw_input=raw_input,
+        input_type=input_type,
+        input_file_path=input_file_path,
+        audio_data=None if audio_path else audio_data,
+        audio_path=audio_path,
+        call_id=call_id,
+        pipeline_profile=profile
+    )
+
+    app = get_workflow(models, parallel=parallel, checkpoint=checkpoint, profile=profile)
+    config = thread_config(call_id) if checkpoint else None
+
+    state = dict(initial_state)
+    for mode, chunk in app.stream(initial_state, config, stream_mode=["updates", "custom"]):
+        if mode == "custom":
+            if "escalation" in chunk:
+                yield ESCALATION_EVENT, chunk, dict(state)
+            continue
+        for node_name, update in chunk.items():
+            update = update or {}
+            for name, value in update.items():
+                if name in _APPEND_ONLY_FIELDS:
+                    state[name] = state[name] + value
+                else:
+                    state[name] = value
+            yield node_name, update, dict(state)
+
+    if checkpoint:
+        _completed(call_id)
+
+
+async def arun_analysis(
+    raw_input: str,
+    input_type: str = "transcript",
+    input_file_path: str = None,
+    audio_data: bytes = None,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    profile: str = "full",
+    call_id: Optional[str] = None
+) -> dict:
+    """Async version of run_analysis
+
+    Every LLM and Whisper call is awaited, so one event loop can serve many
+    concurrent analyses without a blocked thread per call.
+    """
+    store = get_result_store()
+    key = None if store is None else _result_cache_key(raw_input, input_type, audio_data, models, parallel, profile)
+    if key:
+        cached = load_result(store, key, audio_data, call_id, input_file_path)
+        if cached is not None:
+            return cached
+
+    initial_state = AgentState(
+        raw_input=raw_input,
+        input_type=input_type,
+        input_file_path=input_file_path,
+        audio_data=audio_data,
+        call_id=call_id,
+        pipeline_profile=profile
+    )
+
+    app = get_workflow(models, parallel=parallel, profile=profile)
+
+    final_state = await app.ainvoke(initial_state)
+    if key:
+        save_result(store, key, final_state)
+
+    return final_state
+
+
+def _batch_item_kwargs(item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalize a batch item into arun_analysis keyword arguments
+
+    An item is either a transcript string or a dict of run_analysis arguments
+    (which may override the batch-wide models, parallel or profile).
+    Audio items may give just input_file_path; the file is read when the item
+    is processed, so a large backfill never holds every recording in memory.
+    """
+    if isinstance(item, str):
+        return {"raw_input": item, "input_type": "transcript"}
+
+    kwargs = {"raw_input": "", **item}
+    if kwargs.get("input_type") == "audio" and kwargs.get("audio_data") is None:
+        path = kwargs.get("input_file_path")
+        if not path:
+            raise ValueError("Audio batch item needs audio_data or input_file_path")
+        kwargs["audio_data"] = Path(path).read_bytes()
+        kwargs["input_file_path"] = Path(path).name
+    return kwargs
+
+
+async def arun_analysis_batch(
+    items: List[Union[str, Dict[str, Any]]],
+    max_concurrency: int = 8,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    profile: str = "full"
+) -> List[dict]:
+    """Analyze many transcripts/audio files through one shared compiled graph
+
+    Args:
+        items: Transcript strings, or dicts of run_analysis arguments
+        max_concurrency: Maximum number of analyses in flight at once
+        models: Optional per-agent model overrides (see DEFAULT_MODELS)
+        parallel: Graph topology, see create_workflow()
+        profile: Default pipeline profile for items that don't set their own
+
+    Returns:
+        One result dict per item, in input order, with keys index, success,
+        state (final state or None), error (message or None) and latency_ms.
+        A failing item is reported in its result and never aborts the batch.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    # Compile once up front rather than racing on the first few items
+    get_workflow(models, parallel=parallel, profile=profile)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze(index: int, item) -> dict:
+        async with semaphore:
+            start_time = time.perf_counter()
+            result = {"index": index, "success": False, "state": None, "error": None}
+            try:
+                kwargs = await asyncio.to_thread(_batch_item_kwargs, item)
+                kwargs = {"models": models, "parallel": parallel, "profile": profile, **kwargs}
+                result["state"] = await arun_analysis(**kwargs)
+                result["success"] = True
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["latency_ms"] = (time.perf_counter() - start_time) * 1000
+            return result
+
+    return await asyncio.gather(*(analyze(i, item) for i, item in enumerate(items)))
+
+
+def run_analysis_batch(
+    items: List[Union[str, Dict[str, Any]]],
+    max_concurrency: int = 8,
+    models: Optional[Dict[str, str]] = None,
+    parallel: bool = True,
+    profile: str = "full"
+) -> List[dict]:
+    """Synchronous wrapper around arun_analysis_batch
+
+    Must not be called from inside a running event loop; await
+    arun_analysis_batch there instead.
+    """
+    return asyncio.run(arun_analysis_batch(
+        items,
+        max_concurrency=max_concurrency,
+        models=models,
+        parallel=parallel,
+        profile=profile
+    ))
@@ -0,0 +1 @@
+# LLM client infrastructure shared by agents and evaluators
@@ -0,0 +1,159 @@
+"""
+Content-addressed LLM response cache
+
+Plugs into LangChain's chat model cache hook, so a chain needs no changes:
+the model looks up the rendered prompt messages together with its own
+serialized configuration (model name, sampling params, bound tools and
+structured-output schema) before calling the provider. Any change to a prompt
+template, model or parameter therefore produces a new key on its own;
+settings.LLM_CACHE_NAMESPACE can be bumped to drop everything at once.
+
+Entries live in a size-bounded in-memory LRU in front of an optional
+persistent tier: a SQLite file, or a Redis server shared by all replicas.
+Both tiers have a TTL. Re-analyzing a transcript (a sample, a retried job,
+an eval rerun) is then served from the cache instead of the API.
+"""
+
+import hashlib
+import threading
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from config.settings import settings
+from llm.stores import MemoryStore, SQLiteStore, RedisStore, get_redis_client
+
+# generation_info flag set on every generation served from the cache, so usage
+# tracking can tell cache hits from real provider calls
+CACHE_HIT_KEY = "llm_cache_hit"
+
+
+class ResponseCache(BaseCache):
+    """Two-tier (memory LRU + SQLite or Redis) LangChain cache with TTLs and counters"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        namespace: str = "v1",
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 10000,
+        memory_entries: int = 1000,
+        store=None,
+    ):
+        """
+        Args:
+            db_path: SQLite file for the persistent tier; None keeps entries
+                in memory only.
+            namespace: Mixed into every key; changing it invalidates the cache.
+            ttl_seconds: Entry lifetime; None or 0 never expires.
+            max_entries: Size bound of the persistent tier (least recently
+                used entries are evicted first).
+            memory_entries: Size bound of the in-memory LRU tier.
+            store: Persistent tier to use instead of SQLite (e.g. a
+                RedisStore shared between replicas).
+        """
+        self.namespace = namespace
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = MemoryStore(max_entries=memory_entries, ttl_seconds=ttl_seconds)
+        if store is None and db_path:
+            store = SQLiteStore(db_path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._store = store
+        self._lock = threading.Lock()
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.namespace, llm_string, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _get(self, key: str) -> Optional[str]:
+        value = self._memory.get(key)
+        if value is None and self._store is not None:
+            value = self._store.get(key)
+            if value is not None:
+                self._memory.set(key, value)
+        return value
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        value = self._get(self._key(prompt, llm_string))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        try:
+            generations = loads(value, allowed_objects="core")
+        except TypeError:
+            # Older langchain-core releases load without an allow-list
+            generations = loads(value)
+        for generation in generations:
+            generation.generation_info = {**(generation.generation_info or {}), CACHE_HIT_KEY: True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        value = dumps(list(return_val))
+        self._memory.set(key, value)
+        if self._store is not None:
+            self._store.set(key, value)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._memory.clear()
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters since the cache was created"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self._memory.evictions + getattr(self._store, "evictions", 0),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+_llm_cache: Optional[ResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled
+
+    Pass the result as the `cache` argument of a chat model. None leaves the
+    model on LangChain's global cache setting (off by default).
+    """
+    global _llm_cache
+
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            # Shared Redis (if configured) replaces the per-machine SQLite file
+            store = None
+            redis_client = get_redis_client()
+            if redis_client is not None:
+                store = RedisStore(
+                    redis_client,
+                    namespace=f"{settings.CACHE_KEY_PREFIX}:llm",
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                    fallback=MemoryStore(max_entries=0),  # the memory tier already covers outages
+                )
+            _llm_cache = ResponseCache(
+                db_path=settings.LLM_CACHE_PATH or None,
+                store=store,
+                namespace=settings.LLM_CACHE_NAMESPACE,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+            )
+    return _llm_cache
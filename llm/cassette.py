@@ -0,0 +1,154 @@
+"""
+Record/replay cassettes for routed LLM calls
+
+Every agent and evaluator call goes through RoutedChain (llm/router.py),
+which consults the active cassette:
+
+- record: calls run normally. Each response is appended to a JSON-lines
+  file together with the model that produced it and the observed latency.
+- replay: responses come from the file and nothing reaches a provider.
+  Optionally each call sleeps for its recorded latency, so timings stay
+  realistic. A call that was never recorded raises CassetteMiss.
+
+Entries are keyed by a hash of the role, the rendered prompt messages and
+the structured-output schema. The model is left out, so a replay doesn't
+depend on which candidate the router would pick.
+
+The mode comes from settings.LLM_CASSETTE_MODE, or from use_cassette() in
+tests and benchmarks. Record with LLM_CACHE_ENABLED=false to capture real
+provider latencies rather than cache hits.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+
+from config.settings import settings
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """A replayed call has no recorded response"""
+
+
+class Cassette:
+    """JSON-lines file of recorded LLM responses, loaded into memory"""
+
+    def __init__(self, path: str, mode: str = "replay", replay_latency: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode} (expected record or replay)")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry  # later recordings win
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(role: str, prompt, inputs: dict, schema: Optional[type]) -> str:
+        """Hash of what a call sends: role, rendered messages and output schema"""
+        messages = [(m.type, m.content) for m in prompt.invoke(inputs).to_messages()]
+        payload = json.dumps([role, messages, schema.__name__ if schema else None], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def record(self, key: str, role: str, model: str, output: Any, latency: float) -> None:
+        if isinstance(output, AIMessage):
+            kind, data = "message", output.content
+        else:
+            kind, data = "structured", output.model_dump(mode="json")
+        entry = {"key": key, "role": role, "model": model, "kind": kind, "output": data,
+                 "latency_s": round(latency, 4)}
+        with self._lock:
+            self._entries[key] = entry
+            self.recorded += 1
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def _lookup(self, key: str, role: str, schema: Optional[type]) -> Tuple[Any, str, float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            raise CassetteMiss(f"No recorded response for {role} call {key[:12]} in {self.path}")
+        if entry["kind"] == "message":
+            output = AIMessage(content=entry["output"])
+        else:
+            output = schema.model_validate(entry["output"])
+        return output, entry["model"], entry["latency_s"] if self.replay_latency else 0.0
+
+    def replay(self, key: str, role: str, schema: Optional[type]) -> Tuple[Any, str]:
+        output, model, delay = self._lookup(key, role, schema)
+        if delay:
+            time.sleep(delay)
+        return output, model
+
+    async def areplay(self, key: str, role: str, schema: Optional[type]) -> Tuple[Any, str]:
+        output, model, delay = self._lookup(key, role, schema)
+        if delay:
+            await asyncio.sleep(delay)
+        return output, model
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"mode": self.mode, "entries": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "recorded": self.recorded}
+
+
+_active: Optional[Cassette] = None
+_settings_cassette: Optional[Cassette] = None
+_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The cassette in use: set by use_cassette(), else from settings, else None"""
+    global _settings_cassette
+    if _active is not None:
+        return _active
+    if settings.LLM_CASSETTE_MODE == "off":
+        return None
+    with _lock:
+        if _settings_cassette is None:
+            _settings_cassette = Cassette(
+                settings.LLM_CASSETTE_PATH,
+                mode=settings.LLM_CASSETTE_MODE,
+                replay_latency=settings.LLM_CASSETTE_REPLAY_LATENCY,
+            )
+    return _settings_cassette
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", replay_latency: bool = False) -> Iterator[Cassette]:
+    """Record or replay every routed LLM call made inside the block (process-wide)"""
+    global _active
+    cassette = Cassette(path, mode=mode, replay_latency=replay_latency)
+    with _lock:
+        previous, _active = _active, cassette
+    try:
+        yield cassette
+    finally:
+        with _lock:
+            _active = previous
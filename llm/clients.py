@@ -0,0 +1,232 @@
+"""
+Shared LLM clients and HTTP connection pools
+
+Every agent and evaluator gets its chat model and SDK client from here, so
+they all send requests over the same keep-alive connection pools instead of
+each opening (and TLS-handshaking) its own. HTTP/2 is used when the optional
+h2 package is installed, multiplexing concurrent requests to a provider over
+one connection.
+
+Chat models are memoized per (model, temperature, API key): building a
+workflow or an evaluator a second time reuses the existing clients.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+from langchain_anthropic import ChatAnthropic
+from langchain_openai import ChatOpenAI
+
+from config.settings import settings
+from llm.cache import get_llm_cache
+from llm.rate_limit import RateLimitedChatModel
+
+_lock = threading.RLock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_chat_models = {}
+_openai_clients = {}
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    # SDKs pass per-request timeouts; this only bounds connection setup
+    return httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=10.0)
+
+
+class _LoopLocalTransport(httpx.AsyncBaseTransport):
+    """One async connection pool per event loop
+
+    Pooled connections belong to the loop that opened them. Sync entry points
+    such as run_analysis_batch start a fresh loop per call, so a single pool
+    would hand out connections from a closed loop; this keeps one per loop
+    and drops it together with the loop.
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._transports = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+                self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class RateLimitedChatOpenAI(RateLimitedChatModel, ChatOpenAI):
+    _provider = "openai"
+
+    def _get_request_payload(self, input_, *, stop=None, **kwargs) -> dict:
+        # cache_control marks Anthropic cache breakpoints (agents/prompts.py);
+        # OpenAI caches prompt prefixes on its own and has no such field.
+        # Blocks are copied: the payload shares them with the input messages.
+        payload = super()._get_request_payload(input_, stop=stop, **kwargs)
+        for message in payload.get("messages", []):
+            if isinstance(message.get("content"), list):
+                message["content"] = [
+                    {k: v for k, v in block.items() if k != "cache_control"} if isinstance(block, dict) else block
+                    for block in message["content"]
+                ]
+        return payload
+
+
+class RateLimitedChatAnthropic(RateLimitedChatModel, ChatAnthropic):
+    _provider = "anthropic"
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide sync httpx client with a tuned keep-alive pool"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                http2=http2_available(),
+                limits=_limits(),
+                timeout=_timeout(),
+            )
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Process-wide async httpx client (pooled per event loop)"""
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(
+                transport=_LoopLocalTransport(http2=http2_available(), limits=_limits()),
+                timeout=_timeout(),
+            )
+    return _async_http_client
+
+
+def chat_openai(model: str, temperature: Optional[float] = None):
+    """Shared rate-limited ChatOpenAI for a model, on the shared pools and response cache"""
+    key = ("openai", model, temperature, os.getenv("OPENAI_API_KEY"))
+    with _lock:
+        llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+
+    kwargs = {} if temperature is None else {"temperature": temperature}
+    llm = RateLimitedChatOpenAI(
+        model=model,
+        cache=get_llm_cache(),
+        max_retries=0,  # retried by the rate limiter instead
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        **kwargs
+    )
+    with _lock:
+        return _chat_models.setdefault(key, llm)
+
+
+def chat_anthropic(model: str, temperature: Optional[float] = None):
+    """Shared rate-limited ChatAnthropic for a model, on the response cache
+
+    langchain-anthropic keeps its own process-wide httpx pool per base URL
+    and has no hook to inject ours; sharing the model instance still avoids
+    one SDK client per agent.
+    """
+    key = ("anthropic", model, temperature, os.getenv("ANTHROPIC_API_KEY"))
+    with _lock:
+        llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+
+    kwargs = {} if temperature is None else {"temperature": temperature}
+    llm = RateLimitedChatAnthropic(
+        model=model,
+        cache=get_llm_cache(),
+        max_retries=0,  # retried by the rate limiter instead
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        **kwargs
+    )
+    with _lock:
+        return _chat_models.setdefault(key, llm)
+
+
+def provider_for(model: str) -> str:
+    """Provider serving a model name ("anthropic" for Claude models, else "openai")"""
+    return "anthropic" if model.startswith("claude") else "openai"
+
+
+def provider_configured(model: str) -> bool:
+    """Whether an API key is set for the model's provider"""
+    key = "ANTHROPIC_API_KEY" if provider_for(model) == "anthropic" else "OPENAI_API_KEY"
+    return bool(os.getenv(key))
+
+
+def chat_model(model: str, temperature: Optional[float] = None):
+    """Shared chat model for any supported model name, by provider"""
+    if provider_for(model) == "anthropic":
+        return chat_anthropic(model, temperature)
+    return chat_openai(model, temperature)
+
+
+def openai_client(api_key: str):
+    """Shared OpenAI SDK client (used for Whisper) on the sync pool
+
+    SDK retries are off; wrap calls in get_rate_limiter("openai", model).call.
+    """
+    from openai import OpenAI
+
+    with _lock:
+        client = _openai_clients.get(("sync", api_key))
+        if client is None:
+            client = OpenAI(api_key=api_key, http_client=get_http_client(), max_retries=0)
+            _openai_clients[("sync", api_key)] = client
+    return client
+
+
+def async_openai_client(api_key: str):
+    """Shared AsyncOpenAI SDK client (used for Whisper) on the async pool"""
+    from openai import AsyncOpenAI
+
+    with _lock:
+        client = _openai_clients.get(("async", api_key))
+        if client is None:
+            client = AsyncOpenAI(api_key=api_key, http_client=get_async_http_client(), max_retries=0)
+            _openai_clients[("async", api_key)] = client
+    return client
+
+
+def reset_clients() -> None:
+    """Forget shared clients (e.g. after changing API keys or pool settings)"""
+    global _http_client, _async_http_client
+    with _lock:
+        _chat_models.clear()
+        _openai_clients.clear()
+        _http_client = None
+        _async_http_client = None
@@ -0,0 +1,176 @@
+"""
+Hedged requests for idempotent (temperature-0) LLM calls
+
+A single slow completion dominates tail latency. For the roles listed in
+settings.HEDGED_ROLES, a call still running after the role's observed p95
+latency gets a duplicate, and whichever finishes first wins.
+
+- async: the loser is cancelled, so the call returns with the winner.
+- sync: both requests run on worker threads and the caller waits for the
+  first success. A thread can't be cancelled, so the loser is abandoned
+  and its response discarded when it arrives.
+
+Streamed calls are never hedged: two streams would feed one consumer.
+
+Hedging costs a duplicate request, so:
+- it only applies to temperature-0 routes, whose duplicates are
+  interchangeable
+- it starts once HEDGE_MIN_SAMPLES latencies have been observed
+- at most HEDGE_MAX_RATE of a role's calls are hedged
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from config.settings import settings
+
+T = TypeVar("T")
+
+# Runs hedged sync calls, so the caller can return without the loser
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+class Hedger:
+    """Latency window, hedge budget and counters for one role"""
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        max_rate: float = 0.1,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.quantile = quantile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a call answered by the provider"""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def threshold(self) -> Optional[float]:
+        """Observed latency quantile, or None until enough samples exist"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+    def _start_call(self) -> Optional[float]:
+        with self._lock:
+            self.calls += 1
+        return self.threshold()
+
+    def _take_hedge(self) -> bool:
+        """Spend one hedge if it keeps the hedge rate under max_rate"""
+        with self._lock:
+            if self.hedges_fired + 1 > self.max_rate * self.calls:
+                return False
+            self.hedges_fired += 1
+            return True
+
+    def _hedge_won(self) -> None:
+        with self._lock:
+            self.hedges_won += 1
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run fn, firing a duplicate if it outlasts the threshold; the first success wins"""
+        threshold = self._start_call()
+        if threshold is None:
+            return fn()
+
+        # Each request runs in its own copy of the caller's context
+        primary = _executor.submit(contextvars.copy_context().run, fn)
+        done, _ = concurrent.futures.wait({primary}, timeout=threshold)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        hedge = _executor.submit(contextvars.copy_context().run, fn)
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self._hedge_won()
+                        return future.result()
+                    error = error or future.exception()
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()  # a loser already running is abandoned
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async version of call; the losing request is cancelled"""
+        threshold = self._start_call()
+        if threshold is None:
+            return await fn()
+
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done or not self._take_hedge():
+            return await primary
+
+        hedge = asyncio.ensure_future(fn())
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedge_won()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        threshold = self.threshold()
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+                "threshold_s": None if threshold is None else round(threshold, 3),
+            }
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(role: str) -> Hedger:
+    """Process-wide hedger for a role, shared by every agent instance of it"""
+    with _hedgers_lock:
+        hedger = _hedgers.get(role)
+        if hedger is None:
+            hedger = Hedger(
+                quantile=settings.HEDGE_QUANTILE,
+                max_rate=settings.HEDGE_MAX_RATE,
+                min_samples=settings.HEDGE_MIN_SAMPLES,
+            )
+            _hedgers[role] = hedger
+    return hedger
+
+
+def hedge_stats() -> Dict[str, dict]:
+    """Counters for every role that has a hedger"""
+    with _hedgers_lock:
+        hedgers = dict(_hedgers)
+    return {role: hedger.stats() for role, hedger in hedgers.items()}
@@ -0,0 +1,398 @@
+"""
+Provider-aware rate limiting, adaptive concurrency and retries for LLM calls
+
+Every chat model from llm/clients.py sends its provider requests through the
+RateLimiter for its (provider, model):
+
+- two token buckets, one for requests per minute and one for estimated tokens
+  per minute, so a burst of long transcripts can't blow through TPM limits
+- an AIMD concurrency limit: it grows by one slot per window of fast
+  successes, is cut by a factor on every 429, and shrinks a little when
+  latency goes over target
+- jittered exponential retries (honouring Retry-After) for 429s, 5xx and
+  connection errors; each retry is reported to the callback manager, so
+  per-node metrics count it
+
+Cache hits never reach the limiter: LangChain checks the response cache
+before calling the model.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from config.settings import settings
+from llm.tokens import estimate_tokens
+
+T = TypeVar("T")
+
+# How long a blocked acquire sleeps between checks of the concurrency limit
+_POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return how long to wait before using them
+
+        The balance may go negative; later callers then wait for the debt to
+        be refilled, which keeps reservations in arrival order.
+        """
+        amount = min(amount, self.capacity)  # an oversized request still gets through
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit shared by sync and async callers"""
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float = 1,
+        maximum: float = 64,
+        backoff_factor: float = 0.5,
+        latency_target: Optional[float] = None,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff_factor = backoff_factor
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight < max(int(self.limit), 1):
+                self.in_flight += 1
+                return True
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def on_success(self, latency: float) -> None:
+        with self._lock:
+            if self.latency_target and latency > self.latency_target:
+                # Slow responses hint at provider-side queueing: ease off gently
+                self.limit = max(self.minimum, self.limit * 0.9)
+            else:
+                # Additive increase: about one slot per `limit` successes
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttled(self) -> None:
+        with self._lock:
+            self.limit = max(self.minimum, self.limit * self.backoff_factor)
+
+
+def _status_code(e: BaseException) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(e: BaseException) -> bool:
+    return _status_code(e) == 429
+
+
+def is_retryable(e: BaseException) -> bool:
+    """429s, server errors (incl. Anthropic's 529 overloaded) and connection failures"""
+    status = _status_code(e)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(e, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    # openai/anthropic wrap transport failures in their own APIConnectionError
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after(e: BaseException) -> float:
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _Wait:
+    """Full-jitter exponential backoff, but never shorter than Retry-After"""
+
+    def __init__(self, multiplier: float, maximum: float):
+        self._jitter = wait_random_exponential(multiplier=multiplier, max=maximum)
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        delay = self._jitter(retry_state)
+        outcome = retry_state.outcome
+        if outcome is not None and outcome.failed:
+            delay = max(delay, _retry_after(outcome.exception()))
+        return delay
+
+
+class RateLimiter:
+    """Request/token buckets, adaptive concurrency and retries for one model"""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int = 16,
+        max_retries: int = 4,
+        latency_target: Optional[float] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(
+            initial=max(1, max_concurrency // 2),
+            maximum=max_concurrency,
+            latency_target=latency_target,
+        )
+        self.max_retries = max_retries
+        self.throttled = 0
+        self.retries = 0
+
+    def _retry_kwargs(self, before_sleep: Callable[[RetryCallState], Any]) -> dict:
+        return {
+            "retry": retry_if_exception(is_retryable),
+            "wait": _Wait(multiplier=settings.LLM_RETRY_BASE_SECONDS, maximum=settings.LLM_RETRY_MAX_SECONDS),
+            "stop": stop_after_attempt(self.max_retries + 1),
+            "before_sleep": before_sleep,
+            "reraise": True,
+        }
+
+    def _record_failure(self, e: BaseException) -> None:
+        if is_rate_limited(e):
+            self.throttled += 1
+            self.concurrency.on_throttled()
+
+    def call(self, fn: Callable[[], T], tokens: int = 1, on_retry=None) -> T:
+        """Run fn under the limits, retrying retryable failures"""
+        def before_sleep(retry_state: RetryCallState) -> None:
+            self.retries += 1
+            if on_retry is not None:
+                on_retry(retry_state)
+
+        for attempt in Retrying(**self._retry_kwargs(before_sleep)):
+            with attempt:
+                time.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+                while not self.concurrency.try_acquire():
+                    time.sleep(_POLL_SECONDS)
+                started = time.monotonic()
+                try:
+                    result = fn()
+                except BaseException as e:
+                    self._record_failure(e)
+                    raise
+                finally:
+                    self.concurrency.release()
+                self.concurrency.on_success(time.monotonic() - started)
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 1, on_retry=None) -> T:
+        """Async version of call"""
+        async def before_sleep(retry_state: RetryCallState) -> None:
+            self.retries += 1
+            if on_retry is not None:
+                await on_retry(retry_state)  # async callback managers return coroutines
+
+        async for attempt in AsyncRetrying(**self._retry_kwargs(before_sleep)):
+            with attempt:
+                await asyncio.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+                while not self.concurrency.try_acquire():
+                    await asyncio.sleep(_POLL_SECONDS)
+                started = time.monotonic()
+                try:
+                    result = await fn()
+                except BaseException as e:
+                    self._record_failure(e)
+                    raise
+                finally:
+                    self.concurrency.release()
+                self.concurrency.on_success(time.monotonic() - started)
+        return result
+
+    def stream(self, start: Callable[[], Iterator[T]], tokens: int = 1, on_retry=None) -> Iterator[T]:
+        """Run a stream under the limits, holding its concurrency slot until it ends
+
+        Opening the stream is retried until its first chunk arrives; a failure
+        after that propagates, since chunks were already handed out.
+        """
+        def before_sleep(retry_state: RetryCallState) -> None:
+            self.retries += 1
+            if on_retry is not None:
+                on_retry(retry_state)
+
+        for attempt in Retrying(**self._retry_kwargs(before_sleep)):
+            with attempt:
+                time.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+                while not self.concurrency.try_acquire():
+                    time.sleep(_POLL_SECONDS)
+                started = time.monotonic()
+                try:
+                    chunks = start()
+                    first = next(chunks, None)
+                except BaseException as e:
+                    self._record_failure(e)
+                    self.concurrency.release()
+                    raise
+                # Time to first chunk: a long answer isn't a slow provider
+                self.concurrency.on_success(time.monotonic() - started)
+
+        try:
+            if first is not None:
+                yield first
+                yield from chunks
+        except BaseException as e:
+            self._record_failure(e)
+            raise
+        finally:
+            self.concurrency.release()
+
+    async def astream(self, start: Callable[[], AsyncIterator[T]], tokens: int = 1, on_retry=None) -> AsyncIterator[T]:
+        """Async version of stream"""
+        async def before_sleep(retry_state: RetryCallState) -> None:
+            self.retries += 1
+            if on_retry is not None:
+                await on_retry(retry_state)
+
+        async for attempt in AsyncRetrying(**self._retry_kwargs(before_sleep)):
+            with attempt:
+                await asyncio.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+                while not self.concurrency.try_acquire():
+                    await asyncio.sleep(_POLL_SECONDS)
+                started = time.monotonic()
+                try:
+                    chunks = start()
+                    first = await anext(chunks, None)
+                except BaseException as e:
+                    self._record_failure(e)
+                    self.concurrency.release()
+                    raise
+                self.concurrency.on_success(time.monotonic() - started)
+
+        try:
+            if first is not None:
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+        except BaseException as e:
+            self._record_failure(e)
+            raise
+        finally:
+            self.concurrency.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limits_for(model: str) -> tuple:
+    """(requests/min, tokens/min) for a model, matched by longest prefix"""
+    matches = [name for name in settings.RATE_LIMITS if model.startswith(name)]
+    if not matches:
+        return settings.DEFAULT_RATE_LIMIT
+    return settings.RATE_LIMITS[max(matches, key=len)]
+
+
+def get_rate_limiter(provider: str, model: str) -> RateLimiter:
+    """Process-wide limiter for a provider/model pair"""
+    key = (provider, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            rpm, tpm = _limits_for(model)
+            limiter = RateLimiter(
+                requests_per_minute=rpm,
+                tokens_per_minute=tpm,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                max_retries=settings.LLM_MAX_RETRIES,
+                latency_target=settings.LLM_LATENCY_TARGET_SECONDS,
+            )
+            _limiters[key] = limiter
+    return limiter
+
+
+class RateLimitedChatModel:
+    """Mixin sending a chat model's provider calls through its RateLimiter
+
+    Mix in ahead of the LangChain chat model class; `_provider` names the
+    provider bucket. The SDK's own retries should be disabled (max_retries=0)
+    so failures are retried here, with jitter and shared backoff.
+    """
+
+    _provider = "openai"
+
+    def _limiter_and_tokens(self, messages) -> tuple:
+        limiter = get_rate_limiter(self._provider, getattr(self, "model_name", None) or self.model)
+        text = "".join(str(m.content) for m in messages)
+        return limiter, estimate_tokens(text) + settings.LLM_COMPLETION_TOKEN_ESTIMATE
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter, tokens = self._limiter_and_tokens(messages)
+        return limiter.call(
+            lambda: super(RateLimitedChatModel, self)._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            tokens=tokens,
+            on_retry=run_manager.on_retry if run_manager else None,
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter, tokens = self._limiter_and_tokens(messages)
+        return await limiter.acall(
+            lambda: super(RateLimitedChatModel, self)._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            tokens=tokens,
+            on_retry=run_manager.on_retry if run_manager else None,
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter, tokens = self._limiter_and_tokens(messages)
+        yield from limiter.stream(
+            lambda: super(RateLimitedChatModel, self)._stream(messages, stop=stop, run_manager=run_manager, **kwargs),
+            tokens=tokens,
+            on_retry=run_manager.on_retry if run_manager else None,
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter, tokens = self._limiter_and_tokens(messages)
+        async for chunk in limiter.astream(
+            lambda: super(RateLimitedChatModel, self)._astream(messages, stop=stop, run_manager=run_manager, **kwargs),
+            tokens=tokens,
+            on_retry=run_manager.on_retry if run_manager else None,
+        ):
+            yield chunk
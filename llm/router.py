@@ -0,0 +1,428 @@
+"""
+Latency-aware model routing with failover
+
+Agents and evaluators ask for a role ("summarizer", "critic", "judge", ...)
+instead of one hard-coded model. settings.MODEL_ROUTES lists the equivalent
+candidate models for each role; the agent's configured model (DEFAULT_MODELS
+or an override) is the preferred one. For every call the router:
+
+- keeps the preferred model unless another candidate has been clearly
+  faster lately (EWMA latency, inflated by the EWMA error rate)
+- fails over to the next candidate when a call fails with a provider error
+  (429, 5xx or connection failure, after the rate limiter's own retries)
+- opens a circuit on a model after consecutive failures and skips it for a
+  cooldown, after which one call is let through to probe it
+
+Candidates whose provider has no API key configured are left out, and
+responses served from the LLM cache don't count towards latency. Routes for
+roles in settings.HEDGED_ROLES also hedge slow calls (see llm/hedging.py).
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from config.settings import settings
+from llm.cache import CACHE_HIT_KEY
+from llm.cassette import get_cassette
+from llm.clients import chat_model, provider_configured
+from llm.hedging import Hedger, get_hedger
+from llm.rate_limit import is_retryable
+
+T = TypeVar("T")
+
+
+class _CacheHitProbe(BaseCallbackHandler):
+    """Notes whether a routed call was answered from the LLM response cache"""
+
+    def __init__(self):
+        self.cache_hit = False
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        if any(
+            (generation.generation_info or {}).get(CACHE_HIT_KEY)
+            for generations in response.generations
+            for generation in generations
+        ):
+            self.cache_hit = True
+
+
+_probe_var: ContextVar[Optional[_CacheHitProbe]] = ContextVar("router_cache_probe", default=None)
+register_configure_hook(_probe_var, inheritable=True)
+
+
+class _TokenForwarder(BaseCallbackHandler):
+    """Passes each streamed token of a routed call to a callback"""
+
+    run_inline = True  # keep token order, and the caller's context
+
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        self.delivered = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.delivered = True
+            self.on_token(token)
+
+
+class _TokenStream:
+    """Token callbacks of one routed call, across its failover attempts"""
+
+    def __init__(self, on_token: Callable[[str], None], on_restart: Optional[Callable[[], None]]):
+        self.on_token = on_token
+        self.on_restart = on_restart
+        self._last: Optional[_TokenForwarder] = None
+
+    def attempt(self) -> _TokenForwarder:
+        """Forwarder for the next attempt, telling the caller if it starts over"""
+        if self._last is not None and self._last.delivered and self.on_restart is not None:
+            self.on_restart()
+        self._last = _TokenForwarder(self.on_token)
+        return self._last
+
+
+class ModelHealth:
+    """Live latency and error statistics for one model"""
+
+    def __init__(self):
+        self.latency: Optional[float] = None  # EWMA seconds, None until observed
+        self.error_rate = 0.0  # EWMA of failures (0-1)
+        self.consecutive_failures = 0
+        self.open_until = 0.0  # monotonic time the circuit stays open until
+        self.calls = 0
+        self.failures = 0
+        self.selected = 0
+
+    def score(self) -> Optional[float]:
+        """Expected seconds per successful call, None until a latency is known"""
+        if self.latency is None:
+            return None
+        return self.latency / max(1.0 - self.error_rate, 0.05)
+
+
+class ModelRouter:
+    """Ranks candidate models by live health and fails over between them"""
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        switch_ratio: float = 1.5,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 60.0,
+    ):
+        self.alpha = alpha
+        self.switch_ratio = switch_ratio
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def health(self, model: str) -> ModelHealth:
+        with self._lock:
+            return self._health.setdefault(model, ModelHealth())
+
+    def order(self, candidates: List[str]) -> List[str]:
+        """Candidates in the order to try them
+
+        The first healthy candidate leads unless another healthy one scores
+        better by more than switch_ratio. Models with an open circuit go last,
+        soonest-recovering first, so a call is still attempted when every
+        provider looks down.
+        """
+        now = time.monotonic()
+        healthy = [m for m in candidates if self.health(m).open_until <= now]
+        tripped = sorted((m for m in candidates if m not in healthy), key=lambda m: self.health(m).open_until)
+        if not healthy:
+            return tripped
+
+        preferred_score = self.health(healthy[0]).score()
+        scored = [(self.health(m).score(), m) for m in healthy[1:]]
+        scored = [(score, m) for score, m in scored if score is not None]
+        if preferred_score is not None and scored:
+            best_score, best = min(scored)
+            if best_score * self.switch_ratio < preferred_score:
+                healthy.remove(best)
+                healthy.insert(0, best)
+        return healthy + tripped
+
+    def record_success(self, model: str, latency: Optional[float]) -> None:
+        """Record a completed call; latency None means it wasn't a provider call"""
+        health = self.health(model)
+        with self._lock:
+            health.calls += 1
+            health.selected += 1
+            health.consecutive_failures = 0
+            health.open_until = 0.0
+            health.error_rate *= 1 - self.alpha
+            if latency is not None:
+                health.latency = latency if health.latency is None else (
+                    self.alpha * latency + (1 - self.alpha) * health.latency
+                )
+
+    def record_failure(self, model: str) -> None:
+        health = self.health(model)
+        with self._lock:
+            health.calls += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.error_rate = self.alpha + (1 - self.alpha) * health.error_rate
+            if health.consecutive_failures >= self.failure_threshold:
+                health.open_until = time.monotonic() + self.cooldown_seconds
+
+    def _attempt_failed(self, model: str, e: Exception) -> None:
+        if not is_retryable(e):
+            raise e  # bad request or parsing error: another provider won't help
+        self.record_failure(model)
+
+    def _succeeded(self, model: str, started: float, probe: _CacheHitProbe, hedger: Optional[Hedger]) -> None:
+        latency = None if probe.cache_hit else time.monotonic() - started
+        self.record_success(model, latency)
+        if hedger is not None and latency is not None:
+            hedger.observe(latency)
+
+    def invoke(
+        self,
+        candidates: List[str],
+        call: Callable[[str], T],
+        hedger: Optional[Hedger] = None
+    ) -> Tuple[T, str]:
+        """Call `call(model)` on the best candidate, failing over on provider errors
+
+        Args:
+            candidates: Models in order of preference
+            call: Makes the request to one model
+            hedger: Optional hedger duplicating slow calls to the same model
+
+        Returns:
+            (result, model that produced it)
+        """
+        error = None
+        for model in self.order(candidates):
+            probe = _CacheHitProbe()
+            token = _probe_var.set(probe)
+            started = time.monotonic()
+            try:
+                result = call(model) if hedger is None else hedger.call(lambda: call(model))
+            except Exception as e:
+                self._attempt_failed(model, e)
+                error = e
+                continue
+            finally:
+                _probe_var.reset(token)
+            self._succeeded(model, started, probe, hedger)
+            return result, model
+        raise error
+
+    async def ainvoke(
+        self,
+        candidates: List[str],
+        call: Callable[[str], Awaitable[T]],
+        hedger: Optional[Hedger] = None
+    ) -> Tuple[T, str]:
+        """Async version of invoke"""
+        error = None
+        for model in self.order(candidates):
+            probe = _CacheHitProbe()
+            token = _probe_var.set(probe)
+            started = time.monotonic()
+            try:
+                result = await (call(model) if hedger is None else hedger.acall(lambda: call(model)))
+            except Exception as e:
+                self._attempt_failed(model, e)
+                error = e
+                continue
+            finally:
+                _probe_var.reset(token)
+            self._succeeded(model, started, probe, hedger)
+            return result, model
+        raise error
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model: {
+                    "latency_ewma_s": None if h.latency is None else round(h.latency, 3),
+                    "error_rate": round(h.error_rate, 3),
+                    "calls": h.calls,
+                    "failures": h.failures,
+                    "selected": h.selected,
+                    "circuit_open": h.open_until > now,
+                }
+                for model, h in self._health.items()
+            }
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Process-wide router, so every agent sees the same provider health"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(
+                alpha=settings.ROUTER_EWMA_ALPHA,
+                switch_ratio=settings.ROUTER_SWITCH_RATIO,
+                failure_threshold=settings.ROUTER_FAILURE_THRESHOLD,
+                cooldown_seconds=settings.ROUTER_COOLDOWN_SECONDS,
+            )
+    return _router
+
+
+class Routed(NamedTuple):
+    """Output of a routed call and the model that produced it"""
+    output: Any
+    model: str
+
+
+class Route:
+    """The candidate models for one role, with per-model structured-output LLMs
+
+    Args:
+        role: Key into settings.MODEL_ROUTES
+        model: Preferred model, tried ahead of the configured candidates
+        temperature: Sampling temperature for every candidate
+        structured_output: Optional pydantic schema for with_structured_output
+    """
+
+    def __init__(
+        self,
+        role: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        structured_output: Optional[type] = None,
+        router: Optional[ModelRouter] = None,
+    ):
+        self.role = role
+        self.candidates = list(dict.fromkeys(([model] if model else []) + settings.MODEL_ROUTES.get(role, [])))
+        if not self.candidates:
+            raise ValueError(f"No models configured for role: {role}")
+        self.temperature = temperature
+        self.structured_output = structured_output
+        self.router = router or get_router()
+        # Duplicating a request is only safe when any answer is as good as another
+        hedged = role in settings.HEDGED_ROLES and temperature == 0
+        self.hedger = get_hedger(role) if hedged else None
+        self._llms: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> str:
+        return self.candidates[0]
+
+    def llm(self, model: str):
+        """LLM for one candidate, built on first use"""
+        with self._lock:
+            llm = self._llms.get(model)
+            if llm is None:
+                llm = chat_model(model, self.temperature)
+                if self.structured_output is not None:
+                    llm = llm.with_structured_output(self.structured_output)
+                self._llms[model] = llm
+        return llm
+
+    def available(self) -> List[str]:
+        """The preferred model plus fallbacks whose provider has an API key"""
+        return [self.primary] + [m for m in self.candidates[1:] if provider_configured(m)]
+
+    def bind(self, prompt) -> "RoutedChain":
+        """Chain running `prompt` on whichever model the router picks"""
+        return RoutedChain(self, prompt)
+
+
+class RoutedChain:
+    """prompt | llm, with the llm chosen per call by the route
+
+    Calls are recorded to or replayed from the active cassette, if any
+    (see llm/cassette.py).
+
+    Plain-text routes can also stream: with on_token, the provider call is
+    made in streaming mode and each token is passed to on_token as it
+    arrives. The call still returns the complete message. Responses served
+    from the LLM cache or a cassette produce no tokens. A call that fails
+    over mid-stream starts again on the next model: on_restart is called
+    first, so the caller can drop the failed attempt's partial output.
+    Streamed calls are never hedged.
+    """
+
+    def __init__(self, route: Route, prompt):
+        self.route = route
+        self.prompt = prompt
+
+    def _cassette_key(self, cassette, inputs: dict) -> str:
+        return cassette.key(self.route.role, self.prompt, inputs, self.route.structured_output)
+
+    def _runnable(self, model: str, stream: Optional[_TokenStream]):
+        llm = self.route.llm(model)
+        if stream is None:
+            return self.prompt | llm, None
+        if self.route.structured_output is not None:
+            raise ValueError("Token streaming is only supported for plain-text routes")
+        # stream_usage keeps token counts in the streamed response
+        return self.prompt | llm.bind(stream=True, stream_usage=True), {"callbacks": [stream.attempt()]}
+
+    def _hedger(self, stream: Optional[_TokenStream]) -> Optional[Hedger]:
+        # A duplicate request would feed its tokens into the same consumer
+        return None if stream is not None else self.route.hedger
+
+    def _call(self, model: str, inputs: dict, stream: Optional[_TokenStream]):
+        runnable, config = self._runnable(model, stream)
+        return runnable.invoke(inputs, config)
+
+    def _acall(self, model: str, inputs: dict, stream: Optional[_TokenStream]):
+        runnable, config = self._runnable(model, stream)
+        return runnable.ainvoke(inputs, config)
+
+    def invoke(
+        self,
+        inputs: dict,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_restart: Optional[Callable[[], None]] = None
+    ) -> Routed:
+        cassette = get_cassette()
+        if cassette is not None:
+            key = self._cassette_key(cassette, inputs)
+            if cassette.replaying:
+                return Routed(*cassette.replay(key, self.route.role, self.route.structured_output))
+
+        stream = _TokenStream(on_token, on_restart) if on_token is not None else None
+        started = time.monotonic()
+        output, model = self.route.router.invoke(
+            self.route.available(),
+            lambda model: self._call(model, inputs, stream),
+            hedger=self._hedger(stream),
+        )
+        if cassette is not None:
+            cassette.record(key, self.route.role, model, output, time.monotonic() - started)
+        return Routed(output, model)
+
+    async def ainvoke(
+        self,
+        inputs: dict,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_restart: Optional[Callable[[], None]] = None
+    ) -> Routed:
+        cassette = get_cassette()
+        if cassette is not None:
+            key = self._cassette_key(cassette, inputs)
+            if cassette.replaying:
+                return Routed(*await cassette.areplay(key, self.route.role, self.route.structured_output))
+
+        stream = _TokenStream(on_token, on_restart) if on_token is not None else None
+        started = time.monotonic()
+        output, model = await self.route.router.ainvoke(
+            self.route.available(),
+            lambda model: self._acall(model, inputs, stream),
+            hedger=self._hedger(stream),
+        )
+        if cassette is not None:
+            cassette.record(key, self.route.role, model, output, time.monotonic() - started)
+        return Routed(output, model)
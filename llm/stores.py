@@ -0,0 +1,219 @@
+"""
+Key/value stores behind the LLM response cache and the result cache
+
+All stores map string keys to string values with a TTL:
+- MemoryStore: in-process LRU, size-bounded
+- SQLiteStore: file-backed, survives restarts, one per machine
+- RedisStore: shared by every replica pointing at the same Redis; falls back
+  to an in-process MemoryStore while Redis is unreachable
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryStore:
+    """Size-bounded in-process LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or None
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _expired(entry[1], self.ttl_seconds):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """SQLite-backed store evicting least recently accessed entries past max_entries"""
+
+    def __init__(self, db_path: str, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or None
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if _expired(row[1], self.ttl_seconds):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+class RedisStore:
+    """Namespaced Redis store with an in-process fallback
+
+    Keys are stored as "{namespace}:{key}" with Redis-side expiry, so size is
+    bounded by the server's maxmemory policy (allkeys-lru recommended). When a
+    Redis call fails, the store logs once, serves from the fallback and only
+    retries Redis after retry_interval seconds, so an outage costs no latency.
+    """
+
+    def __init__(
+        self,
+        client,
+        namespace: str,
+        ttl_seconds: Optional[float] = None,
+        fallback: Optional[MemoryStore] = None,
+        retry_interval: float = 30.0,
+    ):
+        self.client = client
+        self.namespace = namespace
+        self.ttl_seconds = int(ttl_seconds) if ttl_seconds else None
+        self.fallback = fallback if fallback is not None else MemoryStore(ttl_seconds=ttl_seconds)
+        self.retry_interval = retry_interval
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _failed(self, e: Exception) -> None:
+        if self.available:
+            logger.warning("Redis unavailable (%s); using in-process cache for %ss", e, self.retry_interval)
+        self._down_until = time.monotonic() + self.retry_interval
+
+    def get(self, key: str) -> Optional[str]:
+        if self.available:
+            try:
+                value = self.client.get(self._key(key))
+                return value.decode("utf-8") if isinstance(value, bytes) else value
+            except Exception as e:
+                self._failed(e)
+        return self.fallback.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        if self.available:
+            try:
+                self.client.set(self._key(key), value, ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                self._failed(e)
+        self.fallback.set(key, value)
+
+    def clear(self) -> None:
+        """Delete every key in this store's namespace"""
+        self.fallback.clear()
+        if self.available:
+            try:
+                keys = list(self.client.scan_iter(match=self._key("*")))
+                if keys:
+                    self.client.delete(*keys)
+            except Exception as e:
+                self._failed(e)
+
+
+def _expired(created_at: float, ttl_seconds: Optional[float]) -> bool:
+    return ttl_seconds is not None and time.time() - created_at > ttl_seconds
+
+
+_redis_clients = {}
+_redis_clients_lock = threading.Lock()
+
+
+def get_redis_client(url: Optional[str] = None):
+    """Return a shared Redis client for the URL, or None if Redis isn't configured
+
+    Args:
+        url: Redis URL (defaults to settings.REDIS_URL); empty disables Redis.
+    """
+    url = url if url is not None else settings.REDIS_URL
+    if not url:
+        return None
+
+    with _redis_clients_lock:
+        client = _redis_clients.get(url)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("REDIS_URL is set but the redis package is missing (pip install redis)") from e
+
+            # Short timeouts: a slow or dead Redis must not stall an analysis
+            client = redis.Redis.from_url(
+                url,
+                socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+                socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            )
+            _redis_clients[url] = client
+    return client
@@ -0,0 +1,39 @@
+"""
+Token counting for budgeting and reporting
+
+Uses tiktoken when its encoding for the model is available; tiktoken
+downloads encodings on first use, so offline (or for non-OpenAI models) the
+count falls back to the ~4 characters per token rule of thumb.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Number of tokens `text` encodes to for `model` (estimated if no tokenizer)"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token)"""
+    return len(text or "") // 4 + 1
+
+
+def tokenizer_available(model: str = "gpt-4o-mini") -> bool:
+    return _encoding(model) is not None
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Annotated
 from datetime import datetime
+import operator
 
 # ===================
 # Enums
@@ -56,6 +57,60 @@ class TranscriptData(BaseModel):
     full_text: str
     language: str = "en"
     confidence: float = Field(default=1.0, ge=0.0, le=1.0)
+    compact_text: Optional[str] = None  # Token-compacted text sent to the LLM agents
+
+    @property
+    def prompt_text(self) -> str:
+        """Text to put in LLM prompts: the compacted transcript when available"""
+        return self.compact_text or self.full_text
+
+class CompactionStats(BaseModel):
+    """Token savings from transcript compaction (per LLM prompt)"""
+    original_tokens: int
+    compacted_tokens: int
+    dropped_turns: int = 0
+    tokenizer: str = "tiktoken"  # "tiktoken" | "estimate"
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.tokens_saved / self.original_tokens if self.original_tokens else 0.0
+
+class AudioEncodingStats(BaseModel):
+    """Upload savings from pre-encoding audio for speech recognition"""
+    original_bytes: int
+    encoded_bytes: int
+    encode_ms: float
+    codec: str  # e.g. "opus 24k, 16000 Hz mono"
+    applied: bool = True  # False when the original was smaller, or encoding failed, and it was sent instead
+    error: Optional[str] = None  # Why encoding failed, if it did
+    request_ms: Optional[float] = None  # Whisper request time (upload + recognition)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.encoded_bytes if self.applied else 0
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.bytes_saved / self.original_bytes if self.original_bytes else 0.0
+
+class SpeechTrimStats(BaseModel):
+    """Audio cut by voice-activity trimming before transcription"""
+    original_seconds: float
+    trimmed_seconds: float
+    cuts: int  # non-speech stretches removed
+    trim_ms: float
+
+    @property
+    def removed_seconds(self) -> float:
+        return self.original_seconds - self.trimmed_seconds
+
+    @property
+    def removed_ratio(self) -> float:
+        return self.removed_seconds / self.original_seconds if self.original_seconds else 0.0
 
 class CallSummary(BaseModel):
     """Summary generated by Summarization Agent"""
@@ -88,6 +143,10 @@ class SummaryCritique(BaseModel):
     revision_instructions: Optional[str] = None
     feedback: str
 
+    @property
+    def overall(self) -> float:
+        return round((self.faithfulness_score + self.completeness_score + self.conciseness_score) / 3, 1)
+
 class AbuseFlag(BaseModel):
     """Abuse detection result"""
     detected: bool = False
@@ -96,7 +155,22 @@ class AbuseFlag(BaseModel):
     severity: AbuseSeverity = AbuseSeverity.NONE
     evidence: List[str] = []
     recommended_action: str = ""
-    requires_escalation: bool = False
+    requires_escalation: bool = False  # Set for high-severity flags
+
+class EscalationEvent(BaseModel):
+    """Raised by the Abuse Detection Agent for the first high-severity flag"""
+    call_id: Optional[str] = None
+    flag: AbuseFlag
+    raised_at: datetime
+    elapsed_ms: float  # Since the abuse detection call started
+    streamed: bool = False  # Raised while the response was still streaming
+    lead_ms: Optional[float] = None  # How long before the full response arrived
+
+class CombinedAnalysis(BaseModel):
+    """Single-call output of the Fast Analysis Agent (summary + QA + abuse)"""
+    summary: CallSummary
+    qa_scores: QAScores
+    abuse_flags: List[AbuseFlag] = Field(default=[], description="One entry per abusive statement; empty if none")
 
 class InputValidationResult(BaseModel):
     """Result from input validation guardrail"""
@@ -108,6 +182,21 @@ class InputValidationResult(BaseModel):
     requires_user_confirmation: bool = False
     rejection_reason: Optional[str] = None
 
+class NodeMetrics(BaseModel):
+    """Timing and LLM usage for one node execution"""
+    node: str
+    started_at: datetime
+    ended_at: datetime
+    duration_ms: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0  # Prompt tokens read from the provider's prefix cache
+    llm_calls: int = 0
+    cache_hits: int = 0  # Calls served from the LLM response cache
+    retries: int = 0
+    estimated_cost_usd: float = 0.0
+    models: List[str] = []
+
 # ===================
 # Agent State
 # ===================
@@ -120,6 +209,9 @@ class AgentState(BaseModel):
     input_type: str = "transcript"  # "audio" | "transcript"
     raw_input: Optional[str] = None
     audio_data: Optional[bytes] = None  # Raw audio bytes for Whisper API
+    audio_path: Optional[str] = None  # Spooled recording of a checkpointed run, read instead of audio_data
+    call_id: Optional[str] = None  # Pre-assigned call ID (checkpoint key); Intake generates one if unset
+    pipeline_profile: str = "full"  # "full" (multi-agent) | "fast" (single combined LLM call)
 
     # Validation
     validation_result: Optional[InputValidationResult] = None
@@ -127,19 +219,30 @@ class AgentState(BaseModel):
 
     # Processing outputs
     metadata: Optional[CallMetadata] = None
+    speech_trim: Optional[SpeechTrimStats] = None
+    audio_encoding: Optional[AudioEncodingStats] = None
     transcript: Optional[TranscriptData] = None
+    compaction: Optional[CompactionStats] = None
     summary: Optional[CallSummary] = None
     summary_critique: Optional[SummaryCritique] = None
+    summary_history: List[CallSummary] = []  # Every summary version, in order
+    critique_history: List[SummaryCritique] = []  # Critique of each summary version
     qa_scores: Optional[QAScores] = None
     abuse_flags: List[AbuseFlag] = []
+    escalation: Optional[EscalationEvent] = None
 
     # Control flow
     current_agent: str = "supervisor"
     needs_revision: bool = False
     revision_count: int = 0
-    execution_path: List[str] = []
-    models_used: List[str] = []
-    errors: List[str] = []
+    # Append-only logs: parallel branches each contribute entries, which the
+    # graph merges with operator.add instead of overwriting
+    execution_path: Annotated[List[str], operator.add] = []
+    models_used: Annotated[List[str], operator.add] = []
+    errors: Annotated[List[str], operator.add] = []
+
+    # Observability: one record per node execution
+    node_metrics: Annotated[List[NodeMetrics], operator.add] = []
 
     class Config:
         arbitrary_types_allowed = True
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Measure what pre-encoding saves on real recordings
+
+For each file, reports the original and encoded sizes and the encode time.
+With --transcribe, also times a Whisper request for each version of the
+file (OPENAI_API_KEY required), which shows the upload-time reduction.
+
+Usage:
+    python scripts/benchmark_audio_encoding.py call1.wav call2.m4a [--transcribe]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from agents.transcription_agent import TranscriptionAgent
+from audio.encoding import preencode
+
+
+def _timed_request(agent: TranscriptionAgent, audio_data: bytes, file_name: str) -> float:
+    start = time.perf_counter()
+    agent._transcribe_audio(audio_data, file_name)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio pre-encoding")
+    parser.add_argument("files", nargs="+", type=Path, help="Audio files")
+    parser.add_argument("--transcribe", action="store_true", help="Also time Whisper on both versions")
+    args = parser.parse_args()
+
+    agent = TranscriptionAgent()
+    total_original = total_encoded = 0
+
+    print("=" * 80)
+    print("AUDIO PRE-ENCODING BENCHMARK")
+    print("=" * 80)
+
+    for path in args.files:
+        audio_data = path.read_bytes()
+        encoded = preencode(audio_data, path.name)
+        stats = encoded.stats
+        total_original += stats.original_bytes
+        total_encoded += stats.encoded_bytes if stats.applied else stats.original_bytes
+
+        print(f"\n{path.name}")
+        print(f"  Size:   {stats.original_bytes / 1e6:8.2f} MB → {stats.encoded_bytes / 1e6:8.2f} MB "
+              f"({stats.saved_ratio:.0%} saved{'' if stats.applied else ', original kept'})")
+        print(f"  Encode: {stats.encode_ms:8.0f} ms ({stats.codec})")
+
+        if args.transcribe:
+            original_ms = _timed_request(agent, audio_data, path.name)
+            encoded_ms = _timed_request(agent, encoded.data, encoded.file_name)
+            print(f"  Whisper request: {original_ms:8.0f} ms original, {encoded_ms:8.0f} ms encoded "
+                  f"({original_ms - encoded_ms - stats.encode_ms:+.0f} ms net of encoding)")
+
+    if total_original:
+        print(f"\nAll files: {total_original / 1e6:.2f} MB → {total_encoded / 1e6:.2f} MB "
+              f"({1 - total_encoded / total_original:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Benchmark connection setup cost: fresh HTTP client per call vs shared pool
+
+A fresh client per call (what the LangSmith evaluator helpers used to do for
+every example) pays DNS, TCP and TLS setup each time; the shared pool from
+llm/clients.py pays it once and then reuses the keep-alive connection.
+
+Requests go to an unauthenticated endpoint, so no API key is needed and the
+401 response is expected - only the round trip is measured.
+
+--local serves requests from a plain-HTTP server on localhost instead, which
+works offline but only shows TCP setup (no DNS, TLS or network latency).
+
+Usage:
+    python scripts/benchmark_http_pool.py [--iterations 30] [--url URL | --local]
+"""
+
+import sys
+import time
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from llm.clients import get_http_client, http2_available
+
+DEFAULT_URL = "https://api.openai.com/v1/models"
+
+
+def _time_requests(get_client, url: str, iterations: int, close: bool) -> list:
+    """Time `iterations` GETs in milliseconds, including client creation"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        client = get_client()
+        client.get(url)
+        if close:
+            client.close()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # avoid delayed-ACK stalls on reused connections
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_local_server() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def _report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<28} p50={statistics.median(timings):8.2f}ms  "
+          f"p95={p95:8.2f}ms  mean={statistics.mean(timings):8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-call HTTP clients")
+    parser.add_argument("--iterations", "-n", type=int, default=30, help="Requests per scenario")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Endpoint to request")
+    parser.add_argument("--local", action="store_true", help="Benchmark against a localhost server")
+    args = parser.parse_args()
+    if args.local:
+        args.url = _start_local_server()
+
+    print("=" * 80)
+    print(f"HTTP CONNECTION BENCHMARK ({args.iterations} requests to {args.url})")
+    print(f"HTTP/2: {'enabled' if http2_available() else 'unavailable (pip install h2)'}")
+    print("=" * 80)
+
+    fresh = _time_requests(httpx.Client, args.url, args.iterations, close=True)
+    _report("New client per call (before)", fresh)
+
+    get_http_client().get(args.url)  # open the pooled connection once
+    pooled = _time_requests(get_http_client, args.url, args.iterations, close=False)
+    _report("Shared pool (after)", pooled)
+
+    saved = statistics.median(fresh) - statistics.median(pooled)
+    print(f"\nMedian connection setup saved per call: {saved:.2f}ms "
+          f"({statistics.median(fresh) / max(statistics.median(pooled), 1e-9):.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
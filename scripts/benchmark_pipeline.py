@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Benchmark the full analysis pipeline offline from an LLM cassette
+
+Record once against the real APIs (keys required), then replay any number
+of times without network access. Replay measures graph and agent overhead
+alone; --with-latency also sleeps for each call's recorded latency, which
+reproduces the end-to-end timing of the recorded run.
+
+Usage:
+    python scripts/benchmark_pipeline.py --record            # real API calls
+    python scripts/benchmark_pipeline.py [--with-latency] [--iterations 10]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+# Record real provider latencies rather than cache hits
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from graph.workflow import run_analysis, PIPELINE_PROFILES
+from llm.cassette import use_cassette
+
+SAMPLES = Path("data/sample_transcripts")
+DEFAULT_CASSETTE = ".cassettes/benchmark.jsonl"
+
+
+def _report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<36} p50={statistics.median(timings):9.2f}ms  "
+          f"p95={p95:9.2f}ms  mean={statistics.mean(timings):9.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay the analysis pipeline")
+    parser.add_argument("--record", action="store_true", help="Call the real APIs and record a cassette")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE, help="Cassette file")
+    parser.add_argument("--with-latency", action="store_true", help="Replay recorded latencies")
+    parser.add_argument("--iterations", "-n", type=int, default=10, help="Replays per transcript")
+    parser.add_argument("--profile", choices=PIPELINE_PROFILES, default="full", help="Pipeline profile")
+    args = parser.parse_args()
+
+    transcripts = {path.stem: path.read_text() for path in sorted(SAMPLES.glob("*.txt"))}
+    mode = "record" if args.record else "replay"
+    iterations = 1 if args.record else args.iterations
+
+    print("=" * 80)
+    print(f"PIPELINE BENCHMARK ({mode}, {args.profile} profile, {args.cassette})")
+    print("=" * 80)
+
+    with use_cassette(args.cassette, mode=mode, replay_latency=args.with_latency) as cassette:
+        all_timings = []
+        for name, transcript in transcripts.items():
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                result = run_analysis(transcript, "transcript", profile=args.profile)
+                timings.append((time.perf_counter() - start) * 1000)
+                if result.get("errors"):
+                    print(f"{name}: errors {result['errors']}")
+            _report(name, timings)
+            all_timings += timings
+        _report("All transcripts", all_timings)
+
+    stats = cassette.stats()
+    print(f"\nCassette: {stats['entries']} entries, {stats['hits']} replayed, "
+          f"{stats['misses']} missing, {stats['recorded']} recorded")
+
+
+if __name__ == "__main__":
+    main()
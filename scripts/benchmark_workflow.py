@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Benchmark per-call framework overhead of the LangGraph workflow
+
+Compares building the workflow on every call (the old run_analysis behaviour)
+against reusing the shared compiled workflow from get_workflow().
+
+The input is deliberately too short to pass validation, so the graph stops
+after the first node and no LLM or network calls are made - what remains is
+agent/client construction, graph compilation and graph invocation overhead.
+
+Usage:
+    python scripts/benchmark_workflow.py [--iterations 50]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Clients are constructed but never used, so placeholder keys are enough
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-benchmark")
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+from models.schemas import AgentState
+from graph.workflow import create_workflow, get_workflow, clear_workflow_cache
+
+SHORT_INPUT = "Hello. Bye."
+
+
+def _time_calls(get_app, iterations: int) -> list:
+    """Time `iterations` calls of get_app() + invoke, in milliseconds"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        app = get_app()
+        app.invoke(AgentState(raw_input=SHORT_INPUT, input_type="transcript"))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<28} p50={statistics.median(timings):8.2f}ms  "
+          f"p95={p95:8.2f}ms  mean={statistics.mean(timings):8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workflow framework overhead")
+    parser.add_argument("--iterations", "-n", type=int, default=50, help="Calls per scenario")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"WORKFLOW OVERHEAD BENCHMARK ({args.iterations} calls per scenario)")
+    print("=" * 80)
+
+    rebuild = _time_calls(create_workflow, args.iterations)
+    _report("Rebuild per call (before)", rebuild)
+
+    clear_workflow_cache()
+    get_workflow()  # warm the registry once, as a long-lived process would
+    shared = _time_calls(get_workflow, args.iterations)
+    _report("Shared compiled (after)", shared)
+
+    saved = statistics.median(rebuild) - statistics.median(shared)
+    print(f"\nMedian overhead saved per call: {saved:.2f}ms "
+          f"({statistics.median(rebuild) / max(statistics.median(shared), 1e-9):.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Replay a recording as a live call and print the analysis as it happens
+
+Frames are fed at real-time speed (or --speed times faster). Partial
+transcripts, rolling summaries and escalations are printed as they arrive,
+followed by the time from hang-up to the final analysis.
+
+Usage:
+    python scripts/replay_live_call.py call.wav [--speed 4] [--backend local]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from audio.live import FileFrameSource
+from graph.live_analysis import astream_live_analysis, FINAL_EVENT, PARTIAL_TRANSCRIPT_EVENT, ROLLING_ANALYSIS_EVENT
+from graph.workflow import ESCALATION_EVENT
+
+
+async def replay(path: Path, speed: float, backend: str = None):
+    source = FileFrameSource(path.read_bytes(), path.name, speed=speed)
+    models = {"transcription": backend} if backend else None
+    started = time.monotonic()
+    call_seconds = source.duration_ms / 1000 / speed if speed > 0 else 0.0
+
+    async for event, update, state in astream_live_analysis(source, source.sample_rate, models=models):
+        at = time.monotonic() - started
+        if event == PARTIAL_TRANSCRIPT_EVENT:
+            for segment in update["transcript"].segments:
+                print(f"[{at:6.1f}s] {segment.start_time:6.1f}s  {segment.text}")
+        elif event == ROLLING_ANALYSIS_EVENT:
+            print(f"[{at:6.1f}s] SUMMARY: {update['summary'].brief_summary}")
+            print(f"[{at:6.1f}s] ABUSE FLAGS: {len(update['abuse_flags'])}")
+        elif event == ESCALATION_EVENT:
+            flag = update["escalation"].flag
+            print(f"[{at:6.1f}s] ESCALATION: {flag.severity.value} {flag.evidence}")
+        elif event == FINAL_EVENT:
+            print(f"\nFinal analysis ready {at - call_seconds:.1f}s after hang-up")
+            if state.get("summary"):
+                print(f"Summary: {state['summary'].brief_summary}")
+            for error in state.get("errors", []):
+                print(f"Error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recording as a live call")
+    parser.add_argument("file", type=Path, help="Audio file (WAV needs no ffmpeg)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (0 = as fast as possible)")
+    parser.add_argument("--backend", help="Transcription backend (openai | local | stub)")
+    args = parser.parse_args()
+
+    asyncio.run(replay(args.file, args.speed, args.backend))
+
+
+if __name__ == "__main__":
+    main()
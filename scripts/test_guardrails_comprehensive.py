@@ -1,5 +1,9 @@
 #!/usr/bin/env python
-"""Comprehensive test suite for Guardrails using test transcripts"""
+"""Comprehensive test suite for Guardrails using test transcripts
+
+Calls the real APIs. Run once with LLM_CASSETTE_MODE=record, then with
+LLM_CASSETTE_MODE=replay to repeat it offline (see llm/cassette.py).
+"""
 
 import os
 from pathlib import Path
@@ -6,6 +6,14 @@ from dotenv import load_dotenv
 # Load environment variables for tests
 load_dotenv()
 
+from config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    """Keep tests off the persistent LLM response cache, whatever .env says"""
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+
 
 @pytest.fixture(scope="session")
 def sample_transcript():
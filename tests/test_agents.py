@@ -91,6 +91,445 @@ class TestTranscriptionAgent:
             assert result.transcript.language == "en"
             assert "transcription" in result.execution_path
 
+    @pytest.mark.asyncio
+    async def test_transcription_agent_audio_async(self):
+        """Test that arun awaits the async Whisper client"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        agent = TranscriptionAgent()
+        state = AgentState(
+            raw_input="",
+            input_type="audio",
+            audio_data=b"fake audio bytes"
+        )
+
+        mock_response = MagicMock()
+        mock_response.text = "Async transcription."
+        mock_response.language = "en"
+        mock_response.segments = [{"text": " Async transcription. ", "start": 0.0, "end": 1.5}]
+
+        with patch.object(agent, '_atranscribe_audio', AsyncMock(return_value=mock_response)):
+            result = await agent.arun(state)
+
+        assert result.transcript.full_text == "Async transcription."
+        assert result.transcript.segments[0].text == "Async transcription."
+        assert result.transcript.segments[0].end_time == 1.5
+        assert "whisper-1" in result.models_used
+
+
+class TestSummarizationAgentAsync:
+    @pytest.mark.asyncio
+    async def test_arun_uses_revision_chain(self, monkeypatch):
+        """Test that the async path applies critic feedback like run() does"""
+        from unittest.mock import AsyncMock, MagicMock
+        from agents.summarization_agent import SummarizationAgent
+        from models.schemas import CallSummary, SummaryCritique
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        agent = SummarizationAgent()
+
+        revised = CallSummary(
+            brief_summary="Revised summary",
+            key_points=["Duplicate charge"],
+            customer_intent="Get refund",
+            resolution_status=ResolutionStatus.RESOLVED,
+            topics=["billing"],
+            sentiment=Sentiment.NEUTRAL
+        )
+        agent.chain = MagicMock()
+        agent.chain.ainvoke = AsyncMock()
+        agent.revision_chain = MagicMock()
+        agent.revision_chain.ainvoke = AsyncMock(return_value=(revised, "gpt-4o-mini"))
+
+        state = AgentState(raw_input="x", input_type="transcript", revision_count=1)
+        state.transcript = TranscriptData(full_text="Customer: I was charged twice.")
+        state.summary_critique = SummaryCritique(
+            faithfulness_score=5,
+            completeness_score=8,
+            conciseness_score=8,
+            needs_revision=True,
+            revision_instructions="Mention the refund",
+            feedback="Missing refund"
+        )
+
+        result = await agent.arun(state)
+
+        agent.chain.ainvoke.assert_not_called()
+        inputs = agent.revision_chain.ainvoke.call_args.args[0]
+        assert inputs["revision_instructions"] == "Mention the refund"
+        assert result.summary.brief_summary == "Revised summary"
+        assert result.execution_path == ["summarization_v2"]
+
+    def test_revision_prompt_quotes_the_given_limit(self, monkeypatch):
+        """Test that the attempt counter uses the critic's limit, not the global default"""
+        from agents.summarization_agent import SummarizationAgent
+        from config.settings import settings
+        from models.schemas import SummaryCritique
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setattr(settings, "MAX_REVISION_COUNT", 3)
+        agent = SummarizationAgent(max_revisions=5)
+        state = AgentState(raw_input="x", input_type="transcript", revision_count=1,
+                           transcript=TranscriptData(full_text="Customer: I was charged twice."))
+        state.summary_critique = SummaryCritique(
+            faithfulness_score=5, completeness_score=8, conciseness_score=8,
+            needs_revision=True, feedback="Missing refund"
+        )
+
+        chain, inputs = agent._prepare(state)
+
+        assert chain is agent.revision_chain
+        assert "(Attempt 1/5)" in agent.revision_prompt.invoke(inputs).to_messages()[-1].content
+
+
+class TestFastAnalysisAgent:
+    def test_run_fills_summary_scores_and_flags(self, monkeypatch):
+        """Test that one combined call populates all three result fields"""
+        from unittest.mock import MagicMock
+        from agents.fast_analysis_agent import FastAnalysisAgent
+        from models.schemas import CombinedAnalysis, CallSummary, QAScores, AbuseFlag
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        agent = FastAnalysisAgent()
+        agent.chain = MagicMock()
+        agent.chain.invoke.return_value = (CombinedAnalysis(
+            summary=CallSummary(
+                brief_summary="Customer disputed a charge",
+                key_points=["Duplicate charge"],
+                customer_intent="Get refund",
+                resolution_status=ResolutionStatus.RESOLVED,
+                topics=["billing"],
+                sentiment=Sentiment.NEGATIVE
+            ),
+            qa_scores=QAScores(empathy=7, professionalism=8, resolution=9, tone=7),
+            abuse_flags=[
+                AbuseFlag(detected=True, evidence=["This is bullshit"]),
+                AbuseFlag(detected=False)
+            ]
+        ), "gpt-4o-mini")
+
+        state = AgentState(raw_input="x", input_type="transcript")
+        state.transcript = TranscriptData(full_text="Customer: This is bullshit. Agent: Sorry.")
+
+        result = agent.run(state)
+
+        agent.chain.invoke.assert_called_once()
+        assert result.summary.brief_summary == "Customer disputed a charge"
+        assert result.qa_scores.overall == 7.8
+        assert len(result.abuse_flags) == 1  # non-detections are dropped
+        assert result.execution_path == ["fast_analysis"]
+        assert result.models_used == ["gpt-4o-mini"]
+
+    def test_run_requires_transcript(self, monkeypatch):
+        from agents.fast_analysis_agent import FastAnalysisAgent
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        with pytest.raises(ValueError):
+            FastAnalysisAgent().run(AgentState(raw_input="x", input_type="transcript"))
+
+
+class TestCriticAgentConvergence:
+    def _run(self, monkeypatch, scores, **kwargs):
+        """Run the critic loop against a fake chain returning the given faithfulness scores"""
+        from unittest.mock import MagicMock
+        from agents.critic_agent import CriticAgent
+        from models.schemas import CallSummary, SummaryCritique
+
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
+        agent = CriticAgent(**kwargs)
+        agent.chain = MagicMock()
+        agent.chain.invoke.side_effect = [
+            (SummaryCritique(
+                faithfulness_score=score,
+                completeness_score=8,
+                conciseness_score=8,
+                needs_revision=score < 7,
+                feedback=f"faithfulness {score}"
+            ), "claude-sonnet-4-20250514")
+            for score in scores
+        ]
+
+        state = AgentState(raw_input="x", input_type="transcript")
+        state.transcript = TranscriptData(full_text="Customer: I was charged twice.")
+        version = 0
+        while True:
+            version += 1
+            state.summary = CallSummary(
+                brief_summary=f"v{version}",
+                key_points=["Duplicate charge"],
+                customer_intent="Get refund",
+                resolution_status=ResolutionStatus.RESOLVED,
+                topics=["billing"],
+                sentiment=Sentiment.NEUTRAL
+            )
+            state = agent.run(state)
+            if not state.needs_revision:
+                return state
+
+    def test_improving_scores_keep_revising(self, monkeypatch):
+        state = self._run(monkeypatch, [3, 5, 8])
+
+        assert [c.faithfulness_score for c in state.critique_history] == [3, 5, 8]
+        assert state.summary.brief_summary == "v3"
+        assert state.revision_count == 2
+
+    def test_stops_when_scores_decline_and_keeps_best(self, monkeypatch):
+        """A revision that scores worse ends the loop and the earlier summary wins"""
+        state = self._run(monkeypatch, [5, 4], max_revisions=5)
+
+        assert len(state.critique_history) == 2
+        assert state.summary.brief_summary == "v1"
+        assert state.summary_critique.faithfulness_score == 5
+        assert state.current_agent == "qa_scoring"
+
+    def test_stops_on_plateau(self, monkeypatch):
+        state = self._run(monkeypatch, [5, 5], max_revisions=5)
+
+        assert len(state.critique_history) == 2
+        assert state.summary.brief_summary == "v1"
+
+    def test_respects_max_revisions(self, monkeypatch):
+        state = self._run(monkeypatch, [1, 2, 3, 4, 5], max_revisions=2, min_improvement=0)
+
+        assert len(state.critique_history) == 2
+        assert state.summary.brief_summary == "v2"
+
+
+class TestTranscriptCompaction:
+    TRANSCRIPT = (
+        "Agent:    Thank you for calling,   how can I help?\n\n"
+        "Customer: I was charged twice\nfor my March bill.\n\n"
+        "Customer: Account: 12345678.\n\n"
+        "Agent: Okay.\n\n"
+        "Agent: I see both charges and will refund one today."
+    )
+
+    def test_compacts_whitespace_and_speaker_labels(self):
+        from agents.compaction_agent import compact_transcript
+
+        text, dropped = compact_transcript(self.TRANSCRIPT)
+
+        assert text.splitlines() == [
+            "[Speakers: A=Agent, C=Customer]",
+            "A: Thank you for calling, how can I help?",
+            "C: I was charged twice for my March bill. Account: 12345678.",
+            "A: Okay. I see both charges and will refund one today.",
+        ]
+        assert dropped == 0
+
+    def test_drops_filler_turns_only_when_enabled(self):
+        from agents.compaction_agent import compact_transcript
+        from config.settings import settings
+
+        text, dropped = compact_transcript(self.TRANSCRIPT, True, settings.COMPACTION_FILLER_PATTERNS)
+
+        assert dropped == 1
+        assert "Okay." not in text
+        assert "12345678" in text
+
+    def test_agent_records_savings_and_keeps_full_text(self):
+        from agents.compaction_agent import TranscriptCompactionAgent
+
+        transcript = TranscriptData(full_text=self.TRANSCRIPT)
+        state = TranscriptCompactionAgent(enabled=True).run(AgentState(transcript=transcript))
+
+        assert state.transcript.full_text == self.TRANSCRIPT
+        assert state.transcript.prompt_text.startswith("[Speakers:")
+        assert 0 < state.compaction.compacted_tokens < state.compaction.original_tokens
+        assert state.execution_path == ["compaction"]
+
+    def test_disabled_passes_transcript_through(self):
+        from agents.compaction_agent import TranscriptCompactionAgent
+
+        transcript = TranscriptData(full_text=self.TRANSCRIPT)
+        state = TranscriptCompactionAgent(enabled=False).run(AgentState(transcript=transcript))
+
+        assert state.transcript.prompt_text == self.TRANSCRIPT
+        assert state.compaction is None
+
+
+ABUSIVE_RESPONSE = """TYPE: threat
+SEVERITY: 8
+TEXT: "I know where your office is"
+CONTEXT: Implied physical threat against the agent
+
+TYPE: profanity
+SEVERITY: 2
+TEXT: "damn"
+CONTEXT: Mild profanity
+"""
+
+
+class TestAbuseFlagStreaming:
+    def test_parser_emits_each_flag_once_its_entry_completes(self):
+        from agents.abuse_detection_agent import AbuseFlagStreamParser
+        from models.schemas import AbuseSeverity
+
+        parser = AbuseFlagStreamParser()
+        emitted = []
+        for i in range(0, len(ABUSIVE_RESPONSE), 3):
+            emitted.append((i, parser.feed(ABUSIVE_RESPONSE[i:i + 3])))
+        emitted.append((len(ABUSIVE_RESPONSE), parser.close()))
+
+        flags = [(i, flag) for i, batch in emitted for flag in batch]
+        assert [flag.severity for _, flag in flags] == [AbuseSeverity.HIGH, AbuseSeverity.LOW]
+        # The threat is out as soon as its CONTEXT line ends, long before the response does
+        assert flags[0][0] < ABUSIVE_RESPONSE.index("TYPE: profanity")
+        assert flags[0][1].evidence == ["I know where your office is"]
+        assert flags[0][1].requires_escalation is True
+
+    def test_close_flushes_trailing_entry_without_newline(self):
+        from agents.abuse_detection_agent import AbuseFlagStreamParser
+
+        parser = AbuseFlagStreamParser()
+        assert parser.feed('TYPE: harassment\nSEVERITY: 5\nTEXT: "idiot"\nCONTEXT: Insult') == []
+        assert [flag.evidence for flag in parser.close()] == [["idiot"]]
+
+    def test_mixed_case_markers_match_like_the_final_parse(self, monkeypatch):
+        """Test that "Type:"/"severity: high" escalate mid-stream and parse the same at the end"""
+        from agents.abuse_detection_agent import AbuseDetectionAgent, AbuseFlagStreamParser
+        from models.schemas import AbuseSeverity
+
+        response = ABUSIVE_RESPONSE.replace("TYPE:", "Type:").replace("SEVERITY: 8", "severity: high") \
+            .replace("TEXT:", "Text:").replace("CONTEXT:", "Context:")
+        parser = AbuseFlagStreamParser()
+        streamed = []
+        for i in range(0, len(response), 3):
+            streamed += parser.feed(response[i:i + 3])
+            if streamed:
+                break
+
+        assert i < response.index("Type: profanity")
+        assert streamed[0].severity == AbuseSeverity.HIGH
+        assert streamed[0].evidence == ["I know where your office is"]
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        final = AbuseDetectionAgent()._parse_abuse_response(response)
+        assert [flag.severity for flag in final] == [AbuseSeverity.HIGH, AbuseSeverity.LOW]
+        assert final[0] == streamed[0]
+
+    def test_agent_escalates_before_response_completes(self, monkeypatch):
+        """Test that the first high-severity flag is raised mid-stream, and only once"""
+        from langchain_core.messages import AIMessage
+        from agents.abuse_detection_agent import AbuseDetectionAgent
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        streamed = []
+        escalations = []
+
+        class StreamingChain:
+            def invoke(self, inputs, on_token=None, on_restart=None):
+                for i in range(0, len(ABUSIVE_RESPONSE), 4):
+                    streamed.append(ABUSIVE_RESPONSE[i:i + 4])
+                    on_token(ABUSIVE_RESPONSE[i:i + 4])
+                return AIMessage(content=ABUSIVE_RESPONSE), "gpt-4o-mini"
+
+        agent = AbuseDetectionAgent(on_escalation=lambda event: escalations.append(len("".join(streamed))))
+        agent.chain = StreamingChain()
+        state = AgentState(transcript=TranscriptData(full_text="Customer: I know where your office is."))
+
+        result = agent.run(state)
+
+        assert len(escalations) == 1
+        assert escalations[0] < len(ABUSIVE_RESPONSE)
+        assert result.escalation.streamed is True
+        assert result.escalation.lead_ms >= 0
+        assert len(result.abuse_flags) == 2
+
+    def test_unstreamed_response_still_escalates(self, monkeypatch):
+        """Test that cached or replayed responses, which stream no tokens, escalate too"""
+        from langchain_core.messages import AIMessage
+        from agents.abuse_detection_agent import AbuseDetectionAgent
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        agent = AbuseDetectionAgent()
+        agent.chain = Mock()
+        agent.chain.invoke.return_value = (AIMessage(content=ABUSIVE_RESPONSE), "gpt-4o-mini")
+        state = AgentState(transcript=TranscriptData(full_text="Customer: I know where your office is."))
+
+        result = agent.run(state)
+
+        assert result.escalation.streamed is False
+        assert result.escalation.flag.evidence == ["I know where your office is"]
+
+    def test_mid_stream_failover_does_not_escalate_on_a_garbled_entry(self, monkeypatch):
+        """Test that a failed model's partial entry isn't glued to the fallback's response"""
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from agents.abuse_detection_agent import AbuseDetectionAgent
+        from config.settings import settings
+        from llm.router import ModelRouter
+
+        class DroppedStreamChatModel(FakeListChatModel):
+            def _stream(self, *args, **kwargs):
+                yield from super()._stream(*args, **kwargs)
+                raise ConnectionError("stream dropped")
+
+        monkeypatch.setitem(settings.MODEL_ROUTES, "abuse_detector", ["gpt-4o-mini", "gpt-4o"])
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        escalations = []
+        agent = AbuseDetectionAgent(on_escalation=escalations.append)
+        agent.chain.route.router = ModelRouter()
+        llms = {
+            "gpt-4o-mini": DroppedStreamChatModel(responses=['TYPE: threat\nSEVERITY: 8\nTEXT: "I know wh']),
+            "gpt-4o": FakeListChatModel(responses=['TYPE: profanity\nSEVERITY: 2\nTEXT: "damn"\nCONTEXT: Mild\n']),
+        }
+        monkeypatch.setattr(agent.chain.route, "llm", llms.get)
+        state = AgentState(transcript=TranscriptData(full_text="Customer: damn it."))
+
+        result = agent.run(state)
+
+        assert escalations == []
+        assert result.escalation is None
+        assert [flag.evidence for flag in result.abuse_flags] == [["damn"]]
+
+    def test_only_high_severity_flags_require_escalation(self, monkeypatch):
+        """Test the final flags: the threat requires escalation, mild profanity doesn't"""
+        from langchain_core.messages import AIMessage
+        from agents.abuse_detection_agent import AbuseDetectionAgent
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        agent = AbuseDetectionAgent()
+        agent.chain = Mock()
+        agent.chain.invoke.return_value = (AIMessage(content=ABUSIVE_RESPONSE), "gpt-4o-mini")
+        state = AgentState(transcript=TranscriptData(full_text="Customer: I know where your office is."))
+
+        result = agent.run(state)
+
+        assert [flag.requires_escalation for flag in result.abuse_flags] == [True, False]
+
+
+class TestSharedPromptPrefix:
+    INPUTS = {
+        "transcript": "Customer: I was charged twice.\nAgent: I will refund one charge.",
+        "brief_summary": "Refunded a duplicate charge", "key_points": "Duplicate charge",
+        "action_items": "None", "customer_intent": "Refund", "sentiment": "neutral",
+        "resolution_status": "resolved", "topics": "billing", "revision_count": 1,
+        "max_revisions": 3, "critique_feedback": "Too short", "revision_instructions": "Add detail",
+    }
+
+    def test_analysis_prompts_share_transcript_prefix(self, monkeypatch):
+        """Test that every agent sends the same leading messages, transcript included"""
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
+        from agents.summarization_agent import SummarizationAgent
+        from agents.critic_agent import CriticAgent
+        from agents.qa_scoring_agent import QAScoringAgent
+        from agents.abuse_detection_agent import AbuseDetectionAgent
+        from agents.fast_analysis_agent import FastAnalysisAgent
+
+        summarizer = SummarizationAgent()
+        prompts = [summarizer.prompt, summarizer.revision_prompt, CriticAgent().prompt,
+                   QAScoringAgent().prompt, AbuseDetectionAgent().prompt, FastAnalysisAgent().prompt]
+        rendered = [prompt.invoke(self.INPUTS).to_messages() for prompt in prompts]
+
+        prefix = rendered[0][:2]
+        assert self.INPUTS["transcript"] in prefix[1].content[0]["text"]
+        assert prefix[1].content[0]["cache_control"] == {"type": "ephemeral"}
+        for messages in rendered:
+            assert messages[:2] == prefix
+            # Agent-specific instructions come after the transcript only
+            assert all(self.INPUTS["transcript"] not in str(m.content) for m in messages[2:])
+
 
 class TestInputValidationAgent:
     @pytest.fixture
@@ -0,0 +1,123 @@
+"""Tests for silence-aware audio chunking and segment stitching"""
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from audio.chunking import AudioChunk, plan_chunks, stitch_segments
+from models.schemas import AgentState, TranscriptSegment
+
+
+def _segment(text, start, end):
+    return TranscriptSegment(speaker="Speaker", text=text, start_time=start, end_time=end)
+
+
+class TestPlanChunks:
+    def test_cuts_in_silence_without_overlap(self):
+        silences = [95_000, 190_000]
+
+        def find_cut(start, end):
+            inside = [s for s in silences if start <= s < end]
+            return inside[-1] if inside else None
+
+        bounds = plan_chunks(250_000, 100_000, 1_000, 30_000, find_cut)
+
+        assert bounds == [(0, 95_000), (95_000, 190_000), (190_000, 250_000)]
+
+    def test_forced_cuts_overlap_and_respect_max_length(self):
+        bounds = plan_chunks(250_000, 100_000, 1_000, 30_000, lambda start, end: None)
+
+        assert bounds == [(0, 100_000), (99_000, 199_000), (198_000, 250_000)]
+        assert all(end - start <= 100_000 for start, end in bounds)
+
+    def test_short_recording_is_one_chunk(self):
+        assert plan_chunks(60_000, 100_000, 1_000, 30_000, lambda start, end: None) == [(0, 60_000)]
+
+    def test_overlap_must_be_small(self):
+        with pytest.raises(ValueError):
+            plan_chunks(250_000, 10_000, 5_000, 3_000, lambda start, end: None)
+
+
+class TestStitchSegments:
+    def test_offsets_segments_and_drops_overlap_duplicates(self):
+        bounds = [(0, 100_000), (99_000, 160_000)]
+        first = [_segment("Hello, thanks for calling.", 0.0, 50.0), _segment("How can I help?", 97.0, 99.8)]
+        # The second chunk re-hears the last words of the first, in its first second
+        second = [_segment("How can I help", 0.0, 0.8), _segment("I was charged twice.", 1.0, 5.0)]
+
+        stitched = stitch_segments(bounds, [first, second])
+
+        assert [s.text for s in stitched] == ["Hello, thanks for calling.", "How can I help?", "I was charged twice."]
+        assert stitched[-1].start_time == pytest.approx(100.0)
+        assert stitched[-1].end_time == pytest.approx(104.0)
+
+    def test_silence_cut_keeps_every_segment(self):
+        bounds = [(0, 95_000), (95_000, 150_000)]
+        stitched = stitch_segments(bounds, [[_segment("One.", 1.0, 2.0)], [_segment("Two.", 0.5, 1.5)]])
+
+        assert [(s.text, s.start_time) for s in stitched] == [("One.", 1.0), ("Two.", 95.5)]
+
+
+class TestChunkedTranscription:
+    CHUNKS = [AudioChunk(b"a", "call.part1.mp3", 0, 600_000), AudioChunk(b"b", "call.part2.mp3", 600_000, 900_000)]
+    RESPONSES = {
+        b"a": SimpleNamespace(text="First half.", language="en",
+                              segments=[{"text": " First half. ", "start": 3.0, "end": 5.0}]),
+        b"b": SimpleNamespace(text="Second half.", language="en",
+                              segments=[{"text": " Second half. ", "start": 1.0, "end": 2.0}]),
+    }
+
+    def _state(self):
+        return AgentState(raw_input="", input_type="audio", audio_data=b"long call", input_file_path="call.mp3")
+
+    def test_chunks_transcribed_concurrently_and_stitched(self):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+        barrier = threading.Barrier(2)
+
+        def transcribe(data, file_name):
+            barrier.wait(timeout=5)  # only passes when both chunks are in flight
+            return self.RESPONSES[data]
+
+        with patch.object(agent, "_chunks", return_value=self.CHUNKS), \
+                patch.object(agent, "_transcribe_audio", side_effect=transcribe):
+            result = agent.run(self._state())
+
+        assert result.transcript.full_text == "First half. Second half."
+        assert [s.start_time for s in result.transcript.segments] == [3.0, 601.0]
+        assert result.models_used == ["whisper-1"]
+
+    @pytest.mark.asyncio
+    async def test_async_chunks_stitched_in_order(self):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+
+        async def transcribe(data, file_name):
+            return self.RESPONSES[data]
+
+        with patch.object(agent, "_chunks", return_value=self.CHUNKS), \
+                patch.object(agent, "_atranscribe_audio", side_effect=transcribe):
+            result = await agent.arun(self._state())
+
+        assert [s.text for s in result.transcript.segments] == ["First half.", "Second half."]
+
+    def test_small_audio_is_sent_whole(self):
+        from agents.transcription_agent import TranscriptionAgent
+
+        assert TranscriptionAgent()._chunks(b"fake audio bytes", "call.mp3") is None
+
+    def test_size_limit_applies_per_chunk_when_chunking(self, monkeypatch):
+        import agents.input_validation_agent as validation
+
+        state = AgentState(input_type="audio", audio_data=b"\0" * (26 * 1024 * 1024), input_file_path="call.mp3")
+
+        monkeypatch.setattr(validation, "chunking_available", lambda: True)
+        result = validation.InputValidationAgent().run(state.model_copy())
+        assert result.validation_result.is_valid
+        assert any("chunks" in w for w in result.validation_result.warnings)
+
+        monkeypatch.setattr(validation, "chunking_available", lambda: False)
+        assert not validation.InputValidationAgent().run(state.model_copy()).validation_result.is_valid
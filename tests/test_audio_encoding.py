@@ -0,0 +1,91 @@
+"""Tests for audio pre-encoding before upload"""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import audio.encoding as encoding
+from models.schemas import AgentState
+
+RESPONSE = SimpleNamespace(text="Hello.", language="en", segments=[])
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    """Pre-encoding on, with the pydub step replaced and an in-process pool"""
+    import agents.transcription_agent as transcription
+    monkeypatch.setattr(transcription, "preencode_available", lambda: True)
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(encoding, "get_encoder_pool", lambda: pool)
+    yield lambda fn: monkeypatch.setattr(encoding, "encode_for_speech", fn)
+    pool.shutdown()
+
+
+def _state(audio_data=b"\0" * 10_000):
+    return AgentState(raw_input="", input_type="audio", audio_data=audio_data, input_file_path="call.wav")
+
+
+class TestPreencoding:
+    def test_uploads_encoded_audio_and_records_savings(self, fake_encoder):
+        from agents.transcription_agent import TranscriptionAgent
+
+        fake_encoder(lambda data, name, rate, bitrate: b"opus" * 100)
+        agent = TranscriptionAgent()
+
+        with patch.object(agent, "_transcribe_audio", return_value=RESPONSE) as transcribe:
+            result = agent.run(_state())
+
+        transcribe.assert_called_once_with(b"opus" * 100, "call.ogg")
+        stats = result.audio_encoding
+        assert (stats.original_bytes, stats.encoded_bytes) == (10_000, 400)
+        assert stats.saved_ratio == pytest.approx(0.96)
+        assert stats.request_ms is not None
+        assert result.audio_data == b"\0" * 10_000  # the original is kept in state
+
+    @pytest.mark.asyncio
+    async def test_keeps_original_when_encoding_is_larger(self, fake_encoder):
+        from agents.transcription_agent import TranscriptionAgent
+
+        fake_encoder(lambda data, name, rate, bitrate: data * 2)
+        agent = TranscriptionAgent()
+
+        async def transcribe(data, file_name):
+            assert (len(data), file_name) == (10_000, "call.wav")
+            return RESPONSE
+
+        with patch.object(agent, "_atranscribe_audio", side_effect=transcribe):
+            result = await agent.arun(_state())
+
+        assert result.audio_encoding.applied is False
+        assert result.audio_encoding.bytes_saved == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("run", ["run", "arun"])
+    async def test_encoder_failure_uploads_the_original(self, fake_encoder, run):
+        from agents.transcription_agent import TranscriptionAgent
+
+        def broken(data, name, rate, bitrate):
+            raise RuntimeError("Unknown encoder 'libopus'")
+
+        fake_encoder(broken)
+        agent = TranscriptionAgent()
+
+        with patch.object(agent, "_transcribe_audio", return_value=RESPONSE) as transcribe, \
+                patch.object(agent, "_atranscribe_audio", return_value=RESPONSE) as atranscribe:
+            result = agent.run(_state()) if run == "run" else await agent.arun(_state())
+
+        (transcribe if run == "run" else atranscribe).assert_called_once_with(b"\0" * 10_000, "call.wav")
+        assert result.transcript.full_text == "Hello."
+        assert result.audio_encoding.applied is False
+        assert "libopus" in result.audio_encoding.error
+
+    def test_disabled_by_default(self):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+        with patch.object(agent, "_transcribe_audio", return_value=RESPONSE) as transcribe:
+            result = agent.run(_state(b"raw"))
+
+        transcribe.assert_called_once_with(b"raw", "call.wav")
+        assert result.audio_encoding is None
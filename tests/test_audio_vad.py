@@ -0,0 +1,115 @@
+"""Tests for voice-activity trimming and the offset map back to the original audio"""
+import math
+import random
+from array import array
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from audio.vad import ANALYSIS_RATE, OffsetMap, TrimmedAudio, detect_kept_spans, kept_spans
+from models.schemas import AgentState, SpeechTrimStats
+
+
+def _samples(seconds, amplitude):
+    """16-bit samples at the analysis rate; amplitude(t) gives each sample"""
+    return [int(amplitude(i / ANALYSIS_RATE)) for i in range(int(seconds * ANALYSIS_RATE))]
+
+
+def _speech(seconds, rng):
+    # Syllables four times a second, alternating voiced (tone) and unvoiced (noise) sounds
+    def sample(t):
+        phase = (t * 4) % 1
+        if phase > 0.6:
+            return rng.gauss(0, 30)
+        if int(t * 4) % 2:
+            return rng.gauss(0, 3000)
+        return 8000 * math.sin(2 * math.pi * 180 * t)
+    return _samples(seconds, sample)
+
+
+def _hold_music(seconds):
+    return _samples(seconds, lambda t: 4000 * (math.sin(2 * math.pi * 262 * t) + math.sin(2 * math.pi * 330 * t)))
+
+
+def _silence(seconds, rng):
+    return _samples(seconds, lambda t: rng.gauss(0, 30))
+
+
+class TestDetection:
+    def test_cuts_silence_and_hold_music_but_keeps_speech(self):
+        rng = random.Random(7)
+        samples = (_speech(4, rng) + _silence(10, rng) + _speech(4, rng)
+                   + _hold_music(12) + _speech(4, rng))
+        pcm = array("h", samples).tobytes()
+
+        kept = detect_kept_spans(pcm, 2, ANALYSIS_RATE, 34_000)
+
+        assert len(kept) == 3
+        for (start, end), (speech_start, speech_end) in zip(kept, [(0, 4_000), (14_000, 18_000), (30_000, 34_000)]):
+            assert start <= speech_start and end >= speech_end
+            assert speech_start - start < 1_500 and end - speech_end < 1_500
+        assert sum(end - start for start, end in kept) < 16_000
+
+    def test_keeps_everything_without_speech(self):
+        pcm = array("h", _hold_music(10)).tobytes()
+        assert detect_kept_spans(pcm, 2, ANALYSIS_RATE, 10_000) == [(0, 10_000)]
+
+
+class TestKeptSpans:
+    def test_short_gaps_are_kept_and_edges_padded(self):
+        speech = [(5_000, 6_000), (7_000, 8_000), (20_000, 21_000)]
+        assert kept_spans(speech, 30_000, 3_000, 300) == [(4_700, 8_300), (19_700, 21_300)]
+
+    def test_short_leading_and_trailing_gaps_are_kept(self):
+        assert kept_spans([(1_000, 28_000)], 30_000, 3_000, 300) == [(0, 30_000)]
+
+
+class TestOffsetMap:
+    def test_maps_trimmed_times_onto_original(self):
+        offsets = OffsetMap([(0, 4_000), (14_000, 18_000)], 20_000)
+
+        assert offsets.trimmed_ms == 8_000 and offsets.removed_ms == 12_000
+        assert offsets.to_original(1.5) == pytest.approx(1.5)
+        assert offsets.to_original(5.0) == pytest.approx(15.0)
+        # A time on the cut: the next span's start, or the previous span's end
+        assert offsets.to_original(4.0) == pytest.approx(14.0)
+        assert offsets.to_original(4.0, end=True) == pytest.approx(4.0)
+        assert offsets.to_original(9.0) == pytest.approx(18.0)  # clamped to the recording
+
+    def test_transcription_reports_original_times(self, monkeypatch):
+        import agents.transcription_agent as transcription
+
+        offsets = OffsetMap([(0, 4_000), (14_000, 18_000)], 20_000)
+        trimmed = TrimmedAudio(b"trimmed", "call.wav", offsets,
+                               SpeechTrimStats(original_seconds=20, trimmed_seconds=8, cuts=2, trim_ms=5))
+        monkeypatch.setattr(transcription, "vad_available", lambda: True)
+        monkeypatch.setattr(transcription, "trim_non_speech", lambda data, name: trimmed)
+        response = SimpleNamespace(text="Hi. Still there?", language="en", segments=[
+            {"text": "Hi.", "start": 0.5, "end": 2.0},
+            {"text": "Still there?", "start": 4.5, "end": 6.0},
+        ])
+
+        agent = transcription.TranscriptionAgent()
+        state = AgentState(raw_input="", input_type="audio", audio_data=b"original", input_file_path="call.wav")
+        with patch.object(agent, "_transcribe_audio", return_value=response) as transcribe:
+            result = agent.run(state)
+
+        transcribe.assert_called_once_with(b"trimmed", "call.wav")
+        assert [(s.start_time, s.end_time) for s in result.transcript.segments] == [(0.5, 2.0), (14.5, 16.0)]
+        assert result.speech_trim.removed_ratio == pytest.approx(0.6)
+
+
+class TestOptionalAudioop:
+    def test_pipeline_imports_without_audioop(self):
+        """audioop left the stdlib in Python 3.13: only frame analysis may need it"""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        code = ("import sys; sys.modules['audioop'] = None\n"
+                "import audio.vad, audio.live, agents.transcription_agent, graph.workflow")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent.parent)
+
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,114 @@
+"""Tests for LLM cassette record/replay"""
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from llm.cassette import CassetteMiss, use_cassette
+from llm.router import ModelRouter, Route
+from models.schemas import CallSummary, QAScores, ResolutionStatus, Sentiment, SummaryCritique
+
+PROMPT = ChatPromptTemplate.from_messages([("human", "{transcript}")])
+TRANSCRIPT = """Customer: Hi, I have a question about my bill. I was charged twice this month.
+Agent: I apologize for the inconvenience. Let me look into that for you.
+Customer: Thanks. The account number is 12345678.
+Agent: I can see the duplicate charge and I have processed a refund."""
+
+FAKE_OUTPUTS = {
+    CallSummary: CallSummary(
+        brief_summary="Customer was refunded a duplicate charge",
+        key_points=["Duplicate charge"],
+        customer_intent="Get refund",
+        resolution_status=ResolutionStatus.RESOLVED,
+        topics=["billing"],
+        sentiment=Sentiment.NEUTRAL
+    ),
+    SummaryCritique: SummaryCritique(
+        faithfulness_score=9, completeness_score=9, conciseness_score=9,
+        needs_revision=False, feedback="Good"
+    ),
+    QAScores: QAScores(empathy=8, professionalism=9, resolution=9, tone=8),
+    None: AIMessage(content="NO_ABUSE_DETECTED"),
+}
+
+
+def _fake_llm(self, model):
+    """Stands in for the provider: answers by output schema after a short delay"""
+    def answer(_, **call_kwargs):  # e.g. stream=True for streamed routes
+        time.sleep(0.02)
+        return FAKE_OUTPUTS[self.structured_output]
+    return RunnableLambda(answer)
+
+
+def _offline_llm(self, model):
+    raise AssertionError("replay must not build or call a model")
+
+
+@pytest.fixture
+def offline_keys(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
+
+
+class TestCassette:
+    def test_replays_recorded_structured_output(self, tmp_path, monkeypatch, offline_keys):
+        path = tmp_path / "llm.jsonl"
+        route = Route("qa_scorer", "gpt-4o-mini", structured_output=QAScores, router=ModelRouter())
+        monkeypatch.setattr(Route, "llm", _fake_llm)
+        with use_cassette(path, mode="record") as cassette:
+            recorded = route.bind(PROMPT).invoke({"transcript": "Customer: hi"})
+        assert cassette.stats()["recorded"] == 1
+
+        monkeypatch.setattr(Route, "llm", _offline_llm)
+        with use_cassette(path, mode="replay") as cassette:
+            replayed = route.bind(PROMPT).invoke({"transcript": "Customer: hi"})
+
+        assert replayed == recorded
+        assert replayed.model == "gpt-4o-mini"
+        assert cassette.stats()["hits"] == 1
+
+    def test_unrecorded_call_raises(self, tmp_path, monkeypatch, offline_keys):
+        route = Route("abuse_detector", "gpt-4o-mini", temperature=0)
+        monkeypatch.setattr(Route, "llm", _offline_llm)
+
+        with use_cassette(tmp_path / "empty.jsonl", mode="replay"):
+            with pytest.raises(CassetteMiss):
+                route.bind(PROMPT).invoke({"transcript": "Customer: hi"})
+
+    @pytest.mark.asyncio
+    async def test_replay_can_reproduce_latency(self, tmp_path, monkeypatch, offline_keys):
+        path = tmp_path / "llm.jsonl"
+        route = Route("abuse_detector", "gpt-4o-mini", temperature=0, router=ModelRouter())
+        monkeypatch.setattr(Route, "llm", _fake_llm)
+        with use_cassette(path, mode="record"):
+            await route.bind(PROMPT).ainvoke({"transcript": "Customer: hi"})
+
+        monkeypatch.setattr(Route, "llm", _offline_llm)
+        with use_cassette(path, mode="replay", replay_latency=True):
+            start = time.perf_counter()
+            output, _ = await route.bind(PROMPT).ainvoke({"transcript": "Customer: hi"})
+
+        assert output.content == "NO_ABUSE_DETECTED"
+        assert time.perf_counter() - start >= 0.015
+
+    def test_full_pipeline_runs_offline_from_cassette(self, tmp_path, monkeypatch, offline_keys):
+        """Test that a recorded run_analysis replays identically with no model calls"""
+        from graph.workflow import run_analysis, clear_workflow_cache
+
+        path = tmp_path / "pipeline.jsonl"
+        clear_workflow_cache()
+        monkeypatch.setattr(Route, "llm", _fake_llm)
+        with use_cassette(path, mode="record"):
+            recorded = run_analysis(TRANSCRIPT, "transcript")
+
+        monkeypatch.setattr(Route, "llm", _offline_llm)
+        with use_cassette(path, mode="replay") as cassette:
+            replayed = run_analysis(TRANSCRIPT, "transcript")
+
+        assert replayed["summary"] == recorded["summary"]
+        assert replayed["qa_scores"] == recorded["qa_scores"]
+        assert sorted(replayed["models_used"]) == sorted(recorded["models_used"])
+        assert len(replayed["execution_path"]) == len(set(replayed["execution_path"]))
+        assert cassette.stats()["misses"] == 0
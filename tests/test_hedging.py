@@ -0,0 +1,131 @@
+"""Tests for hedged LLM requests"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm.hedging import Hedger
+
+
+def _warm(hedger, latency=0.01, samples=20):
+    for _ in range(samples):
+        hedger.observe(latency)
+
+
+class TestHedger:
+    def test_no_hedge_before_enough_samples(self):
+        hedger = Hedger(min_samples=5)
+
+        assert hedger.threshold() is None
+        assert hedger.call(lambda: "ok") == "ok"
+        assert hedger.hedges_fired == 0
+
+    def test_slow_call_is_hedged_and_duplicate_wins(self):
+        """The caller returns with the duplicate instead of waiting out the stalled primary"""
+        hedger = Hedger(max_rate=1.0, min_samples=20)
+        _warm(hedger)
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)  # the first request stalls
+                return "slow"
+            return "fast"
+
+        started = time.monotonic()
+        try:
+            assert hedger.call(fn) == "fast"
+            assert time.monotonic() - started < 1
+        finally:
+            release.set()
+        assert (hedger.hedges_fired, hedger.hedges_won) == (1, 1)
+
+    def test_fast_call_is_not_hedged(self):
+        hedger = Hedger(max_rate=1.0, min_samples=20)
+        _warm(hedger)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            return "ok"
+
+        assert hedger.call(fn) == "ok"
+        assert calls == [1]
+        assert hedger.hedges_fired == 0
+
+    def test_failed_primary_falls_back_to_the_duplicate(self):
+        hedger = Hedger(max_rate=1.0, min_samples=20)
+        _warm(hedger)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                raise ConnectionError("reset")
+            return "duplicate"
+
+        assert hedger.call(fn) == "duplicate"
+        assert hedger.hedges_won == 1
+
+    def test_hedge_rate_is_capped(self):
+        hedger = Hedger(max_rate=0.1, min_samples=20)
+        _warm(hedger)
+
+        def fn():
+            time.sleep(0.03)
+            return "ok"
+
+        for _ in range(5):
+            hedger.call(fn)
+
+        assert hedger.hedges_fired == 0  # 5 calls allow no hedge at 10%
+
+    @pytest.mark.asyncio
+    async def test_async_loser_is_cancelled(self):
+        hedger = Hedger(max_rate=1.0, min_samples=20)
+        _warm(hedger)
+        started = []
+        cancelled = []
+
+        async def fn():
+            started.append(1)
+            if len(started) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(1)
+                    raise
+                return "slow"
+            return "fast"
+
+        assert await hedger.acall(fn) == "fast"
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        assert hedger.hedges_won == 1
+
+
+class TestHedgedRoutes:
+    def test_streamed_calls_are_not_hedged(self, monkeypatch):
+        """Test that two hedged streams never feed one token consumer"""
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langchain_core.prompts import ChatPromptTemplate
+        from config.settings import settings
+        from llm.router import ModelRouter, Route
+
+        monkeypatch.setattr(settings, "HEDGED_ROLES", ["abuse_detector"])
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        route = Route("abuse_detector", "gpt-4o-mini", temperature=0, router=ModelRouter())
+        route.hedger = Hedger(max_rate=1.0, min_samples=20)
+        _warm(route.hedger, latency=0.0)
+        monkeypatch.setattr(route, "llm", lambda model: FakeListChatModel(responses=["NO_ABUSE_DETECTED"]))
+        chain = route.bind(ChatPromptTemplate.from_messages([("human", "{transcript}")]))
+        tokens = []
+
+        output, _ = chain.invoke({"transcript": "Customer: hi"}, on_token=tokens.append)
+
+        assert "".join(tokens) == output.content == "NO_ABUSE_DETECTED"
+        assert route.hedger.calls == 0
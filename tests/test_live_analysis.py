@@ -0,0 +1,196 @@
+"""Tests for live call analysis: utterance endpointing, frame replay and rolling analysis"""
+import asyncio
+import io
+import math
+import time
+import wave
+from array import array
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import audio.backends as backends
+from audio.backends import TranscriptionBackend, register_backend
+from audio.live import FileFrameSource, UtteranceSegmenter
+from config.settings import settings
+from models.schemas import (
+    AbuseFlag, AbuseSeverity, CallSummary, ResolutionStatus, Sentiment, TranscriptData
+)
+
+RATE = 8000
+
+
+def _pcm(*parts):
+    """16-bit mono PCM from (seconds, loud) parts: a tone when loud, silence otherwise"""
+    samples = []
+    for seconds, loud in parts:
+        samples += [int(8000 * math.sin(2 * math.pi * 220 * i / RATE)) if loud else 0
+                    for i in range(int(seconds * RATE))]
+    return array("h", samples).tobytes()
+
+
+def _frames(pcm, frame_ms=20):
+    size = RATE * frame_ms // 1000 * 2
+    return [pcm[i:i + size] for i in range(0, len(pcm), size)]
+
+
+def _wav(pcm, channels=1):
+    if channels == 2:
+        samples = array("h", pcm)
+        pcm = array("h", [s for sample in samples for s in (sample, sample)]).tobytes()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class TestUtteranceSegmenter:
+    def test_cuts_at_pauses_and_drops_leading_silence(self):
+        segmenter = UtteranceSegmenter(RATE, frame_ms=20, silence_db=-40, endpoint_ms=600, max_utterance_ms=15_000)
+        pcm = _pcm((1.0, True), (1.0, False), (0.5, True), (0.2, False))
+
+        utterances = [u for frame in _frames(pcm) for u in segmenter.feed(frame)]
+        tail = segmenter.flush()
+
+        assert [(u.start_ms, u.end_ms) for u in utterances] == [(0, 1_600)]
+        assert (tail.start_ms, tail.end_ms) == (1_800, 2_700)  # 200 ms of pre-roll kept
+        assert len(tail.pcm) == 900 * RATE // 1000 * 2
+
+    def test_long_speech_is_cut_at_the_limit(self):
+        segmenter = UtteranceSegmenter(RATE, frame_ms=20, silence_db=-40, endpoint_ms=600, max_utterance_ms=2_000)
+        utterances = [u for frame in _frames(_pcm((5.0, True))) for u in segmenter.feed(frame)]
+
+        assert [(u.start_ms, u.end_ms) for u in utterances] == [(0, 2_000), (2_000, 4_000)]
+        assert segmenter.flush().end_ms == 5_000
+
+    def test_silence_is_never_an_utterance(self):
+        segmenter = UtteranceSegmenter(RATE, frame_ms=20, silence_db=-40, endpoint_ms=600, max_utterance_ms=15_000)
+        assert [u for frame in _frames(_pcm((3.0, False))) for u in segmenter.feed(frame)] == []
+        assert segmenter.flush() is None
+
+
+class TestFileFrameSource:
+    @pytest.mark.asyncio
+    async def test_replays_at_the_requested_speed(self):
+        source = FileFrameSource(_wav(_pcm((1.0, True))), "call.wav", frame_ms=20, speed=10)
+
+        started = time.monotonic()
+        frames = [frame async for frame in source]
+        elapsed = time.monotonic() - started
+
+        assert len(frames) == 50 and all(len(f) == 320 for f in frames)
+        assert elapsed >= 0.09  # one second of audio at ten times real time
+
+    def test_stereo_is_downmixed(self):
+        pcm = _pcm((0.5, True))
+        source = FileFrameSource(_wav(pcm, channels=2), "call.wav")
+        assert source.pcm == pcm and source.sample_rate == RATE and source.duration_ms == 500
+
+
+class _UtteranceBackend(TranscriptionBackend):
+    """Names each utterance by its length; earlier utterances take longer"""
+    name = "utterances"
+
+    def __init__(self):
+        self.delays = [0.05, 0.0, 0.0]
+
+    def transcribe(self, audio_data, file_name):
+        with wave.open(io.BytesIO(audio_data)) as wav:
+            ms = wav.getnframes() * 1000 // wav.getframerate()
+        return SimpleNamespace(text=f"{ms} ms.", language="en", segments=[{"text": f"{ms} ms.", "start": 0.1, "end": 0.5}])
+
+    async def atranscribe(self, audio_data, file_name):
+        await asyncio.sleep(self.delays.pop(0) if self.delays else 0)
+        return self.transcribe(audio_data, file_name)
+
+
+def _summary(text):
+    return CallSummary(brief_summary=text, key_points=[], customer_intent="", resolution_status=ResolutionStatus.UNRESOLVED,
+                       topics=[], sentiment=Sentiment.NEUTRAL)
+
+
+@pytest.fixture
+def live_agents(monkeypatch):
+    """Offline backend and agents; the final analysis echoes what it was given"""
+    import graph.live_analysis as live
+    from agents.abuse_detection_agent import AbuseDetectionAgent
+    from agents.summarization_agent import SummarizationAgent
+
+    monkeypatch.setattr(backends, "_factories", dict(backends._factories))
+    monkeypatch.setattr(backends, "_backends", {})
+    register_backend("utterances", _UtteranceBackend)
+    monkeypatch.setattr(settings, "LIVE_ANALYSIS_INTERVAL_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "AUDIO_VAD_FRAME_MS", 20)
+
+    async def summarize(self, state):
+        state.summary = _summary(state.transcript.full_text)
+        return state
+
+    async def screen(self, state):
+        flag = AbuseFlag(detected=True, severity=AbuseSeverity.HIGH, evidence=["threat"])
+        self._escalate(state, flag, time.monotonic(), streamed=True)
+        state.abuse_flags = [flag]
+        return state
+
+    async def final_analysis(raw_input, **kwargs):
+        return {"raw_input": raw_input, "call_id": kwargs["call_id"], "errors": [],
+                "transcript": TranscriptData(full_text=raw_input, compact_text="compact")}
+
+    monkeypatch.setattr(SummarizationAgent, "arun", summarize)
+    monkeypatch.setattr(AbuseDetectionAgent, "arun", screen)
+    monkeypatch.setattr(live, "arun_analysis", final_analysis)
+    return live
+
+
+class TestLiveAnalysis:
+    @pytest.mark.asyncio
+    async def test_partial_transcripts_rolling_analysis_and_final(self, live_agents):
+        pcm = _pcm((1.0, True), (1.0, False), (1.0, True), (1.0, False), (0.5, True))
+        # Paced, so the rolling refresh completes before hang-up supersedes it
+        source = FileFrameSource(_wav(pcm), "call.wav", speed=20)
+
+        events = [event async for event in live_agents.astream_live_analysis(
+            source, source.sample_rate, models={"transcription": "utterances"}, call_id="CALL-1")]
+        names = [name for name, _, _ in events]
+
+        # Utterances arrive in call order although the first one took longest
+        partials = [update["transcript"].segments[0] for name, update, _ in events if name == "partial_transcript"]
+        assert [s.text for s in partials] == ["1600 ms.", "1800 ms.", "700 ms."]
+        assert [s.start_time for s in partials] == pytest.approx([0.1, 1.9, 3.9])
+
+        assert names.count("escalation") == 1
+        assert names.index("escalation") < names.index("rolling_analysis")
+        rolling = next(state for name, _, state in events if name == "rolling_analysis")
+        assert rolling["summary"].brief_summary.startswith("1600 ms.")
+
+        name, final, _ = events[-1]
+        assert name == "final"
+        assert final["raw_input"] == "1600 ms. 1800 ms. 700 ms."
+        assert final["call_id"] == "CALL-1"
+        assert final["transcript"].compact_text == "compact"
+        assert [s.end_time for s in final["transcript"].segments] == pytest.approx([0.5, 2.3, 4.3])
+        assert final["escalation"].call_id == "CALL-1"
+
+    @pytest.mark.asyncio
+    async def test_failed_utterance_is_recorded_and_the_call_goes_on(self, live_agents):
+        calls = []
+
+        async def flaky(self, audio_data, file_name):
+            calls.append(file_name)
+            if len(calls) == 1:
+                raise ConnectionError("dropped")
+            return SimpleNamespace(text="Still here.", language="en", segments=[])
+
+        pcm = _pcm((1.0, True), (1.0, False), (1.0, True))
+        source = FileFrameSource(_wav(pcm), "call.wav", speed=0)
+        with patch.object(_UtteranceBackend, "atranscribe", flaky):
+            events = [event async for event in live_agents.astream_live_analysis(
+                source, source.sample_rate, models={"transcription": "utterances"})]
+
+        _, final, _ = events[-1]
+        assert final["raw_input"] == "Still here."
+        assert any("dropped" in error for error in final["errors"])
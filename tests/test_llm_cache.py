@@ -0,0 +1,182 @@
+"""Tests for the content-addressed LLM response cache"""
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from llm.cache import ResponseCache
+
+
+def _fake_llm(cache, *contents):
+    """Chat model that answers each call with the next content, then fails"""
+    return GenericFakeChatModel(
+        messages=iter([
+            AIMessage(content=c, usage_metadata={"input_tokens": 500, "output_tokens": 50, "total_tokens": 550})
+            for c in contents
+        ]),
+        cache=cache
+    )
+
+
+class TestResponseCache:
+    def test_repeat_call_is_served_from_cache(self):
+        cache = ResponseCache()
+        llm = _fake_llm(cache, "first")
+
+        assert llm.invoke("Summarize this call").content == "first"
+        # The fake has no second answer, so this only works if it is cached
+        assert llm.invoke("Summarize this call").content == "first"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_different_prompt_misses(self):
+        cache = ResponseCache()
+        llm = _fake_llm(cache, "first", "second")
+
+        llm.invoke("Call A")
+        assert llm.invoke("Call B").content == "second"
+        assert cache.stats()["hits"] == 0
+
+    def test_namespace_change_invalidates(self, tmp_path):
+        db = str(tmp_path / "cache.sqlite")
+        _fake_llm(ResponseCache(db_path=db, namespace="v1"), "old").invoke("Call A")
+
+        cache = ResponseCache(db_path=db, namespace="v2")
+        assert _fake_llm(cache, "new").invoke("Call A").content == "new"
+        assert cache.stats()["misses"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        db = str(tmp_path / "cache.sqlite")
+        _fake_llm(ResponseCache(db_path=db), "stored").invoke("Call A")
+
+        cache = ResponseCache(db_path=db)
+        assert _fake_llm(cache).invoke("Call A").content == "stored"
+        assert cache.stats()["hits"] == 1
+
+    def test_expired_entries_are_not_returned(self, tmp_path, monkeypatch):
+        import llm.stores as stores_module
+
+        now = [1000.0]
+        monkeypatch.setattr(stores_module.time, "time", lambda: now[0])
+        cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+        llm = _fake_llm(cache, "stale", "fresh")
+
+        llm.invoke("Call A")
+        now[0] += 61
+        assert llm.invoke("Call A").content == "fresh"
+
+    def test_memory_tier_is_lru_bounded(self):
+        cache = ResponseCache(memory_entries=2)
+        llm = _fake_llm(cache, "a", "b", "c", "a again")
+
+        llm.invoke("A")
+        llm.invoke("B")
+        llm.invoke("A")  # refresh A so B is the least recently used
+        llm.invoke("C")
+
+        assert cache.stats()["evictions"] == 1
+        assert llm.invoke("A").content == "a"
+
+    def test_persistent_tier_is_size_bounded(self, tmp_path):
+        cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite"), max_entries=2, memory_entries=1)
+        llm = _fake_llm(cache, "a", "b", "c", "a again")
+
+        llm.invoke("A")
+        llm.invoke("B")
+        llm.invoke("C")
+
+        rows = cache._store._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        assert rows == 2
+        assert llm.invoke("A").content == "a again"
+
+    def test_cache_hits_are_not_billed(self):
+        """Test that usage tracking counts a hit but no tokens or cost"""
+        from graph.metrics import track_usage
+
+        llm = _fake_llm(ResponseCache(), "answer")
+        llm.invoke("Call A")
+
+        with track_usage() as tracker:
+            llm.invoke("Call A")
+
+        assert tracker.cache_hits == 1
+        assert tracker.llm_calls == 0
+        assert tracker.prompt_tokens == 0
+        assert tracker.estimated_cost_usd == 0.0
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.Redis the stores use"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            import redis
+            raise redis.exceptions.ConnectionError("Connection refused")
+
+    def get(self, key):
+        self._check()
+        value = self.data.get(key)
+        return value.encode("utf-8") if value is not None else None
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def scan_iter(self, match):
+        self._check()
+        prefix = match.rstrip("*")
+        return [k for k in self.data if k.startswith(prefix)]
+
+    def delete(self, *keys):
+        self._check()
+        for k in keys:
+            self.data.pop(k, None)
+
+
+class TestRedisStore:
+    def test_replicas_share_cached_responses(self):
+        """Test that a response cached by one replica is a hit on another"""
+        from llm.stores import RedisStore
+
+        server = FakeRedis()
+        _fake_llm(ResponseCache(store=RedisStore(server, "app:llm")), "shared").invoke("Call A")
+
+        other_replica = ResponseCache(store=RedisStore(server, "app:llm"))
+        assert _fake_llm(other_replica).invoke("Call A").content == "shared"
+        assert all(k.startswith("app:llm:") for k in server.data)
+
+    def test_entries_get_redis_ttl(self):
+        from llm.stores import RedisStore
+
+        server = FakeRedis()
+        RedisStore(server, "app:result", ttl_seconds=3600).set("k", "v")
+
+        assert server.expiry == {"app:result:k": 3600}
+
+    def test_falls_back_to_memory_when_redis_is_down(self):
+        from llm.stores import RedisStore
+
+        server = FakeRedis()
+        server.down = True
+        store = RedisStore(server, "app:result", retry_interval=60)
+
+        store.set("k", "v")
+        assert store.get("k") == "v"
+        assert not store.available
+        assert server.data == {}
+
+    def test_clear_only_touches_its_namespace(self):
+        from llm.stores import RedisStore
+
+        server = FakeRedis()
+        RedisStore(server, "app:llm").set("k", "v")
+        result_store = RedisStore(server, "app:result")
+        result_store.set("k", "v")
+
+        result_store.clear()
+
+        assert list(server.data) == ["app:llm:k"]
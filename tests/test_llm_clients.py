@@ -0,0 +1,63 @@
+"""Tests for the shared LLM client factory"""
+import asyncio
+
+from llm.clients import (
+    chat_openai,
+    chat_anthropic,
+    get_http_client,
+    get_async_http_client,
+    openai_client,
+    _LoopLocalTransport,
+)
+
+
+class TestClientFactory:
+    def test_chat_models_are_shared(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+        assert chat_openai("gpt-4o-mini", temperature=0) is chat_openai("gpt-4o-mini", temperature=0)
+        assert chat_openai("gpt-4o-mini", temperature=0) is not chat_openai("gpt-4o-mini")
+
+    def test_api_key_change_gets_new_model(self, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-one")
+        first = chat_anthropic("claude-sonnet-4-20250514")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-two")
+
+        assert chat_anthropic("claude-sonnet-4-20250514") is not first
+
+    def test_openai_models_use_shared_pools(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        llm = chat_openai("gpt-4o-mini")
+
+        assert llm.root_client._client is get_http_client()
+        assert llm.root_async_client._client is get_async_http_client()
+        assert openai_client("sk-test")._client is get_http_client()
+
+    def test_cache_control_only_sent_to_anthropic(self, monkeypatch):
+        """Test that prompt-cache breakpoints reach Anthropic and are stripped for OpenAI"""
+        from langchain_core.messages import HumanMessage
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
+        block = {"type": "text", "text": "Call transcript", "cache_control": {"type": "ephemeral"}}
+        messages = [HumanMessage(content=[block]), HumanMessage(content="Summarize it")]
+
+        openai_payload = chat_openai("gpt-4o-mini")._get_request_payload(messages)
+        anthropic_payload = chat_anthropic("claude-sonnet-4-20250514")._get_request_payload(messages)
+
+        assert openai_payload["messages"][0]["content"] == [{"type": "text", "text": "Call transcript"}]
+        assert anthropic_payload["messages"][0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" in block  # the caller's message is left untouched
+
+    def test_async_pool_is_per_event_loop(self):
+        """Test that a new event loop never reuses another loop's connections"""
+        transport = _LoopLocalTransport()
+
+        async def current():
+            return transport._transport(), transport._transport()
+
+        first_a, first_b = asyncio.run(current())
+        second, _ = asyncio.run(current())
+
+        assert first_a is first_b
+        assert second is not first_a
@@ -0,0 +1,225 @@
+"""Tests for provider rate limiting, adaptive concurrency and retries"""
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from llm.rate_limit import (
+    AdaptiveConcurrency,
+    RateLimitedChatModel,
+    RateLimiter,
+    TokenBucket,
+    _Wait,
+)
+
+
+class APIStatusError(Exception):
+    """Shaped like the openai/anthropic SDK status errors"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    from config.settings import settings
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(settings, "LLM_RETRY_MAX_SECONDS", 0)
+
+
+def _flaky(failures):
+    """Callable raising the given exceptions in turn, then returning "ok" """
+    failures = list(failures)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+    return fn, calls
+
+
+class TestTokenBucket:
+    def test_burst_up_to_capacity_then_waits(self):
+        bucket = TokenBucket(rate_per_minute=60)  # one per second
+
+        assert all(bucket.reserve(1) == 0 for _ in range(60))
+        assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+    def test_oversized_request_is_capped_to_capacity(self):
+        bucket = TokenBucket(rate_per_minute=600)
+
+        assert bucket.reserve(10_000) == 0
+
+
+class TestAdaptiveConcurrency:
+    def test_throttle_cuts_limit_multiplicatively(self):
+        control = AdaptiveConcurrency(initial=8)
+        control.on_throttled()
+
+        assert control.limit == 4
+
+    def test_successes_grow_limit_additively(self):
+        control = AdaptiveConcurrency(initial=4, maximum=5)
+        for _ in range(4):
+            control.on_success(latency=0.1)
+
+        assert control.limit == pytest.approx(5, abs=0.2)
+
+    def test_slow_responses_shrink_limit(self):
+        control = AdaptiveConcurrency(initial=10, latency_target=5)
+        control.on_success(latency=20)
+
+        assert control.limit == 9
+
+    def test_acquire_respects_limit(self):
+        control = AdaptiveConcurrency(initial=2)
+
+        assert control.try_acquire() and control.try_acquire()
+        assert not control.try_acquire()
+        control.release()
+        assert control.try_acquire()
+
+
+class TestRateLimiter:
+    def test_retries_429_and_backs_off_concurrency(self):
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100_000, max_concurrency=8)
+        fn, calls = _flaky([APIStatusError(429), APIStatusError(503)])
+
+        assert limiter.call(fn) == "ok"
+        assert len(calls) == 3
+        assert limiter.throttled == 1
+        assert limiter.retries == 2
+        assert limiter.concurrency.limit < 4
+        assert limiter.concurrency.in_flight == 0
+
+    def test_client_errors_are_not_retried(self):
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100_000)
+        fn, calls = _flaky([APIStatusError(400)])
+
+        with pytest.raises(APIStatusError):
+            limiter.call(fn)
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_retries(self):
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100_000, max_retries=2)
+        fn, calls = _flaky([APIStatusError(429)] * 5)
+
+        with pytest.raises(APIStatusError):
+            limiter.call(fn)
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_async_call_retries(self):
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100_000)
+        fn, calls = _flaky([APIStatusError(429)])
+
+        async def afn():
+            return fn()
+
+        assert await limiter.acall(afn) == "ok"
+        assert len(calls) == 2
+
+    def test_wait_honours_retry_after(self):
+        from tenacity import RetryCallState, Future
+
+        state = RetryCallState(retry_object=None, fn=None, args=(), kwargs={})
+        state.attempt_number = 1
+        state.outcome = Future(1)
+        state.outcome.set_exception(APIStatusError(429, retry_after="7"))
+
+        assert _Wait(multiplier=0.5, maximum=2)(state) == 7
+
+
+class FlakyChatModel(RateLimitedChatModel, GenericFakeChatModel):
+    """Fake chat model routed through the rate limiter"""
+    model: str = "gpt-4o-mini"
+
+
+class NativeAsyncStreamChatModel(GenericFakeChatModel):
+    """Fake provider streaming natively under astream, like the real clients"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in GenericFakeChatModel._stream(self, messages, stop=stop, **kwargs):
+            yield chunk
+
+
+class AsyncStreamingChatModel(RateLimitedChatModel, NativeAsyncStreamChatModel):
+    model: str = "gpt-4o-mini"
+
+
+class TestRateLimitedChatModel:
+    def test_retries_are_reported_to_usage_tracking(self, monkeypatch):
+        """Test that a throttled call is retried and counted in node metrics"""
+        from graph.metrics import track_usage
+        import llm.rate_limit as rate_limit
+
+        monkeypatch.setattr(rate_limit, "_limiters", {})
+        attempts = []
+        original = GenericFakeChatModel._generate
+
+        def provider_call(self, messages, stop=None, run_manager=None, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise APIStatusError(429)
+            return original(self, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        monkeypatch.setattr(GenericFakeChatModel, "_generate", provider_call)
+        llm = FlakyChatModel(messages=iter([AIMessage(content="done")]))
+
+        with track_usage() as tracker:
+            assert llm.invoke("Summarize").content == "done"
+
+        assert len(attempts) == 2
+        assert tracker.retries == 1
+        assert rate_limit.get_rate_limiter("openai", "gpt-4o-mini").throttled == 1
+
+    def test_stream_retried_until_first_chunk(self, monkeypatch):
+        """Test that a throttled streaming call is retried before any token is handed out"""
+        import llm.rate_limit as rate_limit
+
+        monkeypatch.setattr(rate_limit, "_limiters", {})
+        attempts = []
+        original = GenericFakeChatModel._stream
+
+        def provider_stream(self, messages, stop=None, run_manager=None, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise APIStatusError(429)
+            yield from original(self, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        monkeypatch.setattr(GenericFakeChatModel, "_stream", provider_stream)
+        llm = FlakyChatModel(messages=iter([AIMessage(content="all done here")]))
+
+        assert "".join(chunk.content for chunk in llm.stream("Summarize")) == "all done here"
+        assert len(attempts) == 2
+        assert rate_limit.get_rate_limiter("openai", "gpt-4o-mini").throttled == 1
+
+    def test_stream_holds_its_slot_until_it_ends(self, monkeypatch):
+        """Test that a long stream counts against the concurrency limit until its last chunk"""
+        import llm.rate_limit as rate_limit
+
+        monkeypatch.setattr(rate_limit, "_limiters", {})
+        limiter = rate_limit.get_rate_limiter("openai", "gpt-4o-mini")
+        llm = FlakyChatModel(messages=iter([AIMessage(content="a long streamed answer")]))
+
+        chunks = llm.stream("Summarize")
+        next(chunks)
+        assert limiter.concurrency.in_flight == 1
+        list(chunks)
+        assert limiter.concurrency.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_async_stream_holds_its_slot_until_it_ends(self, monkeypatch):
+        import llm.rate_limit as rate_limit
+
+        monkeypatch.setattr(rate_limit, "_limiters", {})
+        limiter = rate_limit.get_rate_limiter("openai", "gpt-4o-mini")
+        llm = AsyncStreamingChatModel(messages=iter([AIMessage(content="a long streamed answer")]))
+
+        in_flight = [limiter.concurrency.in_flight async for _ in llm.astream("Summarize")]
+
+        assert in_flight and all(n == 1 for n in in_flight)
+        assert limiter.concurrency.in_flight == 0
@@ -0,0 +1,132 @@
+"""Tests for latency-aware model routing and failover"""
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm.router import ModelRouter, Route
+
+
+class APIStatusError(Exception):
+    """Shaped like the openai/anthropic SDK status errors"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _call_returning(results):
+    """call(model) returning results[model], raising it if it's an exception"""
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        result = results[model]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return call, calls
+
+
+class TestModelRouter:
+    def test_prefers_first_candidate_until_another_is_clearly_faster(self):
+        router = ModelRouter(switch_ratio=1.5)
+        router.record_success("primary", latency=1.0)
+        router.record_success("fallback", latency=0.8)
+
+        assert router.order(["primary", "fallback"]) == ["primary", "fallback"]
+
+        for _ in range(5):
+            router.record_success("primary", latency=4.0)
+        assert router.order(["primary", "fallback"]) == ["fallback", "primary"]
+
+    def test_fails_over_on_provider_errors(self):
+        router = ModelRouter()
+        call, calls = _call_returning({"primary": APIStatusError(529), "fallback": "ok"})
+
+        assert router.invoke(["primary", "fallback"], call) == ("ok", "fallback")
+        assert calls == ["primary", "fallback"]
+        assert router.stats()["primary"]["failures"] == 1
+
+    def test_client_errors_are_not_failed_over(self):
+        router = ModelRouter()
+        call, calls = _call_returning({"primary": APIStatusError(400), "fallback": "ok"})
+
+        with pytest.raises(APIStatusError):
+            router.invoke(["primary", "fallback"], call)
+        assert calls == ["primary"]
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        router = ModelRouter(failure_threshold=2, cooldown_seconds=60)
+        call, calls = _call_returning({"primary": APIStatusError(503), "fallback": "ok"})
+        router.invoke(["primary", "fallback"], call)
+        router.invoke(["primary", "fallback"], call)
+        calls.clear()
+
+        assert router.invoke(["primary", "fallback"], call) == ("ok", "fallback")
+        assert calls == ["fallback"]
+        assert router.stats()["primary"]["circuit_open"]
+
+    @pytest.mark.asyncio
+    async def test_async_failover(self):
+        router = ModelRouter()
+        call, calls = _call_returning({"primary": ConnectionError(), "fallback": "ok"})
+
+        async def acall(model):
+            return call(model)
+
+        assert await router.ainvoke(["primary", "fallback"], acall) == ("ok", "fallback")
+
+
+class TestRoute:
+    def test_routed_chain_reports_the_model_used(self, monkeypatch):
+        """Test that a degraded preferred model is skipped and the fallback is reported"""
+        from config.settings import settings
+
+        monkeypatch.setitem(settings.MODEL_ROUTES, "summarizer", ["gpt-4o-mini", "gpt-4o"])
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        route = Route("summarizer", "gpt-4o-mini", router=ModelRouter())
+
+        class DownChatModel(FakeListChatModel):
+            def _call(self, *args, **kwargs):
+                raise APIStatusError(503)
+
+        llms = {"gpt-4o-mini": DownChatModel(responses=[""]), "gpt-4o": FakeListChatModel(responses=["summary"])}
+        monkeypatch.setattr(route, "llm", llms.get)
+
+        output, model = route.bind(ChatPromptTemplate.from_messages([("human", "{transcript}")])).invoke(
+            {"transcript": "Customer: hi"}
+        )
+
+        assert output.content == "summary"
+        assert model == "gpt-4o"
+
+    def test_mid_stream_failover_restarts_the_token_stream(self, monkeypatch):
+        """Test that the caller is told to drop a failed attempt's partial tokens"""
+        from config.settings import settings
+
+        monkeypatch.setitem(settings.MODEL_ROUTES, "abuse_detector", ["gpt-4o-mini", "gpt-4o"])
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        route = Route("abuse_detector", "gpt-4o-mini", router=ModelRouter())
+
+        class DroppedStreamChatModel(FakeListChatModel):
+            def _stream(self, *args, **kwargs):
+                yield from list(super()._stream(*args, **kwargs))[:3]
+                raise APIStatusError(503)
+
+        llms = {"gpt-4o-mini": DroppedStreamChatModel(responses=["partial"]),
+                "gpt-4o": FakeListChatModel(responses=["complete"])}
+        monkeypatch.setattr(route, "llm", llms.get)
+        tokens = []
+
+        output, model = route.bind(ChatPromptTemplate.from_messages([("human", "{transcript}")])).invoke(
+            {"transcript": "Customer: hi"}, on_token=tokens.append, on_restart=tokens.clear
+        )
+
+        assert model == "gpt-4o"
+        assert "".join(tokens) == output.content == "complete"
+
+    def test_fallbacks_without_api_key_are_skipped(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        assert Route("summarizer", "gpt-4o-mini").available() == ["gpt-4o-mini"]
@@ -0,0 +1,86 @@
+"""Tests for the content-hash transcript cache"""
+import hashlib
+import io
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import audio.transcript_cache as transcript_cache
+from audio.transcript_cache import audio_digest, transcript_key
+from config.settings import settings
+from models.schemas import AgentState
+
+RESPONSE = SimpleNamespace(text="Hello, how can I help?", language="en", segments=[
+    {"text": "Hello, how can I help?", "start": 0.0, "end": 2.5},
+])
+
+
+@pytest.fixture
+def transcript_store(monkeypatch):
+    """Transcript cache on, in memory"""
+    monkeypatch.setattr(settings, "TRANSCRIPT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "TRANSCRIPT_CACHE_PATH", "")
+    monkeypatch.setattr(transcript_cache, "_transcript_store", None)
+    yield transcript_cache.get_transcript_store()
+
+
+def _state(audio_data=b"recording"):
+    return AgentState(raw_input="", input_type="audio", audio_data=audio_data, input_file_path="call.mp3")
+
+
+class TestAudioDigest:
+    def test_block_hash_matches_whole_hash_for_bytes_and_files(self, monkeypatch):
+        monkeypatch.setattr(transcript_cache, "HASH_BLOCK_BYTES", 7)
+        data = bytes(range(256)) * 3
+        expected = hashlib.sha256(data).hexdigest()
+
+        assert audio_digest(data) == expected
+        assert audio_digest(io.BytesIO(data)) == expected
+
+    def test_key_depends_on_model_and_preprocessing(self, monkeypatch):
+        key = transcript_key(b"recording", "whisper-1")
+
+        assert transcript_key(b"recording", "whisper-1") == key
+        assert transcript_key(b"recording", "other-model") != key
+        monkeypatch.setattr(settings, "AUDIO_VAD_TRIM", not settings.AUDIO_VAD_TRIM)
+        assert transcript_key(b"recording", "whisper-1") != key
+
+
+class TestTranscriptionCache:
+    def test_resubmitted_audio_skips_whisper(self, transcript_store):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+        with patch.object(agent, "_transcribe_audio", return_value=RESPONSE) as transcribe:
+            first = agent.run(_state())
+            second = agent.run(_state())
+            agent.run(_state(b"another recording"))
+
+        assert transcribe.call_count == 2
+        assert second.transcript == first.transcript
+        assert second.transcript.segments[0].end_time == 2.5
+        assert second.models_used == ["transcript-cache"]
+
+    @pytest.mark.asyncio
+    async def test_async_hit(self, transcript_store):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+        with patch.object(agent, "_atranscribe_audio", return_value=RESPONSE) as transcribe:
+            await agent.arun(_state())
+            result = await agent.arun(_state())
+
+        transcribe.assert_called_once()
+        assert result.transcript.full_text == "Hello, how can I help?"
+
+    def test_unreadable_entry_is_a_miss(self, transcript_store):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+        transcript_store.set(transcript_key(b"recording", agent.model_name), "{not json")
+        with patch.object(agent, "_transcribe_audio", return_value=RESPONSE) as transcribe:
+            result = agent.run(_state())
+
+        transcribe.assert_called_once()
+        assert result.models_used == ["whisper-1"]
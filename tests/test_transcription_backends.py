@@ -0,0 +1,110 @@
+"""Tests for pluggable speech-to-text backends"""
+from types import SimpleNamespace
+
+import pytest
+
+import audio.backends as backends
+from audio.backends import LocalWhisperBackend, StubBackend, TranscriptionBackend, get_backend, register_backend
+from models.schemas import AgentState
+
+
+def _audio_state(audio_data=b"\0" * 10_000):
+    return AgentState(raw_input="", input_type="audio", audio_data=audio_data, input_file_path="call.wav")
+
+
+class TestBackendSelection:
+    def test_backend_without_transcribe_is_rejected(self):
+        class AsyncOnly(TranscriptionBackend):
+            async def atranscribe(self, audio_data, file_name):
+                return SimpleNamespace(text="", language="en", segments=[])
+
+        with pytest.raises(TypeError, match="transcribe"):
+            AsyncOnly()
+
+    def test_default_backend_is_the_whisper_api(self):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent()
+        assert agent.model_name == "whisper-1"
+        assert agent.backend.remote
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError, match="stub"):
+            get_backend("not-a-backend")
+
+    def test_registered_backend_is_selectable(self, monkeypatch):
+        class Echo(TranscriptionBackend):
+            name = "echo"
+
+            def transcribe(self, audio_data, file_name):
+                return SimpleNamespace(text=file_name, language="en", segments=[])
+
+        monkeypatch.setattr(backends, "_factories", dict(backends._factories))
+        monkeypatch.setattr(backends, "_backends", {})
+        register_backend("echo", Echo)
+        from agents.transcription_agent import TranscriptionAgent
+
+        result = TranscriptionAgent(backend="echo").run(_audio_state())
+        assert result.transcript.full_text == "call.wav"
+        assert result.models_used == ["echo"]
+
+
+class TestStubBackend:
+    def test_transcribes_offline_without_upload_preprocessing(self, monkeypatch):
+        import agents.transcription_agent as transcription
+
+        # Pre-encoding and chunking only apply to upload-limited backends
+        monkeypatch.setattr(transcription, "preencode_available", lambda: pytest.fail("pre-encoded for a local backend"))
+        result = transcription.TranscriptionAgent(backend="stub").run(_audio_state())
+
+        assert [s.text for s in result.transcript.segments] == [
+            "Customer: Hello, I have a question about my bill.", "Agent: Sure, let me check your account."]
+        assert result.transcript.segments[1].start_time == 3.0
+        assert result.models_used == ["stub"]
+
+    @pytest.mark.asyncio
+    async def test_async(self):
+        from agents.transcription_agent import TranscriptionAgent
+
+        agent = TranscriptionAgent(backend="stub")
+        agent.backend = StubBackend("Agent: Thanks for calling.")
+        result = await agent.arun(_audio_state())
+
+        assert result.transcript.full_text == "Agent: Thanks for calling."
+
+    def test_selected_per_request_through_model_overrides(self):
+        from graph.workflow import clear_workflow_cache, create_workflow
+
+        clear_workflow_cache()
+        app = create_workflow({"transcription": "stub"}, profile="fast")
+        state = app.nodes["transcription"].bound.invoke(_audio_state())
+
+        assert state["models_used"] == ["stub"]
+
+    def test_large_files_allowed_without_upload_limit(self):
+        from agents.input_validation_agent import InputValidationAgent
+
+        state = AgentState(input_type="audio", audio_data=b"\0" * (26 * 1024 * 1024), input_file_path="call.wav")
+        assert InputValidationAgent(transcription_backend="stub").run(state).validation_result.is_valid
+
+
+class TestLocalBackend:
+    def test_needs_a_model_path(self):
+        with pytest.raises(ValueError, match="LOCAL_STT_MODEL_PATH"):
+            LocalWhisperBackend(model_path="").transcribe(b"audio", "call.wav")
+
+    def test_builds_verbose_response_from_model_segments(self):
+        class FakeModel:
+            def transcribe(self, audio, beam_size):
+                assert audio.name == "call.wav"
+                segments = (SimpleNamespace(text=text, start=start, end=end)
+                            for text, start, end in [(" Hello.", 0.0, 1.0), (" Bye.", 1.0, 2.0)])
+                return segments, SimpleNamespace(language="en")
+
+        backend = LocalWhisperBackend(model_path="/models/whisper-small")
+        backend._model = FakeModel()
+        response = backend.transcribe(b"audio", "call.wav")
+
+        assert backend.name == "local:whisper-small"
+        assert response.text == "Hello. Bye."
+        assert response.segments[1] == {"text": " Bye.", "start": 1.0, "end": 2.0}
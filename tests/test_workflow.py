@@ -1,8 +1,35 @@
 """Integration tests for the workflow"""
 import pytest
 import os
-from models.schemas import AgentState
-from graph.workflow import create_workflow, run_analysis
+import threading
+from unittest.mock import patch
+from models.schemas import (
+    AgentState,
+    AbuseFlag,
+    CallSummary,
+    QAScores,
+    SummaryCritique,
+    ResolutionStatus,
+    Sentiment,
+    TranscriptData,
+)
+from agents.abuse_detection_agent import AbuseDetectionAgent
+from agents.summarization_agent import SummarizationAgent
+from agents.critic_agent import CriticAgent
+from agents.qa_scoring_agent import QAScoringAgent
+from agents.fast_analysis_agent import FastAnalysisAgent
+from graph.workflow import (
+    create_workflow,
+    run_analysis,
+    arun_analysis,
+    arun_analysis_batch,
+    run_analysis_batch,
+    stream_analysis,
+    resume_analysis,
+    ESCALATION_EVENT,
+    get_workflow,
+    clear_workflow_cache,
+)
 
 
 class TestWorkflowStructure:
@@ -19,6 +46,632 @@ class TestWorkflowStructure:
         assert workflow is not None
 
 
+class TestWorkflowRegistry:
+    def setup_method(self):
+        clear_workflow_cache()
+
+    def test_get_workflow_reuses_compiled_graph(self):
+        """Test that the same model configuration returns the same compiled graph"""
+        assert get_workflow() is get_workflow()
+        assert get_workflow({"summarization": "gpt-4o-mini"}) is get_workflow()
+
+    def test_get_workflow_keyed_by_models(self):
+        """Test that a different model configuration compiles a separate graph"""
+        default = get_workflow()
+        custom = get_workflow({"summarization": "gpt-4o"})
+        assert custom is not default
+
+    def test_get_workflow_rejects_unknown_agent(self):
+        with pytest.raises(ValueError):
+            get_workflow({"not_an_agent": "gpt-4o"})
+
+    def test_get_workflow_compiles_once_across_threads(self):
+        """Test that concurrent first calls share a single compiled graph"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            apps = list(pool.map(lambda _: get_workflow(), range(16)))
+
+        assert all(app is apps[0] for app in apps)
+
+
+VALID_TRANSCRIPT = """Customer: Hi, I have a question about my bill. I was charged twice this month.
+Agent: I apologize for the inconvenience. Let me look into that for you.
+Customer: Thanks. The account number is 12345678.
+Agent: I can see the duplicate charge and I have processed a refund."""
+
+
+def _mock_llm_agents(barrier=None, critiques=None):
+    """Patch the LLM-backed agents with offline fakes
+
+    If a barrier is given, the first abuse/summarization/QA calls all wait on
+    it, which only succeeds when the three branches really run concurrently.
+    """
+    critiques = list(critiques or [False])
+
+    def wait():
+        if barrier is not None:
+            barrier.wait(timeout=5)
+
+    def abuse_run(self, state):
+        wait()
+        state.abuse_flags = [AbuseFlag(detected=True, evidence=["damn"])]
+        state.execution_path.append("abuse_detection")
+        state.models_used.append(self.model_name)
+        return state
+
+    def summarize_run(self, state):
+        if state.revision_count == 0:
+            wait()
+        state.summary = CallSummary(
+            brief_summary=f"Duplicate charge refunded (v{state.revision_count + 1})",
+            key_points=["Duplicate charge", "Refund issued"],
+            customer_intent="Get refund",
+            resolution_status=ResolutionStatus.RESOLVED,
+            topics=["billing"],
+            sentiment=Sentiment.NEUTRAL
+        )
+        state.execution_path.append(f"summarization{'_v'+str(state.revision_count+1) if state.revision_count > 0 else ''}")
+        state.models_used.append(self.model_name)
+        return state
+
+    def critic_run(self, state):
+        needs_revision = critiques.pop(0) if critiques else False
+        critique = SummaryCritique(
+            faithfulness_score=6 if needs_revision else 9,
+            completeness_score=9,
+            conciseness_score=9,
+            needs_revision=needs_revision,
+            feedback="ok"
+        )
+        # Only the LLM call is faked; the revision decision is the real one
+        return CriticAgent._record(self, state, critique)
+
+    def qa_run(self, state):
+        wait()
+        state.qa_scores = QAScores(empathy=8, professionalism=9, resolution=9, tone=8)
+        state.execution_path.append("qa_scoring")
+        state.models_used.append(self.model_name)
+        return state
+
+    def as_async(run):
+        async def arun(self, state):
+            return run(self, state)
+        return arun
+
+    patches = []
+    for agent_cls, run in [
+        (AbuseDetectionAgent, abuse_run),
+        (SummarizationAgent, summarize_run),
+        (CriticAgent, critic_run),
+        (QAScoringAgent, qa_run),
+    ]:
+        patches.append(patch.object(agent_cls, "run", run))
+        patches.append(patch.object(agent_cls, "arun", as_async(run)))
+    return patches
+
+
+class TestParallelWorkflow:
+    def _invoke(self, patches, parallel=True):
+        for p in patches:
+            p.start()
+        try:
+            app = create_workflow(parallel=parallel)
+            return app.invoke(AgentState(raw_input=VALID_TRANSCRIPT, input_type="transcript"))
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+    def test_branches_run_concurrently(self):
+        """Test that abuse detection, summarization and QA scoring overlap in time"""
+        barrier = threading.Barrier(3)
+        result = self._invoke(_mock_llm_agents(barrier=barrier))
+
+        assert not barrier.broken
+        assert result["summary"] is not None
+        assert result["qa_scores"] is not None
+        assert len(result["abuse_flags"]) == 1
+
+    def test_branch_logs_merge_without_duplicates(self):
+        """Test that reducers merge each branch's log entries exactly once"""
+        result = self._invoke(_mock_llm_agents(critiques=[True, False]))
+
+        path = result["execution_path"]
+        assert path[:4] == ["validation", "intake", "transcription", "compaction"]
+        assert sorted(path[4:]) == sorted([
+            "abuse_detection", "summarization", "qa_scoring",
+            "critic", "summarization_v2", "critic"
+        ])
+        assert len(result["models_used"]) == len(path)
+        assert result["revision_count"] == 1
+
+    def test_concurrent_branch_logs_merge_without_duplicates(self):
+        """Test that branches appending at the same time don't leak into each other's updates"""
+        sequential = self._invoke(_mock_llm_agents(critiques=[True, False]), parallel=False)
+        expected = sorted(sequential["execution_path"])
+
+        for _ in range(5):
+            barrier = threading.Barrier(3)
+            result = self._invoke(_mock_llm_agents(barrier=barrier, critiques=[True, False]))
+
+            assert not barrier.broken
+            assert sorted(result["execution_path"]) == expected
+            assert len(result["models_used"]) == len(result["execution_path"])
+
+    def test_sequential_topology_still_available(self):
+        result = self._invoke(_mock_llm_agents(), parallel=False)
+
+        assert result["execution_path"] == [
+            "validation", "intake", "transcription", "compaction",
+            "abuse_detection", "summarization", "critic", "qa_scoring"
+        ]
+
+
+class TestAsyncWorkflow:
+    @pytest.mark.asyncio
+    async def test_ainvoke_runs_agent_coroutines(self):
+        """Test that the compiled graph awaits each agent's arun under ainvoke"""
+        patches = _mock_llm_agents(critiques=[True, False])
+        for p in patches:
+            p.start()
+        try:
+            app = create_workflow()
+            result = await app.ainvoke(AgentState(raw_input=VALID_TRANSCRIPT, input_type="transcript"))
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        assert result["summary"].brief_summary.endswith("(v2)")
+        assert result["qa_scores"] is not None
+        assert "summarization_v2" in result["execution_path"]
+
+    @pytest.mark.asyncio
+    async def test_arun_analysis_rejects_invalid_input(self):
+        clear_workflow_cache()
+        result = await arun_analysis(raw_input="Hi", input_type="transcript")
+
+        assert result["execution_path"] == ["validation"]
+        assert result["validation_result"].is_valid is False
+
+
+class TestStreamAnalysis:
+    def setup_method(self):
+        clear_workflow_cache()
+
+    def test_yields_each_node_with_its_delta(self):
+        """Test that stream_analysis reports nodes as they finish, ending in the final state"""
+        patches = _mock_llm_agents(critiques=[True, False])
+        for p in patches:
+            p.start()
+        try:
+            events = list(stream_analysis(raw_input=VALID_TRANSCRIPT, input_type="transcript"))
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        nodes = [node for node, _, _ in events]
+        assert nodes[:4] == ["validation", "intake", "transcription", "compaction"]
+        assert nodes.count("summarization") == 2
+        assert nodes.count("critic") == 2
+
+        # Deltas carry only what the node produced
+        abuse_update = next(update for node, update, _ in events if node == "abuse_detection")
+        assert set(abuse_update) == {"abuse_flags", "execution_path", "models_used", "node_metrics"}
+
+        # The merged state grows monotonically and ends complete
+        final_state = events[-1][2]
+        assert final_state["summary"] is not None
+        assert final_state["qa_scores"] is not None
+        assert len(final_state["execution_path"]) == len(events)
+
+    def test_stops_after_failed_validation(self):
+        events = list(stream_analysis(raw_input="Hi", input_type="transcript"))
+
+        assert [node for node, _, _ in events] == ["validation"]
+        assert events[-1][2]["validation_result"].is_valid is False
+
+
+    def test_escalation_is_yielded_before_abuse_node_finishes(self, monkeypatch):
+        """Test that a streamed high-severity flag reaches the caller ahead of the node update"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        from llm.router import Route
+
+        response = (
+            'TYPE: threat\nSEVERITY: 9\nTEXT: "You will regret this"\nCONTEXT: Threat against the agent\n\n'
+            'TYPE: profanity\nSEVERITY: 2\nTEXT: "damn"\nCONTEXT: Mild profanity\n'
+        )
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setattr(Route, "llm", lambda self, model: GenericFakeChatModel(messages=iter([AIMessage(content=response)])))
+        # Only the abuse detection agent runs for real, streaming from the fake model
+        patches = [p for p in _mock_llm_agents() if p.getter() is not AbuseDetectionAgent]
+        for p in patches:
+            p.start()
+        try:
+            events = list(stream_analysis(raw_input=VALID_TRANSCRIPT, input_type="transcript"))
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        nodes = [node for node, _, _ in events]
+        assert nodes.count(ESCALATION_EVENT) == 1
+        assert nodes.index(ESCALATION_EVENT) < nodes.index("abuse_detection")
+        event = events[nodes.index(ESCALATION_EVENT)][1]["escalation"]
+        assert event.flag.evidence == ["You will regret this"]
+        final_state = events[-1][2]
+        assert final_state["escalation"].streamed is True
+        assert len(final_state["abuse_flags"]) == 2
+
+
+class TestBatchAnalysis:
+    def setup_method(self):
+        clear_workflow_cache()
+
+    def test_results_in_input_order_with_isolated_failures(self):
+        """Test that a bad item is reported without breaking the rest of the batch"""
+        patches = _mock_llm_agents()
+        for p in patches:
+            p.start()
+        try:
+            results = run_analysis_batch(
+                [
+                    VALID_TRANSCRIPT,
+                    "Hi",
+                    {"input_type": "audio"},  # no audio_data or file path
+                    {"raw_input": VALID_TRANSCRIPT, "input_type": "transcript"},
+                ],
+                max_concurrency=2
+            )
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+        assert [r["success"] for r in results] == [True, True, False, True]
+        assert results[0]["state"]["summary"] is not None
+        assert results[1]["state"]["validation_result"].is_valid is False
+        assert "audio_data or input_file_path" in results[2]["error"]
+        assert results[2]["state"] is None
+        assert all(r["latency_ms"] >= 0 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency_is_respected(self):
+        import asyncio
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_qa(self, state):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            state.qa_scores = QAScores(empathy=8, professionalism=9, resolution=9, tone=8)
+            state.execution_path.append("qa_scoring")
+            return state
+
+        patches = _mock_llm_agents() + [patch.object(QAScoringAgent, "arun", slow_qa)]
+        for p in patches:
+            p.start()
+        try:
+            results = await arun_analysis_batch([VALID_TRANSCRIPT] * 6, max_concurrency=2)
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        assert all(r["success"] for r in results)
+        assert peak == 2
+
+    def test_rejects_non_positive_concurrency(self):
+        with pytest.raises(ValueError):
+            run_analysis_batch([VALID_TRANSCRIPT], max_concurrency=0)
+
+
+class TestCheckpointResume:
+    @pytest.fixture(autouse=True)
+    def checkpoint_db(self, tmp_path, monkeypatch):
+        from config.settings import settings
+        monkeypatch.setattr(settings, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite"))
+        clear_workflow_cache()
+        yield
+        clear_workflow_cache()
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_resume_reruns_only_failed_node(self, parallel):
+        """Test that a late failure resumes from the last completed node"""
+        calls = {"summarization": 0, "qa_scoring": 0}
+        patches = _mock_llm_agents()
+        for p in patches:
+            p.start()
+        summarize_run = SummarizationAgent.run
+        qa_run = QAScoringAgent.run
+
+        def counting_summarize(self, state):
+            calls["summarization"] += 1
+            return summarize_run(self, state)
+
+        def flaky_qa(self, state):
+            calls["qa_scoring"] += 1
+            if calls["qa_scoring"] == 1:
+                raise RuntimeError("QA provider timed out")
+            return qa_run(self, state)
+
+        patches += [
+            patch.object(SummarizationAgent, "run", counting_summarize),
+            patch.object(QAScoringAgent, "run", flaky_qa),
+        ]
+        for p in patches[-2:]:
+            p.start()
+        try:
+            with pytest.raises(RuntimeError, match="timed out"):
+                run_analysis(
+                    raw_input=VALID_TRANSCRIPT,
+                    call_id="CALL-RESUME01",
+                    checkpoint=True,
+                    parallel=parallel
+                )
+
+            result = resume_analysis("CALL-RESUME01", parallel=parallel)
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        assert calls == {"summarization": 1, "qa_scoring": 2}
+        assert result["metadata"].call_id == "CALL-RESUME01"
+        assert result["qa_scores"] is not None
+        assert result["summary"] is not None
+        assert result["execution_path"].count("transcription") == 1
+
+    def test_resume_completed_run_returns_final_state(self, monkeypatch):
+        from config.settings import settings
+        monkeypatch.setattr(settings, "CHECKPOINT_KEEP_COMPLETED", True)
+
+        result = run_analysis(raw_input="Hi", call_id="CALL-DONE0001", checkpoint=True)
+        resumed = resume_analysis("CALL-DONE0001")
+
+        assert resumed["execution_path"] == result["execution_path"]
+
+    def test_completed_run_is_deleted(self):
+        run_analysis(raw_input="Hi", call_id="CALL-DONE0002", checkpoint=True)
+
+        with pytest.raises(KeyError):
+            resume_analysis("CALL-DONE0002")
+
+    def _checkpointed_audio_run(self, audio_data, call_id, transcribed=None):
+        from agents.transcription_agent import TranscriptionAgent
+
+        def transcribe(self, state):
+            if transcribed is not None:
+                transcribed.append(state.audio_data)
+            state.transcript = TranscriptData(full_text=VALID_TRANSCRIPT)
+            state.execution_path.append("transcription")
+            return state
+
+        patches = _mock_llm_agents() + [patch.object(TranscriptionAgent, "run", transcribe)]
+        for p in patches:
+            p.start()
+        try:
+            return run_analysis(raw_input="", input_type="audio", input_file_path="call.wav",
+                                audio_data=audio_data, call_id=call_id, checkpoint=True)
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+    def test_checkpoint_size_does_not_grow_with_the_audio(self, monkeypatch):
+        """Test that the recording is spooled once instead of copied into every checkpoint"""
+        import sqlite3
+        from config.settings import settings
+        monkeypatch.setattr(settings, "CHECKPOINT_KEEP_COMPLETED", True)
+
+        def stored_bytes(call_id):
+            conn = sqlite3.connect(settings.CHECKPOINT_DB_PATH)
+            try:
+                return sum(conn.execute(query, (call_id,)).fetchone()[0] for query in (
+                    "SELECT sum(length(checkpoint)) FROM checkpoints WHERE thread_id = ?",
+                    "SELECT sum(length(value)) FROM writes WHERE thread_id = ?",
+                ))
+            finally:
+                conn.close()
+
+        transcribed = []
+        self._checkpointed_audio_run(b"\x01" * 10_000, "CALL-SMALL001", transcribed)
+        self._checkpointed_audio_run(b"\x01" * 2_000_000, "CALL-LARGE001", transcribed)
+
+        # The transcription node still got the whole recording
+        assert [len(audio) for audio in transcribed] == [10_000, 2_000_000]
+        assert stored_bytes("CALL-LARGE001") - stored_bytes("CALL-SMALL001") < 1_000
+
+    def test_completed_audio_run_deletes_its_spooled_audio(self):
+        result = self._checkpointed_audio_run(b"\x01" * 10_000, "CALL-SPOOL001")
+
+        assert result["summary"] is not None
+        assert not os.path.exists(result["audio_path"])
+
+    def test_resume_unknown_call_raises(self):
+        with pytest.raises(KeyError):
+            resume_analysis("CALL-MISSING0")
+
+
+class TestNodeMetrics:
+    def test_every_node_execution_is_recorded(self):
+        """Test that each node execution appends a timing record"""
+        patches = _mock_llm_agents(critiques=[True, False])
+        for p in patches:
+            p.start()
+        try:
+            result = create_workflow().invoke(
+                AgentState(raw_input=VALID_TRANSCRIPT, input_type="transcript")
+            )
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        metrics = result["node_metrics"]
+        assert len(metrics) == len(result["execution_path"])
+        assert [m.node for m in metrics].count("summarization") == 2
+        for m in metrics:
+            assert m.ended_at >= m.started_at
+            assert m.duration_ms >= 0
+
+    def test_token_usage_and_cost_captured_from_llm_calls(self):
+        """Test that usage reported by chat models inside a node is attributed to it"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+
+        fake_llm = GenericFakeChatModel(messages=iter([AIMessage(
+            content="NO_ABUSE_DETECTED",
+            usage_metadata={"input_tokens": 1000, "output_tokens": 100, "total_tokens": 1100,
+                            "input_token_details": {"cache_read": 600}},
+            response_metadata={"model_name": "gpt-4o-mini-2024-07-18"}
+        )]))
+
+        def abuse_run(self, state):
+            fake_llm.invoke(state.transcript.full_text)
+            state.execution_path.append("abuse_detection")
+            return state
+
+        patches = _mock_llm_agents() + [patch.object(AbuseDetectionAgent, "run", abuse_run)]
+        for p in patches:
+            p.start()
+        try:
+            result = create_workflow().invoke(
+                AgentState(raw_input=VALID_TRANSCRIPT, input_type="transcript")
+            )
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        by_node = {m.node: m for m in result["node_metrics"]}
+        abuse = by_node["abuse_detection"]
+        assert abuse.prompt_tokens == 1000
+        assert abuse.completion_tokens == 100
+        assert abuse.cached_prompt_tokens == 600
+        assert abuse.llm_calls == 1
+        assert abuse.models == ["gpt-4o-mini-2024-07-18"]
+        # The 600 cached prompt tokens are billed at the cached-input rate
+        assert abuse.estimated_cost_usd == pytest.approx((400 * 0.15 + 600 * 0.075 + 100 * 0.60) / 1_000_000)
+
+        # Usage never leaks into branches running at the same time
+        assert by_node["qa_scoring"].prompt_tokens == 0
+
+    def test_cached_prompt_tokens_are_priced_at_the_cached_rate(self):
+        from graph.metrics import estimate_cost
+
+        full = estimate_cost("claude-sonnet-4-20250514", 10_000, 500)
+        cached = estimate_cost("claude-sonnet-4-20250514", 10_000, 500, cached_prompt_tokens=9_000)
+
+        assert full == pytest.approx((10_000 * 3.00 + 500 * 15.00) / 1_000_000)
+        assert cached == pytest.approx((1_000 * 3.00 + 9_000 * 0.30 + 500 * 15.00) / 1_000_000)
+
+
+class TestResultCache:
+    @pytest.fixture
+    def result_store(self, monkeypatch):
+        """Enable the result cache with a fresh in-memory store"""
+        import graph.result_cache as result_cache
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", True)
+        monkeypatch.setattr(result_cache, "_result_store", None)
+        return result_cache
+
+    def _run_twice(self, **kwargs):
+        calls = []
+        def summarize_run(self, state):
+            calls.append(state.raw_input)
+            return original(self, state)
+
+        patches = _mock_llm_agents()
+        original = patches[2].new  # SummarizationAgent.run fake
+        patches.append(patch.object(SummarizationAgent, "run", summarize_run))
+        for p in patches:
+            p.start()
+        clear_workflow_cache()  # shared graphs hold the agents' bound methods
+        try:
+            first = run_analysis(raw_input=VALID_TRANSCRIPT, input_type="transcript", **kwargs)
+            second = run_analysis(raw_input=VALID_TRANSCRIPT, input_type="transcript", **kwargs)
+        finally:
+            for p in reversed(patches):
+                p.stop()
+        return first, second, calls
+
+    def test_repeat_analysis_is_served_from_cache(self, result_store):
+        first, second, calls = self._run_twice()
+
+        assert len(calls) == 1
+        assert second["summary"] == first["summary"]
+        assert second["execution_path"] == first["execution_path"]
+
+    def test_cache_hit_keeps_the_request_identity(self, result_store):
+        first, second, _ = self._run_twice()
+        third = run_analysis(
+            raw_input=VALID_TRANSCRIPT, call_id="CALL-REPEAT01", input_file_path="repeat.txt"
+        )
+
+        assert second["metadata"].call_id != first["metadata"].call_id
+        assert third["call_id"] == third["metadata"].call_id == "CALL-REPEAT01"
+        assert third["metadata"].file_name == third["input_file_path"] == "repeat.txt"
+        assert third["metadata"].timestamp > first["metadata"].timestamp
+        assert third["summary"] == first["summary"]
+
+    def test_disabled_by_default(self):
+        _, _, calls = self._run_twice()
+
+        assert len(calls) == 2
+
+    def test_checkpointed_runs_bypass_cache(self, result_store):
+        from graph.checkpointing import get_checkpointer
+
+        with patch("graph.workflow.get_checkpointer", return_value=get_checkpointer(":memory:")):
+            _, _, calls = self._run_twice(checkpoint=True)
+
+        assert len(calls) == 2
+
+
+class TestFastProfile:
+    def setup_method(self):
+        clear_workflow_cache()
+
+    def test_fast_profile_makes_one_analysis_call(self):
+        """Test that the fast profile replaces the four LLM agents with one node"""
+        def fast_run(self, state):
+            state.summary = CallSummary(
+                brief_summary="Duplicate charge refunded",
+                key_points=["Refund"],
+                customer_intent="Get refund",
+                resolution_status=ResolutionStatus.RESOLVED,
+                topics=["billing"],
+                sentiment=Sentiment.NEUTRAL
+            )
+            state.qa_scores = QAScores(empathy=8, professionalism=9, resolution=9, tone=8)
+            state.abuse_flags = []
+            state.execution_path.append("fast_analysis")
+            state.models_used.append(self.model_name)
+            return state
+
+        patches = _mock_llm_agents() + [patch.object(FastAnalysisAgent, "run", fast_run)]
+        for p in patches:
+            p.start()
+        try:
+            result = run_analysis(raw_input=VALID_TRANSCRIPT, profile="fast")
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        assert result["execution_path"] == ["validation", "intake", "transcription", "compaction", "fast_analysis"]
+        assert result["pipeline_profile"] == "fast"
+        assert result["summary"] is not None
+        assert result["qa_scores"] is not None
+
+    def test_profiles_are_compiled_separately(self):
+        assert get_workflow(profile="fast") is not get_workflow(profile="full")
+
+    def test_unknown_profile_rejected(self):
+        with pytest.raises(ValueError):
+            create_workflow(profile="turbo")
+
+
 class TestWorkflowValidation:
     def test_workflow_rejects_invalid_input(self):
         """Test that workflow stops on invalid input"""
@@ -22,10 +22,12 @@ def render_agent_interactions(state: Dict[str, Any]):
         "validation",
         "intake", 
         "transcription",
+        "compaction",
         "abuse_detection",
         "summarization",
         "critic",
-        "qa_scoring"
+        "qa_scoring",
+        "fast_analysis"
     ]
     
     # Define what each agent contributes to state
@@ -51,6 +53,13 @@ def render_agent_interactions(state: Dict[str, Any]):
             "writes": ["transcript"],
             "decision": None
         },
+        "compaction": {
+            "icon": "🗜️",
+            "name": "Transcript Compaction",
+            "reads": ["transcript"],
+            "writes": ["transcript.compact_text", "compaction"],
+            "decision": None
+        },
         "abuse_detection": {
             "icon": "🚨",
             "name": "Abuse Detection",
@@ -69,7 +78,7 @@ def render_agent_interactions(state: Dict[str, Any]):
             "icon": "🔍",
             "name": "Critic Agent",
             "reads": ["summary", "transcript"],
-            "writes": ["critique", "needs_revision", "revision_count"],
+            "writes": ["critique", "critique_history", "needs_revision", "revision_count"],
             "decision": "Revise or Continue to QA"
         },
         "qa_scoring": {
@@ -78,6 +87,13 @@ def render_agent_interactions(state: Dict[str, Any]):
             "reads": ["summary", "transcript"],
             "writes": ["qa_scores"],
             "decision": None
+        },
+        "fast_analysis": {
+            "icon": "⚡",
+            "name": "Fast Analysis (single call)",
+            "reads": ["transcript"],
+            "writes": ["summary", "qa_scores", "abuse_flags"],
+            "decision": None
         }
     }
     
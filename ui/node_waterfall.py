@@ -0,0 +1,77 @@
+"""
+Per-node waterfall view
+Shows when each agent ran, how long it took and what it cost
+"""
+
+import streamlit as st
+import altair as alt
+from typing import Dict, Any
+
+
+def render_node_waterfall(state: Dict[str, Any]):
+    """Render node timings as a waterfall chart plus a usage table
+    
+    Args:
+        state: Final workflow state with node_metrics records
+    """
+    
+    metrics = state.get("node_metrics") or []
+    if not metrics:
+        st.caption("No per-node metrics recorded")
+        return
+    
+    run_start = min(m.started_at for m in metrics)
+    
+    # Label repeated nodes (revision loop) so each execution gets its own row
+    seen = {}
+    rows = []
+    for m in sorted(metrics, key=lambda m: m.started_at):
+        seen[m.node] = seen.get(m.node, 0) + 1
+        label = m.node if seen[m.node] == 1 else f"{m.node} #{seen[m.node]}"
+        rows.append({
+            "node": label,
+            "start_ms": (m.started_at - run_start).total_seconds() * 1000,
+            "end_ms": (m.ended_at - run_start).total_seconds() * 1000,
+            "duration_ms": round(m.duration_ms, 1),
+            "prompt_tokens": m.prompt_tokens,
+            "completion_tokens": m.completion_tokens,
+            "cached_prompt_tokens": m.cached_prompt_tokens,
+            "retries": m.retries,
+            "cache_hits": m.cache_hits,
+            "cost_usd": m.estimated_cost_usd,
+        })
+    
+    chart = alt.Chart(alt.Data(values=rows)).mark_bar().encode(
+        y=alt.Y("node:N", sort=None, title=None),
+        x=alt.X("start_ms:Q", title="Time since start (ms)"),
+        x2="end_ms:Q",
+        color=alt.Color("node:N", legend=None),
+        tooltip=["node:N", "duration_ms:Q", "prompt_tokens:Q", "completion_tokens:Q", "cached_prompt_tokens:Q", "retries:Q", "cache_hits:Q", "cost_usd:Q"],
+    ).properties(height=28 * len(rows) + 40)
+    st.altair_chart(chart, use_container_width=True)
+    
+    # Totals
+    wall_ms = max(r["end_ms"] for r in rows)
+    total_tokens = sum(r["prompt_tokens"] + r["completion_tokens"] for r in rows)
+    total_cost = sum(r["cost_usd"] for r in rows)
+    prompt_tokens = sum(r["prompt_tokens"] for r in rows)
+    cached_ratio = sum(r["cached_prompt_tokens"] for r in rows) / prompt_tokens if prompt_tokens else 0.0
+    slowest = max(rows, key=lambda r: r["duration_ms"])
+    
+    cols = st.columns(5)
+    with cols[0]:
+        st.metric("Wall Clock", f"{wall_ms / 1000:.2f}s")
+    with cols[1]:
+        st.metric("Tokens", f"{total_tokens:,}")
+    with cols[2]:
+        st.metric("Prompt Cached", f"{cached_ratio:.0%}")
+    with cols[3]:
+        st.metric("Est. Cost", f"${total_cost:.4f}")
+    with cols[4]:
+        st.metric("Slowest Node", slowest["node"])
+    
+    st.dataframe(
+        [{k: v for k, v in r.items() if k not in ("start_ms", "end_ms")} for r in rows],
+        use_container_width=True,
+        hide_index=True
+    )
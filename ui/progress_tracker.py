@@ -6,12 +6,13 @@ Shows live execution status as agents run
 import streamlit as st
 from typing import List, Optional
 
-def create_progress_tracker(container, total_steps: int = 7):
+def create_progress_tracker(container, total_steps: int = 7, profile: str = "full"):
     """Create a progress tracker that can be updated in real-time
     
     Args:
         container: Streamlit container to render into
         total_steps: Total number of steps in the workflow
+        profile: Pipeline profile ("full" or "fast"), selects the steps shown
         
     Returns:
         Dictionary of placeholder elements for each step
@@ -21,11 +22,19 @@ def create_progress_tracker(container, total_steps: int = 7):
         {"id": "validation", "name": "🛡️ Validation", "color": "#2196f3"},
         {"id": "intake", "name": "📥 Intake", "color": "#9c27b0"},
         {"id": "transcription", "name": "📝 Transcription", "color": "#ff9800"},
-        {"id": "abuse_detection", "name": "🚨 Abuse Detection", "color": "#f44336"},
-        {"id": "summarization", "name": "📋 Summarization", "color": "#4caf50"},
-        {"id": "critic", "name": "🔍 Critic", "color": "#e91e63"},
-        {"id": "qa_scoring", "name": "📊 QA Scoring", "color": "#8bc34a"},
+        {"id": "compaction", "name": "🗜️ Compaction", "color": "#795548"},
     ]
+    if profile == "fast":
+        steps += [
+            {"id": "fast_analysis", "name": "⚡ Fast Analysis", "color": "#00bcd4"},
+        ]
+    else:
+        steps += [
+            {"id": "abuse_detection", "name": "🚨 Abuse Detection", "color": "#f44336"},
+            {"id": "summarization", "name": "📋 Summarization", "color": "#4caf50"},
+            {"id": "critic", "name": "🔍 Critic", "color": "#e91e63"},
+            {"id": "qa_scoring", "name": "📊 QA Scoring", "color": "#8bc34a"},
+        ]
     
     with container:
         st.markdown("### 🔄 Workflow Progress")
@@ -113,3 +122,56 @@ def update_progress(placeholders, completed_steps: int, total_steps: int, curren
         placeholders["progress_text"].caption(f"Processing: {current_step} ({completed_steps}/{total_steps})")
     else:
         placeholders["progress_text"].caption(f"Completed: {completed_steps}/{total_steps}")
+
+def steps_started_by(step_id: str, state: dict) -> List[str]:
+    """Steps that start running once `step_id` has completed
+    
+    Mirrors the routing in graph/workflow.py: after compaction the abuse
+    detection, summarization and QA branches start together (or the single
+    fast analysis step), and the critic may send the summary back for revision.
+    
+    Args:
+        step_id: ID of the step that just completed
+        state: Merged workflow state after that step
+    """
+    
+    if step_id == "validation":
+        validation = state.get("validation_result")
+        return ["intake"] if validation and validation.is_valid else []
+    if step_id == "intake":
+        return ["transcription"]
+    if step_id == "transcription":
+        return ["compaction"]
+    if step_id == "compaction":
+        if state.get("pipeline_profile") == "fast":
+            return ["fast_analysis"]
+        return ["abuse_detection", "summarization", "qa_scoring"]
+    if step_id == "summarization":
+        return ["critic"]
+    if step_id == "critic" and state.get("needs_revision"):
+        return ["summarization"]
+    return []
+
+def render_partial_results(state: dict):
+    """Render results that already exist while the workflow is still running
+    
+    Args:
+        state: Merged workflow state so far
+    """
+    
+    abuse_flags = state.get("abuse_flags")
+    if abuse_flags:
+        st.error(f"🚨 {len(abuse_flags)} abuse flag(s) detected - full details when analysis completes")
+    elif "abuse_detection" in state.get("execution_path", []):
+        st.success("✅ No abusive content detected")
+    
+    summary = state.get("summary")
+    if summary:
+        revision = state.get("revision_count", 0)
+        label = "Draft summary" if revision == 0 else f"Draft summary (revision {revision})"
+        st.markdown(f"**📋 {label}**")
+        st.info(summary.brief_summary)
+    
+    qa_scores = state.get("qa_scores")
+    if qa_scores:
+        st.metric("QA Overall Score", f"{qa_scores.overall}/10")